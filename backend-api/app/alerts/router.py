@@ -16,6 +16,8 @@ from app.alerts import service
 from app.alerts.schemas import (
     AlertEvaluateRequest,
     AlertEvaluateResponse,
+    AlertEvaluateBatchRequest,
+    AlertEvaluateBatchResponse,
     AlarmRuleOut,
     AlarmEventOut,
     NotificationLogOut,
@@ -68,6 +70,44 @@ async def evaluate_alert(
     return result.response
 
 
+@router.post(
+    "/alerts/evaluate-batch",
+    response_model=AlertEvaluateBatchResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def evaluate_alerts_batch(
+    batch: AlertEvaluateBatchRequest,
+    session: AsyncSession = Depends(get_pg_session),
+    _key: str = Depends(verify_api_key),
+):
+    """Evaluate a batch of prediction events in one session.
+
+    Same semantics as /alerts/evaluate per item; results are returned in
+    request order. A request whose writes fail is rolled back to its own
+    savepoint and reported with `error`; the rest of the batch commits.
+    """
+    try:
+        result = await service.evaluate_alerts_batch(session, batch.alerts)
+    except Exception as exc:
+        logger.error(f"Batch alert evaluation error: {exc}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Alert evaluation failed")
+
+    for req, event, notif_types, rule in result.dispatch_items:
+        asyncio.create_task(
+            dispatch_notifications(
+                tenant_id=req.tenant_id,
+                asset_id=req.asset_id,
+                event=event,
+                notification_types=notif_types,
+                rule_name=rule.rule_name,
+                prediction_label=req.prediction_label,
+                probability=req.probability,
+            )
+        )
+
+    return result.response
+
+
 # ---------- User-facing endpoints (JWT auth) ----------
 
 @router.get("/alerts/rules", response_model=list[AlarmRuleOut])
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # ---------- Evaluate endpoint ----------
@@ -26,6 +26,21 @@ class AlertEvaluateResponse(BaseModel):
     work_orders_created: int
 
 
+class AlertEvaluateBatchRequest(BaseModel):
+    """Several prediction events evaluated in one session."""
+    alerts: list[AlertEvaluateRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class AlertEvaluateBatchItem(AlertEvaluateResponse):
+    """Per-request result; `error` is set (and counts are zero) if it failed."""
+    error: Optional[str] = None
+
+
+class AlertEvaluateBatchResponse(BaseModel):
+    """One result per request, in request order."""
+    results: list[AlertEvaluateBatchItem]
+
+
 # ---------- Output schemas ----------
 
 class AlarmRuleOut(BaseModel):
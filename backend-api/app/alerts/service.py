@@ -6,10 +6,12 @@ Called by router.py with an injected AsyncSession.
 import logging
 import uuid
 from datetime import datetime, timezone
+from collections import defaultdict
 from typing import Optional
 from uuid import UUID
 
 from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import (
@@ -23,6 +25,8 @@ from app.db.models import (
 from app.alerts.schemas import (
     AlertEvaluateRequest,
     AlertEvaluateResponse,
+    AlertEvaluateBatchItem,
+    AlertEvaluateBatchResponse,
     AlarmRuleOut,
     AlarmEventOut,
     NotificationLogOut,
@@ -57,19 +61,22 @@ async def fetch_matching_rules(
         )
     )
     rules = result.scalars().all()
+    return [rule for rule in rules if rule_in_scope(rule, asset_id, sensor_id)]
 
-    matched = []
-    for rule in rules:
-        # Tenant-wide rule
-        if rule.asset_id is None and rule.sensor_id is None:
-            matched.append(rule)
-        # Asset-scoped rule
-        elif rule.asset_id is not None and rule.asset_id == asset_id and rule.sensor_id is None:
-            matched.append(rule)
-        # Sensor-scoped rule
-        elif rule.sensor_id is not None and rule.sensor_id == sensor_id:
-            matched.append(rule)
-    return matched
+
+def rule_in_scope(
+    rule: AlarmRule,
+    asset_id: Optional[UUID],
+    sensor_id: Optional[UUID],
+) -> bool:
+    # Tenant-wide rule
+    if rule.asset_id is None and rule.sensor_id is None:
+        return True
+    # Asset-scoped rule
+    if rule.asset_id is not None and rule.asset_id == asset_id and rule.sensor_id is None:
+        return True
+    # Sensor-scoped rule
+    return rule.sensor_id is not None and rule.sensor_id == sensor_id
 
 
 def evaluate_rule(rule: AlarmRule, triggered_value: float) -> bool:
@@ -83,6 +90,34 @@ def evaluate_rule(rule: AlarmRule, triggered_value: float) -> bool:
     return op_fn(triggered_value, rule.threshold_value)
 
 
+async def fetch_notification_types_for_rules(
+    session: AsyncSession,
+    rule_tenants: set[tuple[UUID, UUID]],
+) -> dict[tuple[UUID, UUID], list[NotificationType]]:
+    """Batch form of fetch_notification_types_for_rule, keyed by (rule_id, tenant_id)."""
+    rule_ids = {rule_id for rule_id, _ in rule_tenants}
+    result = await session.execute(
+        select(
+            AlarmNotificationType.alarm_rule_id,
+            AlarmNotificationType.tenant_id,
+            NotificationType,
+        )
+        .join(
+            NotificationType,
+            AlarmNotificationType.notification_type_id == NotificationType.id,
+        )
+        .where(
+            AlarmNotificationType.alarm_rule_id.in_(rule_ids),
+            NotificationType.is_active == True,
+        )
+    )
+    by_rule: dict[tuple[UUID, UUID], list[NotificationType]] = defaultdict(list)
+    for rule_id, tenant_id, nt in result.all():
+        if (rule_id, tenant_id) in rule_tenants:
+            by_rule[(rule_id, tenant_id)].append(nt)
+    return by_rule
+
+
 # ---- Event / log creation ----
 
 async def create_alarm_event(
@@ -273,6 +308,184 @@ async def evaluate_alert(
     return EvaluateResult(response=resp, dispatch_items=dispatch_items)
 
 
+class BatchEvaluateResult:
+    """Batch response plus (request, event, notification types, rule) to dispatch."""
+    def __init__(self, response: AlertEvaluateBatchResponse, dispatch_items: list):
+        self.response = response
+        self.dispatch_items = dispatch_items
+
+
+def _empty_batch_item(error: Optional[str] = None) -> AlertEvaluateBatchItem:
+    return AlertEvaluateBatchItem(
+        matched_rules=0,
+        alarm_events_created=0,
+        notifications_queued=0,
+        work_orders_created=0,
+        error=error,
+    )
+
+
+async def evaluate_alerts_batch(
+    session: AsyncSession,
+    reqs: list[AlertEvaluateRequest],
+) -> BatchEvaluateResult:
+    """
+    Evaluate many prediction events in one session.
+
+    Rules are loaded once for all tenants in the batch and notification
+    types once for all matched rules. Events, notification logs and work
+    orders get client-side ids, so each table is written with one flush
+    instead of a round trip per row.
+
+    The bulk write runs inside a savepoint. If it fails, it is rolled back
+    and redone one request at a time, each in its own savepoint, so a bad
+    request only fails itself: its result carries `error` and zero counts.
+    """
+    tenant_ids = {req.tenant_id for req in reqs}
+    result = await session.execute(
+        select(AlarmRule).where(
+            AlarmRule.tenant_id.in_(tenant_ids),
+            AlarmRule.is_active == True,
+            AlarmRule.is_deleted == False,
+        )
+    )
+    rules_by_tenant: dict[UUID, list[AlarmRule]] = defaultdict(list)
+    for rule in result.scalars().all():
+        rules_by_tenant[rule.tenant_id].append(rule)
+
+    # (request index, request, rule) for every rule that fires
+    matches: list[tuple[int, AlertEvaluateRequest, AlarmRule]] = []
+    for index, req in enumerate(reqs):
+        for rule in rules_by_tenant.get(req.tenant_id, ()):
+            if rule_in_scope(rule, req.asset_id, req.sensor_id) and evaluate_rule(
+                rule, req.probability
+            ):
+                matches.append((index, req, rule))
+
+    responses = [_empty_batch_item() for _ in reqs]
+    if not matches:
+        return BatchEvaluateResult(
+            AlertEvaluateBatchResponse(results=responses), dispatch_items=[],
+        )
+
+    notif_types_by_rule = await fetch_notification_types_for_rules(
+        session, {(rule.id, req.tenant_id) for _, req, rule in matches},
+    )
+
+    try:
+        async with session.begin_nested():
+            dispatch_items = await _write_matches(
+                session, matches, responses, notif_types_by_rule,
+            )
+        return BatchEvaluateResult(
+            AlertEvaluateBatchResponse(results=responses), dispatch_items=dispatch_items,
+        )
+    except SQLAlchemyError as exc:
+        logger.warning(
+            f"Batch alert write of {len(reqs)} requests failed ({exc.__class__.__name__}); "
+            f"retrying per request"
+        )
+
+    matches_by_index: dict[int, list] = defaultdict(list)
+    for match in matches:
+        matches_by_index[match[0]].append(match)
+
+    dispatch_items = []
+    for index, item_matches in matches_by_index.items():
+        try:
+            async with session.begin_nested():
+                dispatch_items += await _write_matches(
+                    session, item_matches, responses, notif_types_by_rule,
+                )
+        except SQLAlchemyError as exc:
+            logger.error(f"Batch alert request {index} failed: {exc}")
+            responses[index] = _empty_batch_item(error=exc.__class__.__name__)
+
+    return BatchEvaluateResult(
+        AlertEvaluateBatchResponse(results=responses), dispatch_items=dispatch_items,
+    )
+
+
+async def _write_matches(
+    session: AsyncSession,
+    matches: list[tuple[int, AlertEvaluateRequest, AlarmRule]],
+    responses: list[AlertEvaluateBatchItem],
+    notif_types_by_rule: dict[tuple[UUID, UUID], list[NotificationType]],
+) -> list:
+    """Write events, logs and work orders for matches; update counts in place."""
+    events: list[AlarmEvent] = []
+    for _, req, rule in matches:
+        events.append(
+            AlarmEvent(
+                id=uuid.uuid4(),
+                tenant_id=req.tenant_id,
+                asset_id=req.asset_id,
+                sensor_id=req.sensor_id,
+                alarm_rule_id=rule.id,
+                prediction_id=req.prediction_id,
+                model_version_id=req.model_version_id,
+                triggered_value=req.probability,
+                triggered_at=req.timestamp,
+                status="open",
+            )
+        )
+    session.add_all(events)
+    # Events first: logs and work orders reference them by foreign key
+    await session.flush()
+
+    children: list = []
+    dispatch_items: list = []
+    counts_by_index: dict[int, AlertEvaluateBatchItem] = {}
+    ts_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    for (index, req, rule), event in zip(matches, events):
+        counts = counts_by_index.setdefault(index, _empty_batch_item())
+        counts.matched_rules += 1
+        counts.alarm_events_created += 1
+
+        notif_types = notif_types_by_rule.get((rule.id, req.tenant_id), [])
+        for nt in notif_types:
+            children.append(
+                NotificationLog(
+                    tenant_id=req.tenant_id,
+                    asset_id=req.asset_id,
+                    alarm_event_id=event.id,
+                    notification_type_id=nt.id,
+                    channel=_channel_from_type(nt),
+                    recipient=_recipient_from_type(nt),
+                    status="queued",
+                )
+            )
+            counts.notifications_queued += 1
+
+        dispatch_items.append((req, event, notif_types, rule))
+
+        if rule.severity_level == "critical" and req.asset_id is not None:
+            children.append(
+                MaintenanceWorkOrder(
+                    tenant_id=req.tenant_id,
+                    asset_id=req.asset_id,
+                    alarm_event_id=event.id,
+                    work_number=f"WO-{ts_ms}-{str(event.id)[:8].upper()}",
+                    description=(
+                        f"Auto-generated from alarm rule '{rule.rule_name}'. "
+                        f"Triggered at probability {req.probability:.2%}."
+                    ),
+                    priority_level="critical",
+                    status="open",
+                )
+            )
+            counts.work_orders_created += 1
+
+    if children:
+        session.add_all(children)
+        await session.flush()
+
+    # Only publish counts once everything for these matches is flushed
+    for index, counts in counts_by_index.items():
+        responses[index] = counts
+    return dispatch_items
+
+
 # ---- CRUD helpers for router ----
 
 async def list_alarm_rules(session: AsyncSession, tenant_id: UUID) -> list[AlarmRuleOut]:
@@ -0,0 +1,93 @@
+"""Change notifications for mqtt-ingestion's registry caches
+
+Revision ID: 004_cache_change_notify
+Revises: 003_security_overhaul
+Create Date: 2026-10-16
+
+Changes:
+- tenants.updated_at, asset_model_versions.updated_at (watermark columns)
+- BEFORE UPDATE trigger keeping updated_at current on sensors, assets,
+  tenants and asset_model_versions, whatever code path writes them
+- AFTER INSERT/UPDATE/DELETE trigger sending
+  pg_notify('ingestion_cache', {"table", "op", "id"}) on the same tables
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004_cache_change_notify"
+down_revision: Union[str, None] = "003_security_overhaul"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CACHE_TABLES = ("sensors", "assets", "tenants", "asset_model_versions")
+
+
+def upgrade() -> None:
+    # 1. Watermark columns where missing
+    for table in ("tenants", "asset_model_versions"):
+        op.add_column(
+            table,
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False,
+                      server_default=sa.func.now()),
+        )
+    for table in CACHE_TABLES:
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+
+    # 2. Trigger functions
+    op.execute(sa.text(
+        """
+        CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at = now();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    ))
+    op.execute(sa.text(
+        """
+        CREATE OR REPLACE FUNCTION notify_ingestion_cache() RETURNS trigger AS $$
+        DECLARE
+            row_id uuid;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                row_id := OLD.id;
+            ELSE
+                row_id := NEW.id;
+            END IF;
+            PERFORM pg_notify(
+                'ingestion_cache',
+                json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'id', row_id)::text
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    ))
+
+    # 3. Triggers
+    for table in CACHE_TABLES:
+        op.execute(sa.text(
+            f"CREATE TRIGGER trg_{table}_updated_at BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+        ))
+        op.execute(sa.text(
+            f"CREATE TRIGGER trg_{table}_notify_cache "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION notify_ingestion_cache()"
+        ))
+
+
+def downgrade() -> None:
+    for table in CACHE_TABLES:
+        op.execute(sa.text(f"DROP TRIGGER IF EXISTS trg_{table}_notify_cache ON {table}"))
+        op.execute(sa.text(f"DROP TRIGGER IF EXISTS trg_{table}_updated_at ON {table}"))
+        op.drop_index(f"ix_{table}_updated_at", table_name=table)
+
+    op.execute(sa.text("DROP FUNCTION IF EXISTS notify_ingestion_cache()"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS set_updated_at()"))
+
+    for table in ("asset_model_versions", "tenants"):
+        op.drop_column(table, "updated_at")
@@ -42,6 +42,9 @@ class Tenant(Base):
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
     created_by = Column(UUID(as_uuid=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
 
 
 # ============================================================
@@ -449,6 +452,9 @@ class AssetModelVersion(Base):
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
 
 
 # ============================================================
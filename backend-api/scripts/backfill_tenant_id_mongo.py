@@ -63,6 +63,7 @@ async def create_indexes(db):
         ],
         "sensor_data": [
             [("tenant_id", 1), ("timestamp", -1)],
+            [("topic", 1), ("timestamp", -1)],
         ],
         "feedback": [
             [("tenant_id", 1), ("created_at", -1)],
@@ -0,0 +1,132 @@
+"""/alerts/evaluate-batch isolates a failing request to its own savepoint."""
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.alerts import router as alerts_router
+from app.common.dependencies import verify_api_key
+from app.db.models import AlarmEvent, AlarmRule
+from app.db.postgres import get_pg_session
+
+TENANT = uuid.uuid4()
+MISSING_ASSET = uuid.uuid4()  # no such asset: its event violates the foreign key
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    """Just enough of AsyncSession for evaluate_alerts_batch.
+
+    flush() raises IntegrityError for events on MISSING_ASSET; a savepoint
+    that exits with an error discards whatever was added inside it.
+    """
+
+    def __init__(self, rules):
+        self._results = [_Result(rules), _Result([])]  # rules, notification types
+        self.pending: list = []
+        self.written: list = []
+
+    async def execute(self, stmt):
+        return self._results.pop(0)
+
+    def add_all(self, objs):
+        self.pending.extend(objs)
+
+    async def flush(self):
+        if any(getattr(o, "asset_id", None) == MISSING_ASSET for o in self.pending):
+            raise IntegrityError("INSERT INTO alarm_events", {}, Exception("fk violation"))
+        self.written.extend(self.pending)
+        self.pending.clear()
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        written = len(self.written)
+        try:
+            yield
+        except Exception:
+            self.pending.clear()
+            del self.written[written:]
+            raise
+
+
+@pytest.fixture
+def session():
+    rule = AlarmRule(
+        id=uuid.uuid4(),
+        tenant_id=TENANT,
+        rule_name="high fault probability",
+        parameter_name="probability",
+        threshold_value=0.5,
+        comparison_operator=">",
+        severity_level="warning",
+    )
+    return FakeSession([rule])
+
+
+@pytest.fixture
+def client(session, monkeypatch):
+    async def dispatch_notifications(**kwargs):
+        pass
+
+    monkeypatch.setattr(alerts_router, "dispatch_notifications", dispatch_notifications)
+
+    app = FastAPI()
+    app.include_router(alerts_router.router)
+    app.dependency_overrides[get_pg_session] = lambda: session
+    app.dependency_overrides[verify_api_key] = lambda: ""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _alert(asset_id=None, probability=0.9):
+    return {
+        "tenant_id": str(TENANT),
+        "asset_id": str(asset_id) if asset_id else None,
+        "prediction_label": "bearing",
+        "probability": probability,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def test_batch_commits_all_valid_requests(client, session):
+    response = client.post(
+        "/alerts/evaluate-batch",
+        json={"alerts": [_alert(uuid.uuid4()), _alert(probability=0.1), _alert(uuid.uuid4())]},
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["alarm_events_created"] for r in results] == [1, 0, 1]
+    assert all(r["error"] is None for r in results)
+    assert len(session.written) == 2
+
+
+def test_one_invalid_request_fails_alone(client, session):
+    good = [uuid.uuid4() for _ in range(3)]
+    alerts = [_alert(good[0]), _alert(MISSING_ASSET), _alert(good[1]), _alert(good[2])]
+
+    response = client.post("/alerts/evaluate-batch", json={"alerts": alerts})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["alarm_events_created"] for r in results] == [1, 0, 1, 1]
+    assert results[1]["error"] == "IntegrityError"
+    assert [r["error"] for i, r in enumerate(results) if i != 1] == [None, None, None]
+
+    events = [o for o in session.written if isinstance(o, AlarmEvent)]
+    assert sorted(map(str, (e.asset_id for e in events))) == sorted(map(str, good))
@@ -14,6 +14,8 @@ db.createCollection('sensor_readings');
 // Legacy indexes (for mqtt-ingestion backward compatibility)
 db.sensor_data.createIndex({ "timestamp": -1 });
 db.sensor_data.createIndex({ "data.sensor_id": 1, "timestamp": -1 });
+// Latest readings per topic (mqtt-ingestion window warm start)
+db.sensor_data.createIndex({ "topic": 1, "timestamp": -1 });
 db.sensor_readings.createIndex({ "timestamp": -1 });
 db.sensor_readings.createIndex({ "sensor_id": 1, "timestamp": -1 });
 
@@ -15,3 +15,20 @@ class ModelNotFoundError(HTTPException):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Model version {version} not found",
         )
+
+
+class InferenceOverloadedError(HTTPException):
+    def __init__(self, retry_after_sec: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Inference capacity exhausted, retry later",
+            headers={"Retry-After": str(retry_after_sec)},
+        )
+
+
+class FeatureCountError(HTTPException):
+    def __init__(self, expected: int, got: int):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Expected {expected} features, got {got}",
+        )
@@ -46,6 +46,21 @@ class Settings(BaseSettings):
     ARTIFACT_STORE_PATH: str = "/app/models"
     MAX_LOADED_MODELS: int = 10
 
+    # Inference — booster threads per prediction call (0 = XGBoost default);
+    # a model's metadata.json "inference_nthread" overrides it
+    INFERENCE_NTHREAD: int = 1
+    # Inference thread pool (0 = one worker per core) and how many calls may
+    # wait for a worker before /predict answers 503 with Retry-After
+    INFERENCE_WORKERS: int = 0
+    INFERENCE_MAX_QUEUE: int = 64
+    INFERENCE_RETRY_AFTER_SEC: int = 1
+    # Dynamic batching: concurrent single /predict calls arriving within
+    # INFERENCE_BATCH_MAX_DELAY_MS (or until MAX_SIZE are waiting) are scored
+    # as one vectorized batch
+    INFERENCE_BATCH_ENABLED: bool = False
+    INFERENCE_BATCH_MAX_SIZE: int = 64
+    INFERENCE_BATCH_MAX_DELAY_MS: float = 3.0
+
     # Retraining enhancements
     INCLUDE_ORIGINAL_DATA_ON_RETRAIN: bool = True
     FEEDBACK_WEIGHT_MULTIPLIER: float = 3.0
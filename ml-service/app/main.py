@@ -9,6 +9,8 @@ from sqlalchemy import text
 from app.config import settings
 from app.db.postgres import engine, async_session_factory
 from app.models.registry import init_registry, get_registry
+from app.prediction.executor import init_executor, get_executor
+from app.prediction.batcher import init_batcher, get_batcher
 from app.models.schemas import HealthResponse
 from app.feedback.service import FeedbackService
 from app.feedback.router import set_feedback_service
@@ -49,6 +51,21 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to load model: {e}")
         raise
 
+    # Inference runs on a bounded thread pool, off the event loop
+    executor = init_executor(
+        workers=settings.INFERENCE_WORKERS,
+        max_queue=settings.INFERENCE_MAX_QUEUE,
+        retry_after_sec=settings.INFERENCE_RETRY_AFTER_SEC,
+    )
+    logger.info(f"Inference executor: {executor.workers} workers")
+    batcher = None
+    if settings.INFERENCE_BATCH_ENABLED:
+        batcher = init_batcher(
+            executor,
+            max_batch=settings.INFERENCE_BATCH_MAX_SIZE,
+            max_delay_ms=settings.INFERENCE_BATCH_MAX_DELAY_MS,
+        )
+
     # Feedback service (PostgreSQL-backed)
     feedback_svc = FeedbackService(session_factory=async_session_factory)
     set_feedback_service(feedback_svc)
@@ -68,6 +85,9 @@ async def lifespan(app: FastAPI):
     yield
 
     await registry.stop()
+    if batcher:
+        await batcher.close()
+    executor.shutdown()
     await engine.dispose()
     logger.info("Shutting down ML Service...")
 
@@ -124,6 +144,11 @@ async def health_check():
                 len(mgr.label_encoder.classes_) if model_loaded else 0
             ),
             "feedback_count": await feedback_router.get_feedback_service().get_feedback_count(),
+            "inference": get_executor().stats(),
+            "row_fallbacks": registry.row_fallbacks,
+            "inference_batching": (
+                get_batcher().stats() if settings.INFERENCE_BATCH_ENABLED else None
+            ),
         },
     )
 
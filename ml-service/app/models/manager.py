@@ -1,13 +1,18 @@
 """
 ModelManager — loads/serves a single XGBoost model. Relocated from model.py.
+
+Inference bypasses the sklearn wrappers: rows are standardized with the
+scaler's own mean_/scale_ into a reused per-thread buffer and scored with
+one Booster.inplace_predict call; the label is the probability argmax.
 """
 
 import json
 import logging
 import pickle
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
 
 import numpy as np
 import xgboost as xgb
@@ -16,9 +21,12 @@ logger = logging.getLogger(__name__)
 
 
 class ModelManager:
-    def __init__(self, model_dir: str, current_model_dir: str):
+    def __init__(self, model_dir: str, current_model_dir: str, nthread: Optional[int] = None):
         self.model_dir = Path(model_dir)
         self.current_model_dir = Path(current_model_dir)
+        # Booster threads per call; None → metadata "inference_nthread",
+        # then settings.INFERENCE_NTHREAD
+        self.nthread = nthread
 
         self.model = None
         self.label_encoder = None
@@ -26,6 +34,14 @@ class ModelManager:
         self.current_version = None
         self.metadata: Dict = {}
 
+        # Inference state, rebuilt by _prepare_inference() on every load
+        self._booster = None
+        self._classes = None
+        self._iteration_range = (0, 0)
+        self._scale_mean = None
+        self._scale_std = None
+        self._buffers = threading.local()
+
     def load_current_model(self) -> bool:
         try:
             model_path = self.current_model_dir / "xgboost_anomaly_detector.json"
@@ -63,33 +79,157 @@ class ModelManager:
                     "num_classes": len(self.label_encoder.classes_),
                 }
 
+            self._prepare_inference()
             return True
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             raise
 
+    def _prepare_inference(self) -> None:
+        from sklearn.preprocessing import StandardScaler
+
+        from app.config import settings
+
+        self._booster = self.model.get_booster()
+        nthread = self.nthread
+        if nthread is None:
+            nthread = self.metadata.get("inference_nthread", settings.INFERENCE_NTHREAD)
+        if nthread:
+            self._booster.set_param({"nthread": int(nthread)})
+
+        self._classes = np.asarray(self.label_encoder.classes_)
+        # Match XGBClassifier.predict_proba: stop at the best early-stopping round
+        try:
+            self._iteration_range = (0, self.model.best_iteration + 1)
+        except AttributeError:
+            self._iteration_range = (0, 0)
+
+        # StandardScaler.transform without its input validation; other
+        # scalers keep going through transform()
+        if type(self.scaler) is StandardScaler:
+            n_features = self.scaler.n_features_in_
+            mean, scale = self.scaler.mean_, self.scaler.scale_
+            self._scale_mean = mean if mean is not None else np.zeros(n_features)
+            self._scale_std = scale if scale is not None else np.ones(n_features)
+        else:
+            self._scale_mean = self._scale_std = None
+        self._buffers = threading.local()
+
+    def _scaled_row(self, features: Sequence[float]) -> np.ndarray:
+        """Scale one row into this thread's reused (1, n) float32 buffer."""
+        buffers = self._buffers
+        row = getattr(buffers, "row", None)
+        if row is None or row.shape[1] != len(features):
+            buffers.row = row = np.empty((1, len(features)), dtype=np.float32)
+            buffers.work = np.empty(len(features), dtype=np.float64)
+
+        if self._scale_mean is None:
+            row[0] = self.scaler.transform(np.asarray(features).reshape(1, -1))[0]
+            return row
+        # Same float64 arithmetic as StandardScaler, then one cast to float32
+        work = buffers.work
+        np.subtract(features, self._scale_mean, out=work)
+        np.divide(work, self._scale_std, out=work)
+        row[0] = work
+        return row
+
+    def _scaled_matrix(self, features_matrix: np.ndarray) -> np.ndarray:
+        if self._scale_mean is None:
+            return self.scaler.transform(features_matrix).astype(np.float32, copy=False)
+        scaled = features_matrix - self._scale_mean
+        scaled /= self._scale_std
+        return scaled.astype(np.float32)
+
+    def _probabilities(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Class probabilities, shape (rows, classes), from one booster call."""
+        probabilities = self._booster.inplace_predict(
+            features_scaled, iteration_range=self._iteration_range
+        )
+        if probabilities.ndim == 1:
+            # binary:logistic returns P(class 1) only
+            probabilities = np.column_stack((1.0 - probabilities, probabilities))
+        return probabilities
+
     def predict(self, features: List[float], top_k: int = 3) -> Dict[str, Any]:
         if self.model is None:
             raise RuntimeError("Model not loaded.")
 
-        features_array = np.array(features).reshape(1, -1)
-        features_scaled = self.scaler.transform(features_array)
-        prediction = self.model.predict(features_scaled)[0]
-        probabilities = self.model.predict_proba(features_scaled)[0]
+        probabilities = self._probabilities(self._scaled_row(features))[0]
+        prediction = int(probabilities.argmax())
 
-        top_k_indices = np.argsort(probabilities)[-top_k:][::-1]
-        top_k_labels = [self.label_encoder.classes_[i] for i in top_k_indices]
-        top_k_probs = [float(probabilities[i]) for i in top_k_indices]
+        k = min(top_k, probabilities.shape[0])
+        if k < probabilities.shape[0]:
+            top_k_indices = np.argpartition(probabilities, -k)[-k:]
+        else:
+            top_k_indices = np.arange(k)
+        top_k_indices = top_k_indices[np.argsort(probabilities[top_k_indices])[::-1]]
 
+        classes = self._classes
         return {
-            "prediction": self.label_encoder.classes_[prediction],
+            "prediction": classes[prediction],
             "confidence": float(probabilities[prediction]),
             "top_predictions": [
-                {"label": label, "confidence": prob}
-                for label, prob in zip(top_k_labels, top_k_probs)
+                {"label": classes[i], "confidence": float(probabilities[i])}
+                for i in top_k_indices
             ],
         }
 
+    def predict_batch(
+        self, features: Sequence[Sequence[float]], top_k: Union[int, Sequence[int]] = 3
+    ) -> List[Dict[str, Any]]:
+        """Predict many rows with one scaling pass and one booster call.
+
+        `top_k` is either shared or given per row. Returns one result dict
+        per row, shaped like predict().
+        """
+        if self.model is None:
+            raise RuntimeError("Model not loaded.")
+
+        features_matrix = np.asarray(features, dtype=np.float64)
+        if features_matrix.ndim != 2:
+            raise ValueError("features must be a 2-D matrix (one row per prediction)")
+        n_rows = features_matrix.shape[0]
+        if n_rows == 0:
+            return []
+
+        probabilities = self._probabilities(self._scaled_matrix(features_matrix))
+        predictions = probabilities.argmax(axis=1)
+        confidences = probabilities[np.arange(n_rows), predictions]
+
+        row_k = np.broadcast_to(np.asarray(top_k, dtype=np.intp), (n_rows,))
+        n_classes = probabilities.shape[1]
+        k = int(min(row_k.max(), n_classes))
+        # Unordered top-k per row, then order just those k columns
+        if k < n_classes:
+            top_indices = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+        else:
+            top_indices = np.broadcast_to(np.arange(n_classes), (n_rows, n_classes))
+        top_probs = np.take_along_axis(probabilities, top_indices, axis=1)
+        order = np.argsort(-top_probs, axis=1, kind="stable")
+        top_indices = np.take_along_axis(top_indices, order, axis=1)
+        top_probs = np.take_along_axis(top_probs, order, axis=1)
+
+        classes = self._classes
+        results = []
+        for row in range(n_rows):
+            row_top = int(row_k[row])
+            results.append(
+                {
+                    "prediction": classes[predictions[row]],
+                    "confidence": float(confidences[row]),
+                    "top_predictions": [
+                        {"label": classes[i], "confidence": float(p)}
+                        for i, p in zip(top_indices[row, :row_top], top_probs[row, :row_top])
+                    ],
+                }
+            )
+        return results
+
+    @property
+    def n_features(self) -> Optional[int]:
+        """Feature count the loaded scaler expects, if known."""
+        return getattr(self.scaler, "n_features_in_", None)
+
     def get_current_version(self) -> str:
         return self.current_version or "unknown"
 
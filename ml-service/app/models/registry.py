@@ -10,14 +10,17 @@ default production deployments from PG.
 import asyncio
 import logging
 import pickle
+import threading
 from collections import OrderedDict
+from concurrent.futures import Future
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
 
 import xgboost as xgb
 
+from app.common.exceptions import FeatureCountError
 from app.models.manager import ModelManager
 
 logger = logging.getLogger(__name__)
@@ -70,6 +73,15 @@ class ModelRegistry:
 
         self._refresh_task: Optional[asyncio.Task] = None
 
+        # Predictions run on InferenceExecutor threads; guards the LRU and
+        # _loading, never held while a version is read from disk
+        self._lru_lock = threading.Lock()
+        # version_id -> load in progress, resolved to LoadedModel or None
+        self._loading: Dict[UUID, Future] = {}
+
+        # Matrix calls in predict_rows() that had to be scored row by row
+        self.row_fallbacks = 0
+
     # ---- Backward-compatible API ----
 
     def load(self) -> None:
@@ -90,31 +102,156 @@ class ModelRegistry:
         2. Tenant default (from PG ml_model_deployments WHERE is_production)
         3. Filesystem default model (fallback)
         """
-        resolved_version_id = self._resolve_version_id(model_version_id, tenant_id)
-
-        if resolved_version_id and resolved_version_id in self._loaded:
-            # LRU hit — move to end
-            self._loaded.move_to_end(resolved_version_id)
-            loaded = self._loaded[resolved_version_id]
-            result = loaded.manager.predict(features=features, top_k=top_k)
-            result["model_version_id"] = str(resolved_version_id)
-            result["model_version_label"] = loaded.version_label
-            return result
-
-        if resolved_version_id and resolved_version_id in self._version_paths:
-            # LRU miss — try to load from artifact path
-            loaded = self._load_version(resolved_version_id)
+        manager, version_id, version_label = self._select_model(
+            self._resolve_version_id(model_version_id, tenant_id)
+        )
+        result = manager.predict(features=features, top_k=top_k)
+        result["model_version_id"] = version_id
+        result["model_version_label"] = version_label
+        return result
+
+    def predict_batch(
+        self,
+        features: Sequence[Sequence[float]],
+        top_k: Sequence[int],
+        model_version_ids: Sequence[Optional[str]],
+        tenant_ids: Sequence[Optional[str]],
+    ) -> List[Dict[str, Any]]:
+        """Vectorized predict() over many rows, in input order.
+
+        Raises the first row's error; use predict_rows() to keep the rest.
+        """
+        results = self.predict_rows(features, top_k, model_version_ids, tenant_ids)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def predict_rows(
+        self,
+        features: Sequence[Sequence[float]],
+        top_k: Sequence[int],
+        model_version_ids: Sequence[Optional[str]],
+        tenant_ids: Sequence[Optional[str]],
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """predict() over many rows, one result or exception per row.
+
+        Rows are grouped by resolved model version (same resolution order
+        as predict()) and each group runs as one matrix through
+        ModelManager.predict_batch. Rows of the wrong length fail alone;
+        if the matrix call still raises, that group is scored row by row.
+        """
+        groups: Dict[Optional[UUID], List[int]] = {}
+        for row, (model_version_id, tenant_id) in enumerate(zip(model_version_ids, tenant_ids)):
+            resolved = self._resolve_version_id(model_version_id, tenant_id)
+            groups.setdefault(resolved, []).append(row)
+
+        results: List[Union[Dict[str, Any], Exception, None]] = [None] * len(features)
+        for resolved, rows in groups.items():
+            try:
+                manager, version_id, version_label = self._select_model(resolved)
+            except Exception as exc:
+                for row in rows:
+                    results[row] = exc
+                continue
+
+            expected = manager.n_features
+            valid = []
+            for row in rows:
+                if expected is not None and len(features[row]) != expected:
+                    results[row] = FeatureCountError(expected, len(features[row]))
+                else:
+                    valid.append(row)
+            if not valid:
+                continue
+
+            try:
+                group_results = manager.predict_batch(
+                    [features[row] for row in valid],
+                    top_k=[top_k[row] for row in valid],
+                )
+            except Exception as exc:
+                logger.warning(f"Batch of {len(valid)} rows failed ({exc}), scoring rows individually")
+                self.row_fallbacks += 1
+                group_results = []
+                for row in valid:
+                    try:
+                        group_results.append(manager.predict(features[row], top_k=top_k[row]))
+                    except Exception as row_exc:
+                        group_results.append(row_exc)
+
+            for row, result in zip(valid, group_results):
+                if isinstance(result, dict):
+                    result["model_version_id"] = version_id
+                    result["model_version_label"] = version_label
+                results[row] = result
+        return results
+
+    def expected_features(
+        self, model_version_id: Optional[str] = None, tenant_id: Optional[str] = None
+    ) -> Optional[int]:
+        """Feature count of the model a request would use, without loading it.
+
+        None when the version is resolvable but not loaded yet. Never waits
+        on a load in progress: the lock only guards dict lookups.
+        """
+        resolved = self._resolve_version_id(model_version_id, tenant_id)
+        with self._lru_lock:
+            loaded = self._loaded.get(resolved) if resolved else None
+            if loaded is not None:
+                return loaded.manager.n_features
+            if resolved and resolved in self._version_paths:
+                return None
+        return self._default_manager.n_features
+
+    def _select_model(
+        self, resolved_version_id: Optional[UUID]
+    ) -> Tuple[ModelManager, Optional[str], str]:
+        """Manager serving a resolved version, plus its reported id and label.
+
+        An LRU miss reads the version from disk outside _lru_lock. The first
+        thread to miss owns the load; others asking for the same version
+        wait on its future, and everything else keeps using the lock.
+        """
+        loading: Optional[Future] = None
+        owner = False
+        if resolved_version_id:
+            with self._lru_lock:
+                loaded = self._loaded.get(resolved_version_id)
+                if loaded is not None:
+                    # LRU hit — move to end
+                    self._loaded.move_to_end(resolved_version_id)
+                    return loaded.manager, str(resolved_version_id), loaded.version_label
+                if resolved_version_id in self._version_paths:
+                    loading = self._loading.get(resolved_version_id)
+                    if loading is None:
+                        loading = self._loading[resolved_version_id] = Future()
+                        owner = True
+
+        if loading is not None:
+            # LRU miss — load from artifact path (or wait for whoever is)
+            loaded = self._load_and_publish(resolved_version_id, loading) if owner else loading.result()
             if loaded:
-                result = loaded.manager.predict(features=features, top_k=top_k)
-                result["model_version_id"] = str(resolved_version_id)
-                result["model_version_label"] = loaded.version_label
-                return result
+                return loaded.manager, str(resolved_version_id), loaded.version_label
 
         # Fallback to default filesystem model
-        result = self._default_manager.predict(features=features, top_k=top_k)
-        result["model_version_id"] = None
-        result["model_version_label"] = self._default_manager.get_current_version()
-        return result
+        return self._default_manager, None, self._default_manager.get_current_version()
+
+    def _load_and_publish(self, version_id: UUID, loading: Future) -> Optional[LoadedModel]:
+        loaded = None
+        try:
+            loaded = self._load_version(version_id)
+        finally:
+            with self._lru_lock:
+                if loaded:
+                    # Evict LRU if at capacity
+                    if len(self._loaded) >= self._max_loaded:
+                        evicted_id, _ = self._loaded.popitem(last=False)
+                        logger.info(f"Evicted model version {evicted_id} from cache")
+                    self._loaded[version_id] = loaded
+                del self._loading[version_id]
+            loading.set_result(loaded)
+        return loaded
 
     def _resolve_version_id(
         self,
@@ -140,7 +277,7 @@ class ModelRegistry:
         return None
 
     def _load_version(self, version_id: UUID) -> Optional[LoadedModel]:
-        """Load a model version from its artifact path into the LRU cache."""
+        """Load a model version from its artifact path (not yet cached)."""
         artifact_path = self._version_paths.get(version_id)
         if not artifact_path:
             logger.warning(f"No artifact path for version {version_id}")
@@ -169,13 +306,6 @@ class ModelRegistry:
                 version_id=version_id,
                 version_label=mgr.get_current_version(),
             )
-
-            # Evict LRU if at capacity
-            if len(self._loaded) >= self._max_loaded:
-                evicted_id, evicted = self._loaded.popitem(last=False)
-                logger.info(f"Evicted model version {evicted_id} from cache")
-
-            self._loaded[version_id] = loaded
             logger.info(
                 f"Loaded model version {version_id} from {version_dir}"
             )
@@ -0,0 +1,159 @@
+"""
+DynamicBatcher — coalesces concurrent single /predict calls into batches.
+
+Requests arriving within max_delay_ms of the first pending one (or until
+max_batch are pending) are sent together through
+ModelRegistry.predict_rows on the InferenceExecutor, which groups them by
+resolved model version and scores each group as one matrix. Every caller
+still awaits its own result.
+
+A request whose feature count does not match its model is rejected with
+422 before it joins a batch. If a matrix call still fails, the registry
+scores its rows one by one so each caller gets its own result or error;
+only executor saturation (503) fails a whole batch.
+
+The server-side counterpart of mqtt-ingestion's MLClient micro-batching,
+for callers that only send single requests.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.common.exceptions import FeatureCountError
+from app.prediction.executor import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+# Module-level singleton — set by main.py when INFERENCE_BATCH_ENABLED
+_batcher: Optional["DynamicBatcher"] = None
+
+
+def get_batcher() -> "DynamicBatcher":
+    if _batcher is None:
+        raise RuntimeError("DynamicBatcher not initialized. Call init_batcher() first.")
+    return _batcher
+
+
+def init_batcher(
+    executor: InferenceExecutor, max_batch: int = 64, max_delay_ms: float = 3.0
+) -> "DynamicBatcher":
+    global _batcher
+    _batcher = DynamicBatcher(executor, max_batch, max_delay_ms)
+    return _batcher
+
+
+class _Pending:
+    __slots__ = ("features", "top_k", "model_version_id", "tenant_id", "future", "submitted")
+
+    def __init__(self, features, top_k, model_version_id, tenant_id, future):
+        self.features = features
+        self.top_k = top_k
+        self.model_version_id = model_version_id
+        self.tenant_id = tenant_id
+        self.future = future
+        self.submitted = time.perf_counter()
+
+
+class DynamicBatcher:
+    def __init__(self, executor: InferenceExecutor, max_batch: int = 64, max_delay_ms: float = 3.0):
+        self._executor = executor
+        self._max_batch = max_batch
+        self._max_delay = max_delay_ms / 1000.0
+        self._pending: List[_Pending] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.rows = 0
+
+    async def predict(
+        self,
+        features: List[float],
+        top_k: int = 3,
+        model_version_id: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], float, float]:
+        """Queue one prediction; returns (result, queue_wait_sec, compute_sec).
+
+        queue_wait covers both the batching window and the executor queue.
+        Raises 422 if the features do not fit the resolved model.
+        """
+        from app.models.registry import get_registry
+
+        expected = get_registry().expected_features(model_version_id, tenant_id)
+        if expected is not None and len(features) != expected:
+            raise FeatureCountError(expected, len(features))
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append(_Pending(features, top_k, model_version_id, tenant_id, future))
+
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._max_delay, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[_Pending]) -> None:
+        from app.models.registry import get_registry
+
+        flushed = time.perf_counter()
+        try:
+            outcomes, executor_wait, compute = await self._executor.run(
+                self._score, get_registry(), batch
+            )
+        except Exception as exc:
+            # Rejected by the executor (503) — nothing was scored
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        for item, outcome in zip(batch, outcomes):
+            if item.future.done():
+                continue
+            if isinstance(outcome, Exception):
+                item.future.set_exception(outcome)
+            else:
+                queue_wait = flushed - item.submitted + executor_wait
+                item.future.set_result((outcome, queue_wait, compute))
+
+    def _score(self, registry, batch: List[_Pending]) -> List[Any]:
+        """Runs on an executor thread; one result or exception per item."""
+        return registry.predict_rows(
+            [item.features for item in batch],
+            [item.top_k for item in batch],
+            [item.model_version_id for item in batch],
+            [item.tenant_id for item in batch],
+        )
+
+    async def close(self) -> None:
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self._max_batch,
+            "max_delay_ms": self._max_delay * 1000,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,135 @@
+"""
+Compact msgpack wire format for /predict and /predict-batch.
+
+Sent with `Content-Type: application/msgpack`; responses come back as
+msgpack when the request was msgpack or `Accept` asks for it.
+
+/predict body — a map:
+    features          bin, little-endian float32 (or a msgpack float array)
+    top_k             int, optional (1..10, default 3)
+    tenant_id, asset_id, model_version_id, request_id
+                      str, optional
+
+/predict-batch body — a map with one matrix for all rows:
+    features          bin, rows × n little-endian float32, row-major
+    rows              int
+    top_k             int or list[int], optional
+    tenant_id, asset_id, model_version_id, request_id
+                      list (one entry per row, None allowed), optional
+
+Responses carry the same fields as PredictionResponse (timestamp as an
+ISO string); the batch response is a list of them, plus `error` (None, or
+why that row was not scored).
+
+Decoding skips pydantic list[float] validation entirely: features become
+a float32 ndarray view of the body and requests are built with
+PredictionRequest.model_construct.
+"""
+
+from datetime import datetime
+from typing import Any, List, Optional
+
+import msgpack
+import numpy as np
+from fastapi import HTTPException, status
+
+from app.prediction.schemas import PredictionRequest
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+_CONTEXT_FIELDS = ("tenant_id", "asset_id", "model_version_id", "request_id")
+
+
+def is_msgpack(media_type: Optional[str]) -> bool:
+    return bool(media_type) and any(t in media_type for t in MSGPACK_MEDIA_TYPES)
+
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+def _unpack_map(body: bytes) -> dict:
+    try:
+        payload = msgpack.unpackb(body, raw=False)
+    except Exception as exc:
+        raise _invalid(f"Invalid msgpack body: {exc}")
+    if not isinstance(payload, dict):
+        raise _invalid("msgpack body must be a map")
+    return payload
+
+
+def _features(value: Any) -> np.ndarray:
+    if isinstance(value, (bytes, bytearray)):
+        if len(value) % 4:
+            raise _invalid("features byte length must be a multiple of 4 (float32)")
+        return np.frombuffer(value, dtype="<f4")
+    if isinstance(value, list):
+        try:
+            return np.asarray(value, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise _invalid("features must contain only numbers")
+    raise _invalid("features must be float32 bytes or a float array")
+
+
+def _top_k(value: Any) -> int:
+    if value is None:
+        return 3
+    if not isinstance(value, int) or not 1 <= value <= 10:
+        raise _invalid("top_k must be an integer between 1 and 10")
+    return value
+
+
+def decode_predict_request(body: bytes) -> PredictionRequest:
+    payload = _unpack_map(body)
+    features = _features(payload.get("features"))
+    if features.size == 0:
+        raise _invalid("features must not be empty")
+    return PredictionRequest.model_construct(
+        features=features,
+        top_k=_top_k(payload.get("top_k")),
+        **{name: payload.get(name) for name in _CONTEXT_FIELDS},
+    )
+
+
+def decode_predict_batch_request(body: bytes) -> List[PredictionRequest]:
+    payload = _unpack_map(body)
+    rows = payload.get("rows")
+    if not isinstance(rows, int) or rows < 0:
+        raise _invalid("rows must be a non-negative integer")
+    features = _features(payload.get("features"))
+    if rows == 0:
+        return []
+    if features.size == 0 or features.size % rows:
+        raise _invalid(f"{features.size} features cannot be split into {rows} rows")
+    matrix = features.reshape(rows, -1)
+
+    top_k = payload.get("top_k")
+    top_k = [_top_k(k) for k in top_k] if isinstance(top_k, list) else [_top_k(top_k)] * rows
+    columns = {}
+    for name in _CONTEXT_FIELDS:
+        column = payload.get(name)
+        columns[name] = column if isinstance(column, list) else [None] * rows
+    if any(len(column) != rows for column in (top_k, *columns.values())):
+        raise _invalid("per-row fields must have one entry per row")
+
+    return [
+        PredictionRequest.model_construct(
+            features=matrix[row],
+            top_k=top_k[row],
+            **{name: column[row] for name, column in columns.items()},
+        )
+        for row in range(rows)
+    ]
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def encode_response(content: Any) -> bytes:
+    return msgpack.packb(content, default=_encode_default)
@@ -0,0 +1,129 @@
+"""
+InferenceExecutor — runs CPU-bound predictions off the event loop.
+
+XGBoost and NumPy release the GIL, so a thread pool sized to the cores
+gives real parallelism while the loop stays free for health checks,
+feedback and new requests. Each booster is pinned to INFERENCE_NTHREAD
+threads (1 by default) so workers × booster threads does not oversubscribe
+the CPU.
+
+Admission is bounded: once `workers` calls are running and `max_queue`
+more are waiting, further calls are rejected with 503 + Retry-After
+instead of piling up latency. Queue wait and compute time are tracked
+separately.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.common.exceptions import InferenceOverloadedError
+
+logger = logging.getLogger(__name__)
+
+# Module-level singleton — set by main.py during startup
+_executor: Optional["InferenceExecutor"] = None
+
+
+def get_executor() -> "InferenceExecutor":
+    if _executor is None:
+        raise RuntimeError("InferenceExecutor not initialized. Call init_executor() first.")
+    return _executor
+
+
+def init_executor(workers: int = 0, max_queue: int = 64, retry_after_sec: int = 1) -> "InferenceExecutor":
+    global _executor
+    _executor = InferenceExecutor(workers, max_queue, retry_after_sec)
+    return _executor
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class InferenceExecutor:
+    def __init__(self, workers: int = 0, max_queue: int = 64, retry_after_sec: int = 1):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.retry_after_sec = retry_after_sec
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="inference"
+        )
+        # Admitted = running + waiting; released when the pool future
+        # finishes, so a cancelled request still holds its slot until then
+        self._admitted = 0
+        self._lock = threading.Lock()
+        self._wait = _Timing()
+        self._compute = _Timing()
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+        """Run fn(*args) on the pool.
+
+        Returns (result, queue_wait_sec, compute_sec). Raises
+        InferenceOverloadedError if the admission queue is full.
+        """
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise InferenceOverloadedError(self.retry_after_sec)
+            self._admitted += 1
+
+        submitted = time.perf_counter()
+        timing = [0.0, 0.0]
+
+        def _call():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                timing[0], timing[1] = started - submitted, finished - started
+                with self._lock:
+                    self._wait.add(timing[0])
+                    self._compute.add(timing[1])
+
+        future = self._pool.submit(_call)
+        future.add_done_callback(self._release)
+        result = await asyncio.wrap_future(future)
+        return result, timing[0], timing[1]
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "admitted": self._admitted,
+                "completed": self._compute.count,
+                "rejected": self.rejected,
+                "queue_wait": self._wait.stats(),
+                "compute": self._compute.stats(),
+            }
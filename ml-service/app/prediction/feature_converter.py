@@ -10,7 +10,7 @@ def convert_structured_to_features(request: PredictionRequest) -> list[float]:
     If features array is provided, use it directly.
     Otherwise, construct from structured sensor fields.
     """
-    if request.features and len(request.features) > 0:
+    if request.features is not None and len(request.features) > 0:
         return request.features
 
     features = [
@@ -1,30 +1,125 @@
 import logging
 from datetime import datetime
+from typing import Any, Dict, List, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from app.common.auth import verify_internal_key
-from app.prediction.schemas import PredictionRequest, PredictionResponse
+from app.config import settings
+from app.prediction.batcher import get_batcher
+from app.prediction.binary import (
+    MSGPACK_MEDIA_TYPE,
+    decode_predict_batch_request,
+    decode_predict_request,
+    encode_response,
+    is_msgpack,
+)
+from app.prediction.executor import get_executor
+from app.prediction.schemas import BatchPredictionItem, PredictionRequest, PredictionResponse
 from app.prediction.feature_converter import convert_structured_to_features
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_single_adapter = TypeAdapter(PredictionRequest)
+_batch_adapter = TypeAdapter(List[PredictionRequest])
 
-@router.post("/predict", response_model=PredictionResponse)
-async def predict(request: PredictionRequest, _key: str = Depends(verify_internal_key)):
+
+def _request_body_docs(schema: dict) -> dict:
+    """OpenAPI body for routes that parse JSON or msgpack themselves."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                MSGPACK_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    }
+
+
+async def _read_body(http_request: Request, decode_binary, adapter) -> Tuple[Any, bool]:
+    """Parse a JSON or msgpack body; returns (parsed, respond_in_msgpack)."""
+    body = await http_request.body()
+    if is_msgpack(http_request.headers.get("content-type")):
+        return decode_binary(body), True
+    try:
+        parsed = adapter.validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    return parsed, is_msgpack(http_request.headers.get("accept"))
+
+
+def _response_fields(
+    result: Dict[str, Any], model_version: str, timestamp: datetime, request_id
+) -> Dict[str, Any]:
+    return {
+        "prediction": result["prediction"],
+        "confidence": result["confidence"],
+        "top_predictions": result["top_predictions"],
+        "model_version": model_version,
+        "model_version_id": result.get("model_version_id"),
+        "timestamp": timestamp,
+        "request_id": request_id,
+    }
+
+
+def _error_fields(exc: Exception, timestamp: datetime, request_id) -> Dict[str, Any]:
+    return {
+        "prediction": None,
+        "confidence": None,
+        "top_predictions": None,
+        "model_version": None,
+        "model_version_id": None,
+        "timestamp": timestamp,
+        "request_id": request_id,
+        "error": exc.detail if isinstance(exc, HTTPException) else str(exc),
+    }
+
+
+def _timing_headers(response: Response, queue_wait: float, compute: float) -> None:
+    """Expose where the request's time went: waiting for a worker vs inference."""
+    response.headers["X-Inference-Queue-Ms"] = f"{queue_wait * 1000:.3f}"
+    response.headers["X-Inference-Compute-Ms"] = f"{compute * 1000:.3f}"
+
+
+@router.post(
+    "/predict",
+    response_model=PredictionResponse,
+    openapi_extra=_request_body_docs(PredictionRequest.model_json_schema()),
+)
+async def predict(
+    http_request: Request,
+    response: Response,
+    _key: str = Depends(verify_internal_key),
+):
+    request, binary = await _read_body(
+        http_request, decode_predict_request, _single_adapter
+    )
     try:
         from app.models.registry import get_registry
 
         registry = get_registry()
         features = convert_structured_to_features(request)
-        result = registry.predict(
-            features=features,
-            top_k=request.top_k or 3,
-            model_version_id=request.model_version_id,
-            tenant_id=request.tenant_id,
-        )
+        if settings.INFERENCE_BATCH_ENABLED:
+            result, queue_wait, compute = await get_batcher().predict(
+                features,
+                request.top_k or 3,
+                request.model_version_id,
+                request.tenant_id,
+            )
+        else:
+            result, queue_wait, compute = await get_executor().run(
+                registry.predict,
+                features,
+                request.top_k or 3,
+                request.model_version_id,
+                request.tenant_id,
+            )
+        _timing_headers(response, queue_wait, compute)
 
         top_3_str = ", ".join(
             [
@@ -37,49 +132,76 @@ async def predict(request: PredictionRequest, _key: str = Depends(verify_interna
             f"Confidence: {result['confidence']:.4f} | Top 3: {top_3_str}"
         )
 
-        return PredictionResponse(
-            prediction=result["prediction"],
-            confidence=result["confidence"],
-            top_predictions=result["top_predictions"],
-            model_version=registry.get_current_version(),
-            model_version_id=result.get("model_version_id"),
-            timestamp=datetime.utcnow(),
-            request_id=request.request_id,
+        fields = _response_fields(
+            result, registry.get_current_version(), datetime.utcnow(), request.request_id
         )
+        if binary:
+            return Response(
+                encode_response(fields), media_type=MSGPACK_MEDIA_TYPE, headers=dict(response.headers)
+            )
+        return PredictionResponse(**fields)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/predict-batch")
-async def predict_batch(requests: list[PredictionRequest]):
-    """Batch predictions — correctly calls convert_structured_to_features."""
+@router.post(
+    "/predict-batch",
+    openapi_extra=_request_body_docs(_batch_adapter.json_schema()),
+)
+async def predict_batch(http_request: Request, response: Response):
+    """Batch predictions — one matrix per resolved model version.
+
+    A row that cannot be scored (bad features, wrong length for its model)
+    comes back with `error` set instead of failing the whole request.
+    """
+    requests, binary = await _read_body(
+        http_request, decode_predict_batch_request, _batch_adapter
+    )
     try:
         from app.models.registry import get_registry
 
         registry = get_registry()
-        results = []
-        for req in requests:
-            features = convert_structured_to_features(req)
-            result = registry.predict(
-                features=features,
-                top_k=req.top_k or 3,
-                model_version_id=req.model_version_id,
-                tenant_id=req.tenant_id,
+        outcomes: List[Any] = [None] * len(requests)
+        rows: List[int] = []
+        features: List[List[float]] = []
+        for row, req in enumerate(requests):
+            try:
+                features.append(convert_structured_to_features(req))
+                rows.append(row)
+            except Exception as exc:
+                outcomes[row] = exc
+
+        queue_wait = compute = 0.0
+        if rows:
+            results, queue_wait, compute = await get_executor().run(
+                registry.predict_rows,
+                features,
+                [requests[row].top_k or 3 for row in rows],
+                [requests[row].model_version_id for row in rows],
+                [requests[row].tenant_id for row in rows],
             )
+            for row, result in zip(rows, results):
+                outcomes[row] = result
+        _timing_headers(response, queue_wait, compute)
 
-            results.append(
-                PredictionResponse(
-                    prediction=result["prediction"],
-                    confidence=result["confidence"],
-                    top_predictions=result["top_predictions"],
-                    model_version=registry.get_current_version(),
-                    model_version_id=result.get("model_version_id"),
-                    timestamp=datetime.utcnow(),
-                    request_id=req.request_id,
-                )
+        model_version = registry.get_current_version()
+        timestamp = datetime.utcnow()
+        fields = [
+            _error_fields(outcome, timestamp, req.request_id)
+            if isinstance(outcome, Exception)
+            else _response_fields(outcome, model_version, timestamp, req.request_id)
+            for req, outcome in zip(requests, outcomes)
+        ]
+        if binary:
+            return Response(
+                encode_response(fields), media_type=MSGPACK_MEDIA_TYPE, headers=dict(response.headers)
             )
-        return results
+        return [BatchPredictionItem(**f) for f in fields]
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -59,3 +59,18 @@ class PredictionResponse(BaseModel):
     request_id: Optional[str] = None
 
     model_config = {"protected_namespaces": ()}
+
+
+class BatchPredictionItem(BaseModel):
+    """One /predict-batch row: a prediction, or error set and the rest null."""
+
+    prediction: Optional[str] = None
+    confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
+    top_predictions: Optional[List[TopPrediction]] = None
+    model_version: Optional[str] = None
+    model_version_id: Optional[str] = None
+    timestamp: datetime
+    request_id: Optional[str] = None
+    error: Optional[str] = None
+
+    model_config = {"protected_namespaces": ()}
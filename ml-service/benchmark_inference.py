@@ -0,0 +1,88 @@
+"""
+Single-row inference microbenchmark for ModelManager.predict.
+
+Compares the legacy path (scaler.transform + XGBClassifier.predict +
+predict_proba + full argsort) with the current single-pass booster path,
+and reports per-call latency percentiles.
+
+Usage (from ml-service/):
+    python benchmark_inference.py [MODEL_DIR] [--calls N] [--nthread N]
+
+MODEL_DIR defaults to settings.CURRENT_MODEL_DIR and must hold the usual
+xgboost_anomaly_detector.json, label_encoder.pkl and feature_scaler.pkl.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.models.manager import ModelManager
+
+
+def legacy_predict(manager: ModelManager, features, top_k: int = 3):
+    """ModelManager.predict as it was before the single-pass path."""
+    features_array = np.array(features).reshape(1, -1)
+    features_scaled = manager.scaler.transform(features_array)
+    prediction = manager.model.predict(features_scaled)[0]
+    probabilities = manager.model.predict_proba(features_scaled)[0]
+    top_k_indices = np.argsort(probabilities)[-top_k:][::-1]
+    return {
+        "prediction": manager.label_encoder.classes_[prediction],
+        "confidence": float(probabilities[prediction]),
+        "top_predictions": [
+            {"label": manager.label_encoder.classes_[i], "confidence": float(probabilities[i])}
+            for i in top_k_indices
+        ],
+    }
+
+
+def measure(fn, rows, warmup: int = 50) -> np.ndarray:
+    for row in rows[:warmup]:
+        fn(row)
+    timings = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        start = time.perf_counter()
+        fn(row)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def report(name: str, timings_us: np.ndarray) -> None:
+    p50, p90, p99 = np.percentile(timings_us, [50, 90, 99])
+    print(
+        f"{name:<12} p50 {p50:8.1f} us   p90 {p90:8.1f} us   "
+        f"p99 {p99:8.1f} us   max {timings_us.max():8.1f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("model_dir", nargs="?", default=settings.CURRENT_MODEL_DIR)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--nthread", type=int, default=None)
+    args = parser.parse_args()
+
+    manager = ModelManager(
+        model_dir=args.model_dir, current_model_dir=args.model_dir, nthread=args.nthread
+    )
+    manager.load_current_model()
+    n_features = manager.scaler.n_features_in_
+    rows = np.random.default_rng(0).normal(size=(args.calls, n_features)).tolist()
+
+    mismatches = sum(
+        legacy_predict(manager, row)["prediction"] != manager.predict(row)["prediction"]
+        for row in rows[:200]
+    )
+    print(
+        f"{n_features} features, {len(manager.label_encoder.classes_)} classes, "
+        f"{args.calls} calls; label mismatches on 200 rows: {mismatches}"
+    )
+
+    report("legacy", measure(lambda row: legacy_predict(manager, row), rows))
+    report("single-pass", measure(manager.predict, rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import registry as registry_module  # noqa: E402
+from app.models.registry import init_registry  # noqa: E402
+
+N_FEATURES = 8
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, N_FEATURES))
+    y = np.array(["normal", "bearing", "cavitation"])[(X[:, 0] > 0).astype(int) + (X[:, 1] > 1)]
+    encoder = LabelEncoder().fit(y)
+    scaler = StandardScaler().fit(X)
+    model = xgb.XGBClassifier(n_estimators=5, max_depth=2).fit(
+        scaler.transform(X), encoder.transform(y)
+    )
+    model.save_model(str(tmp_path / "xgboost_anomaly_detector.json"))
+    with open(tmp_path / "label_encoder.pkl", "wb") as f:
+        pickle.dump(encoder, f)
+    with open(tmp_path / "feature_scaler.pkl", "wb") as f:
+        pickle.dump(scaler, f)
+
+    reg = init_registry(model_dir=str(tmp_path), current_model_dir=str(tmp_path))
+    reg.load()
+    yield reg
+    monkeypatch.setattr(registry_module, "_registry", None)
@@ -0,0 +1,69 @@
+"""DynamicBatcher isolates bad requests from the rest of their batch."""
+
+import asyncio
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.prediction.batcher import DynamicBatcher
+from app.prediction.executor import InferenceExecutor
+
+from conftest import N_FEATURES
+
+
+async def _predict_all(batcher, rows):
+    results = await asyncio.gather(
+        *(batcher.predict(row) for row in rows), return_exceptions=True
+    )
+    await batcher.close()
+    return results
+
+
+def _rows(good: int):
+    rng = np.random.default_rng(1)
+    return [rng.normal(size=N_FEATURES).tolist() for _ in range(good)]
+
+
+def test_wrong_length_request_fails_alone(registry):
+    executor = InferenceExecutor(workers=2)
+    batcher = DynamicBatcher(executor, max_batch=64, max_delay_ms=20)
+    rows = _rows(10)
+    rows.insert(4, [1.0, 2.0])
+
+    results = asyncio.run(_predict_all(batcher, rows))
+    executor.shutdown()
+
+    bad = results.pop(4)
+    assert isinstance(bad, HTTPException) and bad.status_code == 422
+    assert all(not isinstance(r, Exception) for r in results)
+    assert batcher.batches == 1 and batcher.rows == 10
+    for (result, _, _), row in zip(results, _rows(10)):
+        assert result["prediction"] == registry.predict(row)["prediction"]
+
+
+def test_failed_batch_falls_back_to_rows(registry, monkeypatch):
+    def broken_batch(*args, **kwargs):
+        raise ValueError("batch failed")
+
+    manager = registry.manager
+    original_predict = manager.predict
+
+    def predict(features, *args, **kwargs):
+        if features[0] == 99.0:
+            raise ValueError("bad row")
+        return original_predict(features, *args, **kwargs)
+
+    monkeypatch.setattr(manager, "predict_batch", broken_batch)
+    monkeypatch.setattr(manager, "predict", predict)
+
+    executor = InferenceExecutor(workers=2)
+    batcher = DynamicBatcher(executor, max_batch=64, max_delay_ms=20)
+    rows = _rows(5)
+    rows[2] = [99.0] * N_FEATURES
+
+    results = asyncio.run(_predict_all(batcher, rows))
+    executor.shutdown()
+
+    assert registry.row_fallbacks == 1
+    assert isinstance(results[2], ValueError)
+    assert [isinstance(r, tuple) for r in results] == [True, True, False, True, True]
@@ -0,0 +1,121 @@
+"""msgpack codec round trip, including mqtt-ingestion's columnar batch body."""
+
+import importlib.util
+import os
+from datetime import datetime
+
+import msgpack
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.prediction.binary import (
+    decode_predict_batch_request,
+    decode_predict_request,
+    encode_response,
+)
+
+_CLIENT_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "mqtt-ingestion", "app", "prediction", "ml_client.py"
+)
+_spec = importlib.util.spec_from_file_location("ingestion_ml_client", _CLIENT_PATH)
+ml_client = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ml_client)
+
+
+def _bodies(n_rows=3, n_features=5):
+    rng = np.random.default_rng(4)
+    bodies = [
+        {
+            "features": rng.normal(scale=100, size=n_features).tolist(),
+            "top_k": row + 1,
+            "tenant_id": f"tenant-{row}",
+            "asset_id": None,
+            "model_version_id": "mv-1" if row else None,
+            "request_id": f"r{row}",
+        }
+        for row in range(n_rows)
+    ]
+    del bodies[0]["top_k"]  # the client fills in the default
+    return bodies
+
+
+@pytest.mark.parametrize("encode", [
+    lambda f: np.asarray(f, dtype="<f4").tobytes(),
+    lambda f: f,  # plain msgpack float array
+])
+def test_predict_request_round_trip(encode):
+    features = [0.5, -1.25, 3e5, 1e-3]
+
+    request = decode_predict_request(
+        msgpack.packb({"features": encode(features), "top_k": 2, "request_id": "r"})
+    )
+
+    assert request.features.dtype == np.float32
+    assert request.features.tolist() == np.asarray(features, dtype=np.float32).tolist()
+    assert (request.top_k, request.request_id, request.tenant_id) == (2, "r", None)
+
+
+def test_columnar_batch_round_trip():
+    bodies = _bodies()
+
+    requests = decode_predict_batch_request(msgpack.packb(ml_client._columnar(bodies)))
+
+    assert len(requests) == len(bodies)
+    for request, body in zip(requests, bodies):
+        expected = np.asarray(body["features"], dtype=np.float32)
+        assert request.features.tolist() == expected.tolist()
+        assert request.top_k == body.get("top_k", 3)
+        for name in ("tenant_id", "asset_id", "model_version_id", "request_id"):
+            assert getattr(request, name) == body[name]
+
+
+def test_batch_shared_top_k_and_empty_batch():
+    matrix = np.arange(6, dtype="<f4")
+    requests = decode_predict_batch_request(
+        msgpack.packb({"rows": 2, "features": matrix.tobytes(), "top_k": 5})
+    )
+
+    assert [r.features.tolist() for r in requests] == [[0, 1, 2], [3, 4, 5]]
+    assert [r.top_k for r in requests] == [5, 5]
+    assert [r.request_id for r in requests] == [None, None]
+    assert decode_predict_batch_request(msgpack.packb({"rows": 0, "features": b""})) == []
+
+
+@pytest.mark.parametrize("payload", [
+    {"rows": 4, "features": np.zeros(6, dtype="<f4").tobytes()},
+    {"rows": 2, "features": np.zeros(6, dtype="<f4").tobytes(), "request_id": ["only-one"]},
+    {"rows": 1, "features": b"\x00\x00\x00"},
+    {"rows": 1, "features": np.zeros(3, dtype="<f4").tobytes(), "top_k": 11},
+    {"rows": -1, "features": b""},
+])
+def test_malformed_batch_is_rejected(payload):
+    with pytest.raises(HTTPException) as exc:
+        decode_predict_batch_request(msgpack.packb(payload))
+
+    assert exc.value.status_code == 422
+
+
+def test_response_encoding():
+    timestamp = datetime(2026, 1, 2, 3, 4, 5)
+    content = [
+        {
+            "prediction": np.str_("bearing"),
+            "confidence": np.float32(0.75),
+            "top_predictions": [{"label": "bearing", "confidence": np.float64(0.75)}],
+            "timestamp": timestamp,
+            "error": None,
+        }
+    ]
+
+    decoded = msgpack.unpackb(encode_response(content), raw=False)
+
+    assert decoded == [
+        {
+            "prediction": "bearing",
+            "confidence": 0.75,
+            "top_predictions": [{"label": "bearing", "confidence": 0.75}],
+            "timestamp": timestamp.isoformat(),
+            "error": None,
+        }
+    ]
@@ -0,0 +1,80 @@
+"""ModelManager's booster path matches the sklearn predict_proba path it replaced."""
+
+import pickle
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler, StandardScaler
+
+from app.model import ModelManager as SklearnModelManager
+from app.models.manager import ModelManager
+
+N_FEATURES = 8
+
+
+def _save_artifacts(path, labels, scaler, early_stopping=False):
+    rng = np.random.default_rng(1)
+    X = rng.normal(loc=3.0, scale=2.0, size=(300, N_FEATURES))
+    y = np.array(labels)[np.digitize(X[:, 0] + rng.normal(size=300), [2.0, 4.0][: len(labels) - 1])]
+    encoder = LabelEncoder().fit(y)
+    scaler.fit(X)
+    X_scaled = scaler.transform(X)
+
+    params = {"n_estimators": 30, "max_depth": 3}
+    fit = {}
+    if early_stopping:
+        params["early_stopping_rounds"] = 2
+        # Shuffled labels: validation loss turns up after a few rounds
+        fit["eval_set"] = [(X_scaled[:50], rng.permutation(encoder.transform(y[:50])))]
+        fit["verbose"] = False
+    model = xgb.XGBClassifier(**params).fit(X_scaled, encoder.transform(y), **fit)
+
+    model.save_model(str(path / "xgboost_anomaly_detector.json"))
+    with open(path / "label_encoder.pkl", "wb") as f:
+        pickle.dump(encoder, f)
+    with open(path / "feature_scaler.pkl", "wb") as f:
+        pickle.dump(scaler, f)
+    return rng.normal(loc=3.0, scale=2.5, size=(40, N_FEATURES))
+
+
+@pytest.mark.parametrize("labels, scaler, early_stopping", [
+    (["normal", "bearing", "cavitation"], StandardScaler(), False),
+    (["normal", "bearing", "cavitation"], StandardScaler(), True),
+    (["normal", "fault"], StandardScaler(), False),
+    (["normal", "bearing", "cavitation"], MinMaxScaler(), False),
+])
+def test_matches_sklearn_predict_proba(tmp_path, labels, scaler, early_stopping):
+    rows = _save_artifacts(tmp_path, labels, scaler, early_stopping)
+    reference = SklearnModelManager(str(tmp_path), str(tmp_path))
+    reference.load_current_model()
+    manager = ModelManager(str(tmp_path), str(tmp_path))
+    manager.load_current_model()
+
+    top_k = len(labels)
+    expected = [reference.predict(row.tolist(), top_k=top_k) for row in rows]
+    single = [manager.predict(row.tolist(), top_k=top_k) for row in rows]
+    batch = manager.predict_batch(rows.tolist(), top_k=top_k)
+
+    for got in (single, batch):
+        for result, want in zip(got, expected):
+            assert result["prediction"] == want["prediction"]
+            assert result["confidence"] == pytest.approx(want["confidence"], rel=1e-6)
+            want_probs = {p["label"]: p["confidence"] for p in want["top_predictions"]}
+            got_probs = {p["label"]: p["confidence"] for p in result["top_predictions"]}
+            assert got_probs == pytest.approx(want_probs, rel=1e-6)
+            # Ordered by confidence, highest first
+            confidences = [p["confidence"] for p in result["top_predictions"]]
+            assert confidences == sorted(confidences, reverse=True)
+
+
+def test_batch_honours_per_row_top_k(tmp_path):
+    rows = _save_artifacts(tmp_path, ["normal", "bearing", "cavitation"], StandardScaler())
+    manager = ModelManager(str(tmp_path), str(tmp_path))
+    manager.load_current_model()
+
+    results = manager.predict_batch(rows[:3].tolist(), top_k=[1, 2, 3])
+
+    assert [len(r["top_predictions"]) for r in results] == [1, 2, 3]
+    for row, result in zip(rows[:3], results):
+        assert result == manager.predict(row.tolist(), top_k=len(result["top_predictions"]))
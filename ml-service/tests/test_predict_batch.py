@@ -0,0 +1,66 @@
+"""/predict-batch reports a bad row in place instead of failing the request."""
+
+import msgpack
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.prediction import executor as executor_module
+from app.prediction.binary import MSGPACK_MEDIA_TYPE
+from app.prediction.executor import init_executor
+from app.prediction.router import router
+
+from conftest import N_FEATURES
+
+
+@pytest.fixture
+def client(registry, monkeypatch):
+    executor = init_executor(workers=2)
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as test_client:
+        yield test_client
+    executor.shutdown()
+    monkeypatch.setattr(executor_module, "_executor", None)
+
+
+def _body():
+    rng = np.random.default_rng(2)
+    rows = [{"features": rng.normal(size=N_FEATURES).tolist(), "request_id": f"r{i}"} for i in range(4)]
+    rows[1]["features"] = [1.0, 2.0]
+    return rows
+
+
+def test_wrong_length_row_gets_error_item(client, registry):
+    body = _body()
+    response = client.post("/predict-batch", json=body)
+
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["request_id"] for item in items] == ["r0", "r1", "r2", "r3"]
+    assert items[1]["error"] == f"Expected {N_FEATURES} features, got 2"
+    assert items[1]["prediction"] is None
+    for item, row in zip(items, body):
+        if item is items[1]:
+            continue
+        assert item["error"] is None
+        assert item["prediction"] == registry.predict(row["features"])["prediction"]
+
+
+def test_failed_matrix_call_scores_rows_individually(client, registry, monkeypatch):
+    def broken_batch(*args, **kwargs):
+        raise ValueError("batch failed")
+
+    monkeypatch.setattr(registry.manager, "predict_batch", broken_batch)
+    response = client.post(
+        "/predict-batch",
+        json=_body(),
+        headers={"accept": MSGPACK_MEDIA_TYPE},
+    )
+
+    assert response.status_code == 200
+    items = msgpack.unpackb(response.content)
+    assert registry.row_fallbacks == 1
+    assert [item.get("error") is None for item in items] == [True, False, True, True]
+    assert all(item["prediction"] for i, item in enumerate(items) if i != 1)
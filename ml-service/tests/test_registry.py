@@ -0,0 +1,63 @@
+"""ModelRegistry loads versions from disk without holding the LRU lock."""
+
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.models.registry import LoadedModel
+
+
+def _slow_loads(registry, monkeypatch):
+    """Make _load_version block until released; returns (started, release, calls)."""
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load_version(version_id):
+        calls.append(version_id)
+        started.set()
+        assert release.wait(5)
+        return LoadedModel(manager=registry.manager, version_id=version_id, version_label=f"v-{version_id}")
+
+    monkeypatch.setattr(registry, "_load_version", load_version)
+    return started, release, calls
+
+
+def test_load_does_not_block_lock_users(registry, monkeypatch):
+    started, release, calls = _slow_loads(registry, monkeypatch)
+    version = uuid.uuid4()
+    registry._version_paths[version] = "unused"
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(registry._select_model, version)
+        assert started.wait(5)
+        second = pool.submit(registry._select_model, version)
+
+        # Lock users answer while the load is still reading "from disk"
+        assert registry.expected_features() == registry.manager.n_features
+        assert registry.expected_features(str(version)) is None
+        assert registry.predict([0.0] * registry.manager.n_features)["prediction"]
+        assert not first.done() and not second.done()
+
+        release.set()
+        assert first.result(5)[1:] == (str(version), f"v-{version}")
+        assert second.result(5)[1:] == (str(version), f"v-{version}")
+
+    assert calls == [version]
+    assert registry.loaded_count == 1
+    assert registry._loading == {}
+
+
+def test_publish_evicts_least_recently_used(registry, monkeypatch):
+    _, release, _ = _slow_loads(registry, monkeypatch)
+    release.set()
+    registry._max_loaded = 2
+    versions = [uuid.uuid4() for _ in range(3)]
+    for version in versions:
+        registry._version_paths[version] = "unused"
+
+    registry._select_model(versions[0])
+    registry._select_model(versions[1])
+    registry._select_model(versions[0])
+    registry._select_model(versions[2])
+
+    assert list(registry._loaded) == [versions[0], versions[2]]
@@ -0,0 +1,290 @@
+"""
+AlertOutbox — fire-and-forget alert delivery for the ingestion hot path.
+
+publish() only appends the payload to an in-memory queue; a small pool of
+background senders drains it through one keep-alive HTTP client. A payload
+leaves the outbox only after backend-api accepted it, so delivery is
+at-least-once (a timed-out request that did reach the server is sent again).
+
+With a spill path configured, payloads that overflow the memory queue and
+anything still undelivered at shutdown are appended to a JSON-lines file.
+The file is replayed once the memory queue has drained, and on startup,
+streamed line by line and only up to maxsize at a time.
+
+A multi-alert batch that is rejected (any 4xx except 429, or a 5xx), or
+fails split_after times in a row, is split and its alerts are retried one
+by one, so one alert the backend cannot process does not hold back the
+rest. A batch that still fails
+after max_attempts is dead-lettered: appended to
+dead_letter_path (same JSON-lines format, never replayed automatically) or,
+without one, dropped with an error.
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AlertOutbox:
+    """Bounded alert queue drained by background senders with retry."""
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        concurrency: int = 4,
+        spill_path: Optional[str] = None,
+        max_backoff_sec: float = 30.0,
+        batch_size: int = 1,
+        max_attempts: int = 8,
+        dead_letter_path: Optional[str] = None,
+        split_after: int = 2,
+    ):
+        self._maxsize = maxsize
+        self._concurrency = max(1, concurrency)
+        self._spill_path = spill_path or None
+        self._max_backoff = max_backoff_sec
+        self._batch_size = max(1, batch_size)
+        self._max_attempts = max(1, max_attempts)
+        self._dead_letter_path = dead_letter_path or None
+        self._split_after = max(1, split_after)
+
+        self._queue: Deque[dict] = deque()
+        self._inflight: Dict[int, List[dict]] = {}
+        self._spill_pending = False
+        # Bytes of the spill file already moved back into the queue
+        self._spill_offset = 0
+        self._wakeup = asyncio.Event()
+        self._senders: list = []
+        self._send: Optional[Callable[[List[dict]], Awaitable[None]]] = None
+        self._closing = False
+
+        self.delivered = 0
+        self.retries = 0
+        self.spilled = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+        self.splits = 0
+
+    # ---- Producer side (hot path) ----
+
+    def put(self, payload: dict) -> None:
+        """Queue a payload for delivery. Never blocks, never raises."""
+        if len(self._queue) >= self._maxsize:
+            if self._spill_path:
+                self._spill([payload])
+                return
+            # No spill file: shed the oldest alert rather than block ingestion
+            self._queue.popleft()
+            self.dropped += 1
+            logger.warning("AlertOutbox full — dropped oldest pending alert")
+        self._queue.append(payload)
+        self._wakeup.set()
+
+    # ---- Lifecycle ----
+
+    def start(self, send: Callable[[List[dict]], Awaitable[None]]) -> None:
+        """Replay spilled alerts and start the sender tasks.
+
+        `send(payloads)` receives up to batch_size payloads and must raise
+        on any failure that should be retried.
+        """
+        self._send = send
+        self._replay_spill()
+        self._senders = [
+            asyncio.create_task(self._sender()) for _ in range(self._concurrency)
+        ]
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Give the senders `timeout` seconds to drain, then spill the rest."""
+        try:
+            await asyncio.wait_for(self._drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._closing = True
+        self._wakeup.set()
+        for task in self._senders:
+            task.cancel()
+        await asyncio.gather(*self._senders, return_exceptions=True)
+
+        remaining = [p for batch in self._inflight.values() for p in batch]
+        remaining += self._queue
+        self._queue.clear()
+        self._inflight.clear()
+        if self._spill_path:
+            # Replayed lines are back in `remaining`; drop them from the file
+            self._compact_spill()
+        if not remaining:
+            return
+        if self._spill_path:
+            self._spill(remaining)
+        else:
+            self.dropped += len(remaining)
+            logger.warning(f"AlertOutbox: {len(remaining)} alerts undelivered at shutdown")
+
+    async def _drain(self) -> None:
+        while self._queue or self._inflight:
+            await asyncio.sleep(0.05)
+
+    # ---- Senders ----
+
+    async def _sender(self) -> None:
+        while not self._closing:
+            if not self._queue and self._spill_pending:
+                self._replay_spill()
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Whatever has queued up goes out together, up to batch_size
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self._batch_size, len(self._queue)))
+            ]
+            token = id(batch)
+            self._inflight[token] = batch
+            try:
+                await self._deliver(batch)
+            finally:
+                self._inflight.pop(token, None)
+
+    async def _deliver(self, batch: List[dict]) -> None:
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                await self._send(batch)
+                self.delivered += len(batch)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if len(batch) > 1 and (
+                    attempt >= self._split_after or _is_rejection(exc)
+                ):
+                    self.splits += 1
+                    logger.warning(
+                        f"AlertOutbox: batch of {len(batch)} failed ({exc}); "
+                        f"retrying alerts one by one"
+                    )
+                    for payload in batch:
+                        await self._deliver([payload])
+                    return
+                if attempt == self._max_attempts:
+                    logger.error(
+                        f"AlertOutbox: giving up on {len(batch)} alert(s) after "
+                        f"{attempt} attempts ({exc})"
+                    )
+                    break
+                self.retries += 1
+                delay = min(self._max_backoff, 0.5 * 2 ** min(attempt - 1, 10))
+                logger.warning(
+                    f"AlertOutbox: delivery attempt {attempt} failed ({exc}); "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+        self._dead_letter(batch)
+
+    def _dead_letter(self, payloads: List[dict]) -> None:
+        if self._dead_letter_path and self._append(self._dead_letter_path, payloads):
+            self.dead_lettered += len(payloads)
+            return
+        self.dropped += len(payloads)
+
+    # ---- Disk spill ----
+
+    def _append(self, path: str, payloads: list) -> bool:
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                for payload in payloads:
+                    f.write(json.dumps(payload) + "\n")
+            return True
+        except OSError as e:
+            logger.error(f"AlertOutbox: write to {path} failed: {e}")
+            return False
+
+    def _spill(self, payloads: list) -> None:
+        if self._append(self._spill_path, payloads):
+            self.spilled += len(payloads)
+            self._spill_pending = not self._closing
+        else:
+            self.dropped += len(payloads)
+
+    def _replay_spill(self) -> None:
+        """Move spilled alerts back into the memory queue, up to maxsize.
+
+        Reads on from where the previous replay stopped and removes the
+        file once it has been consumed.
+        """
+        self._spill_pending = False
+        if not self._spill_path or not os.path.exists(self._spill_path):
+            return
+        replayed = 0
+        try:
+            with open(self._spill_path, "rb") as f:
+                f.seek(self._spill_offset)
+                while len(self._queue) < self._maxsize:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if not line.strip():
+                        continue
+                    try:
+                        self._queue.append(json.loads(line))
+                        replayed += 1
+                    except ValueError:
+                        self.dropped += 1
+                        logger.error("AlertOutbox: skipped corrupt line in spill file")
+                self._spill_offset = f.tell()
+                exhausted = self._spill_offset >= os.fstat(f.fileno()).st_size
+            if exhausted:
+                os.remove(self._spill_path)
+                self._spill_offset = 0
+            else:
+                self._spill_pending = True
+        except OSError as e:
+            logger.error(f"AlertOutbox: could not replay {self._spill_path}: {e}")
+            return
+        if replayed:
+            self._wakeup.set()
+            logger.info(f"AlertOutbox: replayed {replayed} spilled alerts")
+
+    def _compact_spill(self) -> None:
+        """Drop the already-replayed head of the spill file."""
+        if not self._spill_offset:
+            return
+        tmp_path = self._spill_path + ".tmp"
+        try:
+            with open(self._spill_path, "rb") as src, open(tmp_path, "wb") as dst:
+                src.seek(self._spill_offset)
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, self._spill_path)
+        except OSError as e:
+            logger.error(f"AlertOutbox: could not compact {self._spill_path}: {e}")
+        self._spill_offset = 0
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._queue),
+            "in_flight": sum(len(batch) for batch in self._inflight.values()),
+            "delivered": self.delivered,
+            "retries": self.retries,
+            "spilled": self.spilled,
+            "dropped": self.dropped,
+            "dead_lettered": self.dead_lettered,
+            "splits": self.splits,
+        }
+
+
+def _is_rejection(exc: Exception) -> bool:
+    """True for an HTTP status error the batch content may have caused.
+
+    5xx and 4xx responses, except 429: a rate limit says nothing about
+    which alert is at fault, and splitting would only send more requests.
+    """
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", 0)
+    return status >= 400 and status != 429
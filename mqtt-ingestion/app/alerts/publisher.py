@@ -1,11 +1,15 @@
 """
 AlertPublisher — sends fault prediction events to backend-api /alerts/evaluate.
 
-Uses tenacity for retry with exponential backoff.
+With an AlertOutbox attached, publish() only enqueues and background
+senders deliver with retry; otherwise the post is awaited inline, using
+tenacity for retry with exponential backoff. Both paths share one pooled
+keep-alive httpx client. In batch mode the outbox hands over everything
+queued (up to batch_size) and it goes out as one /alerts/evaluate-batch.
 """
 import logging
 from datetime import datetime, timezone
-from typing import Optional, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 import httpx
 from tenacity import (
@@ -16,6 +20,9 @@ from tenacity import (
     before_sleep_log,
 )
 
+from app.alerts.outbox import AlertOutbox
+from app.alerts.rule_index import AlertRuleIndex
+
 if TYPE_CHECKING:
     from app.ingestion.context import MessageContext
 
@@ -25,9 +32,37 @@ logger = logging.getLogger(__name__)
 class AlertPublisher:
     """Publishes fault alert events to backend-api /alerts/evaluate."""
 
-    def __init__(self, backend_api_url: str, api_key: str = ""):
+    def __init__(
+        self,
+        backend_api_url: str,
+        api_key: str = "",
+        outbox: Optional[AlertOutbox] = None,
+        max_connections: int = 10,
+        batch_size: int = 1,
+        rule_index: Optional[AlertRuleIndex] = None,
+    ):
         self.backend_api_url = backend_api_url.rstrip("/")
         self._api_key = api_key
+        self._headers = {"X-API-Key": api_key} if api_key else {}
+        self.outbox = outbox
+        self.batch_size = max(1, batch_size)
+        self.rule_index = rule_index
+        self._client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def start(self) -> None:
+        if self.outbox:
+            self.outbox.start(self.deliver)
+
+    async def close(self) -> None:
+        if self.outbox:
+            await self.outbox.close()
+        await self._client.aclose()
 
     async def publish(
         self,
@@ -39,8 +74,10 @@ class AlertPublisher:
     ) -> None:
         """Post a fault event to backend-api for rule-based evaluation.
 
-        Silently returns if context is not resolved (no tenant_id).
-        Retries up to 3 times on transport/timeout errors.
+        Silently returns if context is not resolved (no tenant_id), or if
+        the rule index shows no AlarmRule can match.
+        With an outbox this returns immediately; otherwise retries up to
+        3 times on transport/timeout errors.
         """
         if ctx is None or not ctx.is_resolved:
             logger.warning(
@@ -49,6 +86,12 @@ class AlertPublisher:
             )
             return
 
+        # No active rule in scope can fire — skip the backend round trip
+        if self.rule_index and not self.rule_index.may_match(
+            ctx.tenant_id, ctx.asset_id, ctx.sensor_id, confidence
+        ):
+            return
+
         payload = {
             "tenant_id": ctx.tenant_id_str,
             "prediction_label": prediction,
@@ -64,10 +107,12 @@ class AlertPublisher:
         if prediction_id:
             payload["prediction_id"] = prediction_id
 
-        headers = {"X-API-Key": self._api_key} if self._api_key else {}
+        if self.outbox:
+            self.outbox.put(payload)
+            return
 
         try:
-            await self._post_with_retry(payload, headers)
+            await self._post_with_retry(payload)
         except Exception as exc:
             logger.error(
                 f"AlertPublisher: failed to post to /alerts/evaluate after retries: {exc}"
@@ -80,20 +125,58 @@ class AlertPublisher:
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True,
     )
-    async def _post_with_retry(self, payload: dict, headers: dict) -> None:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.post(
-                f"{self.backend_api_url}/alerts/evaluate",
-                json=payload,
-                headers=headers,
+    async def _post_with_retry(self, payload: dict) -> None:
+        response = await self._client.post(
+            f"{self.backend_api_url}/alerts/evaluate",
+            json=payload,
+            headers=self._headers,
+        )
+        if response.status_code not in (200, 201, 202):
+            logger.warning(
+                f"AlertPublisher: /alerts/evaluate returned "
+                f"{response.status_code}: {response.text[:200]}"
             )
-            if response.status_code not in (200, 201, 202):
+        else:
+            logger.info(
+                f"AlertPublisher: alert posted successfully "
+                f"(status={response.status_code})"
+            )
+
+    async def deliver(self, payloads: List[dict]) -> None:
+        """Single delivery attempt for the outbox senders.
+
+        Raises on transport errors, timeouts, 429 and 5xx so the outbox
+        retries. Other 4xx responses also raise for a multi-alert batch, so
+        the outbox splits it and only the alert the backend rejects is
+        dropped; for a single alert they are logged and dropped here.
+        """
+        if self.batch_size > 1:
+            url = f"{self.backend_api_url}/alerts/evaluate-batch"
+            body = {"alerts": payloads}
+        else:
+            url = f"{self.backend_api_url}/alerts/evaluate"
+            body = payloads[0]
+        response = await self._client.post(url, json=body, headers=self._headers)
+        if (
+            response.status_code == 429
+            or response.status_code >= 500
+            or (len(payloads) > 1 and response.status_code >= 400)
+        ):
+            raise httpx.HTTPStatusError(
+                f"{url} returned {response.status_code}",
+                request=response.request,
+                response=response,
+            )
+        if response.status_code not in (200, 201, 202):
+            logger.warning(
+                f"AlertPublisher: {url} rejected {len(payloads)} alert(s) "
+                f"{response.status_code}: {response.text[:200]}"
+            )
+        elif self.batch_size > 1:
+            # Requests the backend could not write come back with `error`
+            failed = [r for r in response.json().get("results", []) if r.get("error")]
+            if failed:
                 logger.warning(
-                    f"AlertPublisher: /alerts/evaluate returned "
-                    f"{response.status_code}: {response.text[:200]}"
-                )
-            else:
-                logger.info(
-                    f"AlertPublisher: alert posted successfully "
-                    f"(status={response.status_code})"
+                    f"AlertPublisher: backend failed {len(failed)} of {len(payloads)} "
+                    f"alert(s) in batch: {failed[0]['error']}"
                 )
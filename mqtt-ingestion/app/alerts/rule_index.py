@@ -0,0 +1,149 @@
+"""AlertRuleIndex — per-scope probability thresholds from alarm_rules.
+
+Lets the ingestion pipeline drop predictions that cannot match any active
+AlarmRule before calling backend-api /alerts/evaluate. Scope matching and
+comparisons mirror backend-api's fetch_matching_rules/evaluate_rule:
+
+    tenant-wide rule   asset_id IS NULL and sensor_id IS NULL
+    asset rule         asset_id matches, sensor_id IS NULL
+    sensor rule        sensor_id matches
+
+Per scope only the most permissive threshold for each operator is kept,
+so the check is a handful of comparisons. Until the first successful
+refresh every prediction is let through.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SQL = """
+SELECT tenant_id, asset_id, sensor_id, comparison_operator, threshold_value
+FROM alarm_rules
+WHERE is_active = true
+  AND is_deleted = false
+  AND parameter_name = 'probability'
+"""
+
+
+class ScopeThresholds:
+    """Loosest threshold per operator for one rule scope."""
+
+    __slots__ = ("gt", "ge", "lt", "le", "eq")
+
+    def __init__(self):
+        self.gt: Optional[float] = None
+        self.ge: Optional[float] = None
+        self.lt: Optional[float] = None
+        self.le: Optional[float] = None
+        self.eq: Tuple[float, ...] = ()
+
+    def add(self, operator: str, threshold: float) -> bool:
+        if operator == ">":
+            self.gt = threshold if self.gt is None else min(self.gt, threshold)
+        elif operator == ">=":
+            self.ge = threshold if self.ge is None else min(self.ge, threshold)
+        elif operator == "<":
+            self.lt = threshold if self.lt is None else max(self.lt, threshold)
+        elif operator == "<=":
+            self.le = threshold if self.le is None else max(self.le, threshold)
+        elif operator == "==":
+            self.eq += (threshold,)
+        else:
+            # backend-api never fires rules with an unknown operator
+            return False
+        return True
+
+    def may_match(self, value: float) -> bool:
+        return (
+            (self.gt is not None and value > self.gt)
+            or (self.ge is not None and value >= self.ge)
+            or (self.lt is not None and value < self.lt)
+            or (self.le is not None and value <= self.le)
+            or any(abs(value - t) < 1e-9 for t in self.eq)
+        )
+
+
+class AlertRuleIndex:
+    """In-memory rule threshold index, refreshed from PG."""
+
+    def __init__(self, refresh_interval_sec: int = 60):
+        self._tenant: Dict[UUID, ScopeThresholds] = {}
+        self._asset: Dict[Tuple[UUID, UUID], ScopeThresholds] = {}
+        self._sensor: Dict[Tuple[UUID, UUID], ScopeThresholds] = {}
+        self._loaded = False
+        self._refresh_interval = refresh_interval_sec
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.filtered = 0
+
+    def may_match(
+        self,
+        tenant_id: UUID,
+        asset_id: Optional[UUID],
+        sensor_id: Optional[UUID],
+        probability: float,
+    ) -> bool:
+        """False only if no active rule in scope can fire for `probability`."""
+        if not self._loaded:
+            return True
+
+        scopes = [self._tenant.get(tenant_id)]
+        if asset_id is not None:
+            scopes.append(self._asset.get((tenant_id, asset_id)))
+        if sensor_id is not None:
+            scopes.append(self._sensor.get((tenant_id, sensor_id)))
+
+        for scope in scopes:
+            if scope is not None and scope.may_match(probability):
+                return True
+        self.filtered += 1
+        return False
+
+    async def refresh(self, pool: asyncpg.Pool) -> None:
+        try:
+            rows = await pool.fetch(REFRESH_SQL)
+            tenant: Dict[UUID, ScopeThresholds] = {}
+            asset: Dict[Tuple[UUID, UUID], ScopeThresholds] = {}
+            sensor: Dict[Tuple[UUID, UUID], ScopeThresholds] = {}
+            rules = 0
+            for row in rows:
+                if row["sensor_id"] is not None:
+                    scopes, key = sensor, (row["tenant_id"], row["sensor_id"])
+                elif row["asset_id"] is not None:
+                    scopes, key = asset, (row["tenant_id"], row["asset_id"])
+                else:
+                    scopes, key = tenant, row["tenant_id"]
+                thresholds = scopes.get(key) or ScopeThresholds()
+                if thresholds.add(row["comparison_operator"], row["threshold_value"]):
+                    scopes[key] = thresholds
+                    rules += 1
+            self._tenant, self._asset, self._sensor = tenant, asset, sensor
+            self._loaded = True
+            logger.debug(f"AlertRuleIndex refreshed: {rules} probability rules")
+        except Exception:
+            logger.exception("Failed to refresh AlertRuleIndex")
+
+    def start_refresh_loop(self, pool: asyncpg.Pool) -> None:
+        async def _loop():
+            while True:
+                await self.refresh(pool)
+                await asyncio.sleep(self._refresh_interval)
+
+        self._refresh_task = asyncio.create_task(_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def size(self) -> int:
+        return len(self._tenant) + len(self._asset) + len(self._sensor)
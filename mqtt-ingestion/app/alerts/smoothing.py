@@ -0,0 +1,93 @@
+"""PredictionVoter — k-of-n smoothing of window predictions before alerting.
+
+Each window_key keeps its last n votes in a small ring buffer of label
+codes (0 = normal or below the confidence threshold). The smoothed label
+is the non-normal label with at least k of those votes, else normal.
+
+An alert fires only when the smoothed label changes to a non-normal
+label. A sustained fault therefore alerts once. It re-arms when the
+fault loses its k-of-n quorum (back to normal) or another label takes
+over.
+
+At most max_keys window keys are tracked; the least recently observed
+one is dropped beyond that, so sensors that went away do not accumulate.
+A dropped key starts over with empty votes if it comes back.
+"""
+
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+
+class _VoteState:
+    __slots__ = ("ring", "head", "fired")
+
+    def __init__(self, n: int):
+        self.ring = array("H", bytes(2 * n))  # n zeroed uint16 label codes
+        self.head = 0
+        self.fired = 0  # label code currently alerted on, 0 = armed
+
+
+class PredictionVoter:
+    def __init__(self, k: int = 3, n: int = 5, max_keys: int = 100_000):
+        if not 1 <= k <= n:
+            raise ValueError(f"k-of-n smoothing needs 1 <= k <= n (got k={k}, n={n})")
+        self.k = k
+        self.n = n
+        self.max_keys = max(1, max_keys)
+        # Least recently observed first
+        self._states: "OrderedDict[str, _VoteState]" = OrderedDict()
+        self._codes: Dict[str, int] = {}
+        self._labels = [""]  # code → label; 0 is normal
+        self.suppressed = 0
+        self.evicted = 0
+
+    def _code(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = len(self._labels)
+            self._codes[label] = code
+            self._labels.append(label)
+        return code
+
+    def observe(self, key: str, label: Optional[str]) -> bool:
+        """Record one prediction for `key`; True if it should raise an alert.
+
+        `label` is the anomalous label, or None for a normal / low
+        confidence prediction.
+        """
+        state = self._states.get(key)
+        if state is None:
+            if len(self._states) >= self.max_keys:
+                self._states.popitem(last=False)
+                self.evicted += 1
+            state = self._states[key] = _VoteState(self.n)
+        else:
+            self._states.move_to_end(key)
+
+        code = self._code(label) if label else 0
+        state.ring[state.head] = code
+        state.head = (state.head + 1) % self.n
+
+        # Smoothed label: the fired label keeps priority while it holds quorum
+        if state.fired and state.ring.count(state.fired) >= self.k:
+            smoothed = state.fired
+        elif code and state.ring.count(code) >= self.k:
+            smoothed = code
+        else:
+            smoothed = 0
+
+        if smoothed and smoothed != state.fired:
+            state.fired = smoothed
+            return True
+        state.fired = smoothed
+        if code:
+            self.suppressed += 1
+        return False
+
+    def forget(self, key: str) -> None:
+        self._states.pop(key, None)
+
+    @property
+    def size(self) -> int:
+        return len(self._states)
@@ -0,0 +1,61 @@
+"""Run several mqtt-ingestion worker processes on one node.
+
+    INGESTION_WORKERS=4 python -m app.cluster
+
+Worker i is a regular uvicorn process with INGESTION_WORKER_INDEX=i on
+PORT + i. Sensor affinity is handled by SensorPartitioner; worker 0
+aggregates /health and /latest across its peers.
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import sys
+from typing import List
+
+from app.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    count = max(1, settings.INGESTION_WORKERS)
+    procs: List[subprocess.Popen] = []
+
+    for index in range(count):
+        port = settings.PORT + index
+        env = dict(
+            os.environ,
+            INGESTION_WORKERS=str(count),
+            INGESTION_WORKER_INDEX=str(index),
+            PORT=str(port),
+        )
+        procs.append(
+            subprocess.Popen(
+                [
+                    sys.executable, "-m", "uvicorn", "app.main:app",
+                    "--host", settings.HOST, "--port", str(port),
+                ],
+                env=env,
+            )
+        )
+        logger.info(f"Started ingestion worker {index}/{count} on port {port}")
+
+    def _forward(signum, _frame):
+        for proc in procs:
+            if proc.poll() is None:
+                proc.send_signal(signum)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+
+    exit_code = 0
+    for proc in procs:
+        exit_code = proc.wait() or exit_code
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
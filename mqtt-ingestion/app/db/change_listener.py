@@ -0,0 +1,93 @@
+"""CacheChangeListener — PG LISTEN on the ingestion_cache channel.
+
+backend-api migration 004 installs triggers on sensors, assets, tenants
+and asset_model_versions that pg_notify a {"table", "op", "id"} payload on
+every insert/update/delete. The listener keeps one dedicated connection
+(LISTEN cannot share a pool connection) and fans notifications out to the
+registered caches. It reconnects on its own; while it is down, caches fall
+back to polling their updated_at watermark.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Callable, List, Optional
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "ingestion_cache"
+
+ChangeCallback = Callable[[str, str, Optional[str]], None]
+
+
+class CacheChangeListener:
+    def __init__(self, dsn: str, reconnect_delay_sec: float = 5.0):
+        self._dsn = dsn
+        self._reconnect_delay = reconnect_delay_sec
+        self._callbacks: List[ChangeCallback] = []
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lost = asyncio.Event()
+
+    def subscribe(self, callback: ChangeCallback) -> None:
+        """callback(table, op, id) runs on the event loop for every change."""
+        self._callbacks.append(callback)
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            change = json.loads(payload)
+            table, op, row_id = change["table"], change["op"], change.get("id")
+        except (ValueError, KeyError):
+            logger.warning(f"Ignoring malformed {CHANNEL} notification: {payload!r}")
+            return
+        for callback in self._callbacks:
+            callback(table, op, row_id)
+
+    def _on_terminate(self, connection) -> None:
+        self._lost.set()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self._lost.clear()
+                self._conn = await asyncpg.connect(self._dsn)
+                self._conn.add_termination_listener(self._on_terminate)
+                await self._conn.add_listener(CHANNEL, self._on_notify)
+                logger.info(f"Listening for cache changes on {CHANNEL}")
+                # Changes made while disconnected were missed: let caches catch up
+                for callback in self._callbacks:
+                    callback("*", "RECONNECT", None)
+                await self._lost.wait()
+                logger.warning("Cache change listener connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"Cache change listener unavailable: {exc}")
+            await self._close_conn()
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def _close_conn(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            try:
+                await conn.close()
+            except Exception:
+                pass
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._close_conn()
@@ -0,0 +1,182 @@
+"""ChangeDrivenCache — refresh loop shared by the PG-backed registry caches.
+
+Instead of re-running the full REFRESH_SQL every interval, a cache applies
+incremental updates:
+
+- On a CacheChangeListener notification for one of its TABLES it runs a
+  delta query for rows whose updated_at is past its watermark (debounced,
+  so a bulk import becomes one query).
+- While the listener is down (or none is configured) the same delta query
+  is polled every refresh_interval_sec; while it is up, every
+  listen_poll_interval_sec, in case a notification was lost.
+- A full reload still runs every full_reload_interval_sec as a consistency
+  check, and whenever a subclass cannot apply a change incrementally.
+
+The updated_at columns on every table in TABLES come from backend-api
+migration 004. Until it has run, _watermarked() reports False, subclasses
+load without a watermark, and every refresh_interval_sec tick is a full
+reload (the pre-004 behaviour). The schema is re-checked on each full
+reload, so the cache switches over once the migration lands.
+
+The watermark query re-reads a small overlap window, because updated_at is
+set at transaction start and a slow transaction can commit after a later one.
+"""
+
+import abc
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import asyncpg
+
+from app.db.change_listener import CacheChangeListener
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+WATERMARK_COLUMNS_SQL = """
+SELECT table_name
+FROM information_schema.columns
+WHERE table_schema = current_schema()
+  AND column_name = 'updated_at'
+  AND table_name = ANY($1::text[])
+"""
+
+
+class ChangeDrivenCache(abc.ABC):
+    TABLES: Tuple[str, ...] = ()
+
+    def __init__(
+        self,
+        refresh_interval_sec: int = 60,
+        full_reload_interval_sec: int = 900,
+        debounce_ms: int = 200,
+        listen_poll_interval_sec: int = 600,
+    ):
+        self._refresh_interval = refresh_interval_sec
+        self._listen_poll_interval = listen_poll_interval_sec
+        self._full_reload_interval = full_reload_interval_sec
+        self._debounce = debounce_ms / 1000.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._listener: Optional[CacheChangeListener] = None
+        self._changed = asyncio.Event()
+        self._deleted: List[Tuple[str, str]] = []
+        self._full_reload_requested = False
+        self._watermark: Optional[datetime] = None
+        self._has_watermark_columns = False
+        # Bumped whenever cache contents change; lets derived caches
+        # (e.g. resolved contexts) invalidate without a callback
+        self.generation = 0
+
+    # ---- Subclass hooks ----
+
+    @abc.abstractmethod
+    async def refresh(self, pool: asyncpg.Pool) -> None:
+        """Reload every row and reset the watermark."""
+
+    @abc.abstractmethod
+    async def refresh_changed(self, pool: asyncpg.Pool) -> None:
+        """Apply rows changed since the watermark plus pending deletes."""
+
+    # ---- Watermark ----
+
+    async def _watermarked(self, pool: asyncpg.Pool) -> bool:
+        """True once every table in TABLES has its updated_at column."""
+        if self._has_watermark_columns:
+            return True
+        rows = await pool.fetch(WATERMARK_COLUMNS_SQL, list(self.TABLES))
+        self._has_watermark_columns = {row["table_name"] for row in rows} >= set(self.TABLES)
+        if not self._has_watermark_columns:
+            logger.warning(
+                f"{type(self).__name__}: updated_at missing on some of {', '.join(self.TABLES)} "
+                f"(backend-api migration 004 not applied) — full reload every "
+                f"{self._refresh_interval}s"
+            )
+        return self._has_watermark_columns
+
+    def _advance_watermark(self, changed_at: Optional[datetime]) -> None:
+        if changed_at is not None and (self._watermark is None or changed_at > self._watermark):
+            self._watermark = changed_at
+
+    def _delta_since(self) -> Optional[datetime]:
+        """Lower bound for the delta query; None means no full load yet."""
+        if self._watermark is None:
+            return None
+        return self._watermark - WATERMARK_OVERLAP
+
+    def _take_deleted(self) -> List[Tuple[str, str]]:
+        deleted, self._deleted = self._deleted, []
+        return deleted
+
+    # ---- Change notifications ----
+
+    def on_change(self, table: str, op: str, row_id: Optional[str]) -> None:
+        if table != "*" and table not in self.TABLES:
+            return
+        if op == "DELETE" and row_id:
+            self._deleted.append((table, row_id))
+        self._changed.set()
+
+    # ---- Loop ----
+
+    def start_refresh_loop(
+        self,
+        pool: asyncpg.Pool,
+        listener: Optional[CacheChangeListener] = None,
+    ) -> None:
+        """Start the background task; expects refresh() to have run once."""
+        self._listener = listener
+        if listener:
+            listener.subscribe(self.on_change)
+
+        async def _loop():
+            loop = asyncio.get_running_loop()
+            last_full = loop.time()
+            while True:
+                until_full = max(0.0, self._full_reload_interval - (loop.time() - last_full))
+                listening = (
+                    self._listener is not None
+                    and self._listener.connected
+                    and self._watermark is not None
+                )
+                poll = self._listen_poll_interval if listening else self._refresh_interval
+                timeout = min(until_full, poll)
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+                    # Let a burst of notifications collapse into one query
+                    await asyncio.sleep(self._debounce)
+                except asyncio.TimeoutError:
+                    pass
+                self._changed.clear()
+
+                if (
+                    self._full_reload_requested
+                    or self._watermark is None
+                    or loop.time() - last_full >= self._full_reload_interval
+                ):
+                    self._full_reload_requested = False
+                    self._deleted.clear()
+                    await self.refresh(pool)
+                    last_full = loop.time()
+                else:
+                    try:
+                        await self.refresh_changed(pool)
+                    except Exception:
+                        logger.exception(
+                            f"{type(self).__name__}: incremental refresh failed, "
+                            f"falling back to full reload"
+                        )
+                        self._full_reload_requested = True
+                        self._changed.set()
+
+        self._refresh_task = asyncio.create_task(_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
@@ -1,16 +1,192 @@
 import logging
-from typing import Dict, List, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
+class _RollingWindow:
+    """Ring buffer for one sensor: a view into a WindowSlab slot."""
+
+    __slots__ = ("buffer", "head", "count", "slot", "last_seen")
+
+    def __init__(self, buffer: np.ndarray, slot: int = -1):
+        self.buffer = buffer
+        self.slot = slot
+        self.last_seen = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        self.head = 0
+        self.count = 0
+
+    def push(self, row: np.ndarray) -> None:
+        size = self.buffer.shape[0]
+        if self.count < size:
+            self.count += 1
+        self.buffer[self.head] = row
+        self.head = (self.head + 1) % size
+
+    @property
+    def is_full(self) -> bool:
+        return self.count == self.buffer.shape[0]
+
+    def ordered(self) -> np.ndarray:
+        """Readings oldest → newest."""
+        if not self.is_full:
+            return self.buffer[: self.count].copy()
+        return np.roll(self.buffer, -self.head, axis=0)
+
+
+class WindowSlab:
+    """Preallocated NumPy slab of sensor windows with LRU/TTL slot eviction.
+
+    One contiguous (capacity, window_size, n_features) array holds every
+    sensor's readings; a slot table keyed on MessageContext.window_key maps
+    sensors to rows. Capacity is derived from max_bytes. When the slab is
+    full the least recently updated sensor is evicted, and sensors idle
+    for longer than idle_ttl_sec are released as new readings arrive.
+    """
+
+    def __init__(
+        self,
+        window_size: int,
+        n_features: int,
+        max_bytes: int,
+        idle_ttl_sec: Optional[float] = None,
+        dtype: Any = np.float64,
+    ):
+        self.dtype = np.dtype(dtype)
+        self.bytes_per_slot = window_size * n_features * self.dtype.itemsize
+        self.capacity = max(1, int(max_bytes) // self.bytes_per_slot)
+        self.idle_ttl_sec = idle_ttl_sec or None
+
+        self._buffers = np.zeros((self.capacity, window_size, n_features), dtype=self.dtype)
+
+        # Least recently updated first
+        self._slots: "OrderedDict[str, _RollingWindow]" = OrderedDict()
+        self._free: List[int] = list(range(self.capacity - 1, -1, -1))
+
+        self.evicted_lru = 0
+        self.evicted_idle = 0
+
+    def get(self, key: str) -> Optional[_RollingWindow]:
+        return self._slots.get(key)
+
+    def acquire(self, key: str, now: Optional[float] = None) -> _RollingWindow:
+        """Return the window for key, allocating (and evicting) a slot if needed."""
+        now = time.monotonic() if now is None else now
+        self.evict_idle(now)
+
+        window = self._slots.get(key)
+        if window is not None:
+            self._slots.move_to_end(key)
+            window.last_seen = now
+            return window
+
+        if not self._free:
+            evicted_key, evicted = self._slots.popitem(last=False)
+            self._free.append(evicted.slot)
+            self.evicted_lru += 1
+            logger.warning(
+                f"Window slab full ({self.capacity} slots) — evicted LRU sensor {evicted_key}"
+            )
+
+        slot = self._free.pop()
+        window = _RollingWindow(self._buffers[slot], slot=slot)
+        window.last_seen = now
+        self._slots[key] = window
+        return window
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Release slots not updated within idle_ttl_sec. Returns the count."""
+        if not self.idle_ttl_sec:
+            return 0
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.idle_ttl_sec
+
+        evicted = 0
+        while self._slots:
+            key, window = next(iter(self._slots.items()))
+            if window.last_seen >= cutoff:
+                break
+            self._slots.popitem(last=False)
+            self._free.append(window.slot)
+            evicted += 1
+
+        if evicted:
+            self.evicted_idle += evicted
+            logger.info(f"Window slab released {evicted} idle sensor(s)")
+        return evicted
+
+    def release(self, key: str) -> None:
+        window = self._slots.pop(key, None)
+        if window is not None:
+            self._free.append(window.slot)
+
+    def clear(self) -> None:
+        self._slots.clear()
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def stats(self) -> Dict[str, Any]:
+        used = len(self._slots)
+        return {
+            "backend": "slab",
+            "dtype": self.dtype.name,
+            "slots_used": used,
+            "slots_total": self.capacity,
+            "bytes_per_slot": self.bytes_per_slot,
+            "bytes_used": used * self.bytes_per_slot,
+            "bytes_allocated": self.capacity * self.bytes_per_slot,
+            "evicted_lru": self.evicted_lru,
+            "evicted_idle": self.evicted_idle,
+        }
+
+
 class SlidingWindowManager:
-    """Manages per-sensor sliding window buffers for feature engineering."""
+    """Manages per-sensor sliding window buffers for feature engineering.
 
-    def __init__(self, window_size: int = 14):
+    Backends:
+        "list" — dict of Python lists per sensor (original behaviour).
+        "slab" — WindowSlab: one preallocated NumPy array with a memory cap
+                 and LRU/TTL eviction of idle sensors.
+
+    Either way a full window is featurized by
+    extract_statistical_features_batch, the single statistics path.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 14,
+        backend: str = "list",
+        n_features: int = 24,
+        max_bytes: int = 256 * 1024 * 1024,
+        idle_ttl_sec: Optional[float] = None,
+        dtype: Any = np.float64,
+    ):
         self.window_size = window_size
+        self.backend = backend
         # Key: sensor_id (str) — Phase 3B changes to (tenant_id, asset_id, sensor_id)
         self._windows: Dict[str, List[List[float]]] = {}
+        self._slab: Optional[WindowSlab] = None
+
+        if backend == "slab":
+            self._slab = WindowSlab(
+                window_size=window_size,
+                n_features=n_features,
+                max_bytes=max_bytes,
+                idle_ttl_sec=idle_ttl_sec,
+                dtype=dtype,
+            )
+            logger.info(
+                f"Window slab allocated: {self._slab.capacity} slots "
+                f"({self._slab.dtype.name}, {self._slab.bytes_per_slot} B/slot)"
+            )
+        elif backend != "list":
+            raise ValueError(f"Unknown sliding window backend: {backend!r}")
 
     def add_reading(self, sensor_id: str, features: List[float]) -> Optional[List[List[float]]]:
         """
@@ -19,6 +195,16 @@ class SlidingWindowManager:
         Returns the full window (list of readings) if the buffer has reached
         window_size, otherwise returns None.
         """
+        if self._slab is not None:
+            rolling = self._slab.acquire(sensor_id)
+            rolling.push(np.asarray(features, dtype=np.float64))
+            if rolling.is_full:
+                return rolling.ordered().tolist()
+            logger.info(
+                f"Window building for {sensor_id}: {rolling.count}/{self.window_size} readings"
+            )
+            return None
+
         if sensor_id not in self._windows:
             self._windows[sensor_id] = []
             logger.info(f"Initialized sliding window for sensor: {sensor_id}")
@@ -38,7 +224,27 @@ class SlidingWindowManager:
         )
         return None
 
+    def seed(self, sensor_id: str, readings: List[List[float]]) -> None:
+        """Preload a sensor's window with historical readings (oldest first).
+
+        Used by warm start; replaces whatever the sensor already holds.
+        """
+        readings = readings[-self.window_size:]
+        if not readings:
+            return
+
+        if self._slab is not None:
+            self.clear(sensor_id)
+            rolling = self._slab.acquire(sensor_id)
+            for features in readings:
+                rolling.push(np.asarray(features, dtype=np.float64))
+        else:
+            self._windows[sensor_id] = [list(features) for features in readings]
+
     def get_window(self, sensor_id: str) -> Optional[List[List[float]]]:
+        rolling = self._slab.get(sensor_id) if self._slab is not None else None
+        if rolling is not None and rolling.is_full:
+            return rolling.ordered().tolist()
         window = self._windows.get(sensor_id)
         if window and len(window) >= self.window_size:
             return list(window)
@@ -46,6 +252,19 @@ class SlidingWindowManager:
 
     def clear(self, sensor_id: str) -> None:
         self._windows.pop(sensor_id, None)
+        if self._slab is not None:
+            self._slab.release(sensor_id)
 
     def clear_all(self) -> None:
         self._windows.clear()
+        if self._slab is not None:
+            self._slab.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Slot usage and memory footprint, reported on /health."""
+        if self._slab is not None:
+            return self._slab.stats()
+        return {
+            "backend": "list",
+            "slots_used": len(self._windows),
+        }
@@ -0,0 +1,169 @@
+"""AsyncioMQTTDriver — runs paho's network I/O on the asyncio event loop.
+
+Replaces loop_start()'s background thread: the socket is registered with
+loop.add_reader/add_writer, so on_message runs on the event loop and can
+enqueue straight into the IngressQueue. No thread hop, no
+run_coroutine_threadsafe future per message.
+
+Flow control: each readable event processes up to read_batch packets.
+Once the ingress queue is saturated, the driver stops reading the socket
+until it drains. Unread data then backs up into TCP and the broker's
+in-flight window.
+
+Delivery: paho-mqtt 1.6 has no manual acknowledgement and sends the QoS1
+PUBACK as soon as on_message returns, i.e. once the message is enqueued,
+not once it is handled. QoS1 only makes the broker redeliver messages
+that never reached on_message; it is not end-to-end at-least-once.
+Queued messages are lost with the process, and the "drop_oldest" and
+"drop_raw_first" overload policies can shed them.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Optional
+
+import paho.mqtt.client as mqtt
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncioMQTTDriver:
+    def __init__(
+        self,
+        client: mqtt.Client,
+        loop: asyncio.AbstractEventLoop,
+        read_batch: int = 64,
+        is_saturated: Callable[[], bool] = lambda: False,
+        reconnect_delay_sec: float = 2.0,
+    ):
+        self.client = client
+        self.loop = loop
+        self.read_batch = max(1, read_batch)
+        self.is_saturated = is_saturated
+        self.reconnect_delay = reconnect_delay_sec
+
+        self._fd = None
+        self._paused = False
+        self._stopping = False
+        self._misc_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+
+    # ---- Lifecycle ----
+
+    async def connect(self, host: str, port: int, keepalive: int = 60) -> None:
+        # The blocking TCP connect runs off-loop; socket callbacks hop back
+        await self.loop.run_in_executor(None, self.client.connect, host, port, keepalive)
+
+    async def disconnect(self) -> None:
+        self._stopping = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        self.client.disconnect()
+        if self._misc_task:
+            self._misc_task.cancel()
+            try:
+                await self._misc_task
+            except asyncio.CancelledError:
+                pass
+
+    # ---- paho socket callbacks (may fire off-loop during connect) ----
+    # The fd is captured here: by the time a deferred call runs on the loop,
+    # paho may already have closed the socket (fileno() == -1).
+
+    def _on_loop(self, callback, fd: int) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            callback(fd)
+        else:
+            self.loop.call_soon_threadsafe(callback, fd)
+
+    def _on_socket_open(self, client, userdata, sock) -> None:
+        self._on_loop(self._attach, sock.fileno())
+
+    def _on_socket_close(self, client, userdata, sock) -> None:
+        self._on_loop(self._detach, sock.fileno())
+
+    def _on_socket_register_write(self, client, userdata, sock) -> None:
+        self._on_loop(self._add_writer, sock.fileno())
+
+    def _on_socket_unregister_write(self, client, userdata, sock) -> None:
+        self._on_loop(self._remove_writer, sock.fileno())
+
+    # ---- Event loop side ----
+
+    def _attach(self, fd: int) -> None:
+        self._fd = fd
+        self._paused = False
+        self.loop.add_reader(fd, self._on_readable)
+        if self._misc_task is None or self._misc_task.done():
+            self._misc_task = self.loop.create_task(self._misc_loop())
+
+    def _detach(self, fd: int) -> None:
+        self.loop.remove_reader(fd)
+        self.loop.remove_writer(fd)
+        if self._fd == fd:
+            self._fd = None
+        if not self._stopping and (
+            self._reconnect_task is None or self._reconnect_task.done()
+        ):
+            self._reconnect_task = self.loop.create_task(self._reconnect())
+
+    def _add_writer(self, fd: int) -> None:
+        if self._fd == fd:
+            self.loop.add_writer(fd, self._on_writable)
+
+    def _remove_writer(self, fd: int) -> None:
+        if self._fd == fd:
+            self.loop.remove_writer(fd)
+
+    def _on_readable(self) -> None:
+        for _ in range(self.read_batch):
+            if self._fd is None:
+                return
+            if self.client.loop_read() != mqtt.MQTT_ERR_SUCCESS:
+                return
+            if self.is_saturated():
+                self._pause()
+                return
+
+    def _on_writable(self) -> None:
+        self.client.loop_write()
+
+    def _pause(self) -> None:
+        if self._paused or self._fd is None:
+            return
+        self._paused = True
+        self.loop.remove_reader(self._fd)
+        self.loop.call_later(0.01, self._maybe_resume)
+
+    def _maybe_resume(self) -> None:
+        if not self._paused or self._fd is None:
+            return
+        if self.is_saturated():
+            self.loop.call_later(0.01, self._maybe_resume)
+            return
+        self._paused = False
+        self.loop.add_reader(self._fd, self._on_readable)
+
+    async def _misc_loop(self) -> None:
+        """Keepalive pings and timeouts (what loop_start's thread did)."""
+        while not self._stopping:
+            self.client.loop_misc()
+            await asyncio.sleep(1)
+
+    async def _reconnect(self) -> None:
+        while not self._stopping:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self.loop.run_in_executor(None, self.client.reconnect)
+                return
+            except Exception as e:
+                logger.warning(f"MQTT reconnect failed: {e}")
@@ -1,50 +1,67 @@
-"""MessageContext — tenant/site/asset/sensor context resolved for each MQTT message."""
+"""MessageContext — tenant/site/asset/sensor context resolved for each MQTT message.
+
+Contexts are immutable and carry their string forms and window key
+precomputed, so SensorRegistryCache can build one per topic and hand the
+same object to every message on that topic.
+"""
 
-from dataclasses import dataclass, field
 from typing import Optional
 from uuid import UUID
 
 
-@dataclass
+def _str(value: Optional[UUID]) -> Optional[str]:
+    return str(value) if value else None
+
+
 class MessageContext:
     """Full multi-tenant context for a single MQTT message."""
-    tenant_id: Optional[UUID] = None
-    tenant_code: Optional[str] = None
-    site_id: Optional[UUID] = None
-    site_code: Optional[str] = None
-    asset_id: Optional[UUID] = None
-    sensor_id: Optional[UUID] = None
-    sensor_code: Optional[str] = None
-    model_version_id: Optional[UUID] = None
-
-    @property
-    def is_resolved(self) -> bool:
-        """True if the context was resolved from the sensor registry."""
-        return self.tenant_id is not None and self.sensor_id is not None
-
-    @property
-    def window_key(self) -> str:
-        """Key for the sliding window manager."""
-        if self.is_resolved:
-            return f"{self.tenant_id}:{self.asset_id}:{self.sensor_id}"
-        return self.sensor_code or "unknown"
-
-    @property
-    def tenant_id_str(self) -> Optional[str]:
-        return str(self.tenant_id) if self.tenant_id else None
-
-    @property
-    def site_id_str(self) -> Optional[str]:
-        return str(self.site_id) if self.site_id else None
-
-    @property
-    def asset_id_str(self) -> Optional[str]:
-        return str(self.asset_id) if self.asset_id else None
-
-    @property
-    def sensor_id_str(self) -> Optional[str]:
-        return str(self.sensor_id) if self.sensor_id else None
-
-    @property
-    def model_version_id_str(self) -> Optional[str]:
-        return str(self.model_version_id) if self.model_version_id else None
+
+    __slots__ = (
+        "tenant_id", "tenant_code", "site_id", "site_code", "asset_id",
+        "sensor_id", "sensor_code", "model_version_id",
+        "is_resolved", "window_key",
+        "tenant_id_str", "site_id_str", "asset_id_str", "sensor_id_str",
+        "model_version_id_str",
+    )
+
+    def __init__(
+        self,
+        tenant_id: Optional[UUID] = None,
+        tenant_code: Optional[str] = None,
+        site_id: Optional[UUID] = None,
+        site_code: Optional[str] = None,
+        asset_id: Optional[UUID] = None,
+        sensor_id: Optional[UUID] = None,
+        sensor_code: Optional[str] = None,
+        model_version_id: Optional[UUID] = None,
+    ):
+        init = object.__setattr__
+        init(self, "tenant_id", tenant_id)
+        init(self, "tenant_code", tenant_code)
+        init(self, "site_id", site_id)
+        init(self, "site_code", site_code)
+        init(self, "asset_id", asset_id)
+        init(self, "sensor_id", sensor_id)
+        init(self, "sensor_code", sensor_code)
+        init(self, "model_version_id", model_version_id)
+
+        # True if the context was resolved from the sensor registry
+        is_resolved = tenant_id is not None and sensor_id is not None
+        init(self, "is_resolved", is_resolved)
+        # Key for the sliding window manager
+        init(
+            self,
+            "window_key",
+            f"{tenant_id}:{asset_id}:{sensor_id}" if is_resolved else (sensor_code or "unknown"),
+        )
+        init(self, "tenant_id_str", _str(tenant_id))
+        init(self, "site_id_str", _str(site_id))
+        init(self, "asset_id_str", _str(asset_id))
+        init(self, "sensor_id_str", _str(sensor_id))
+        init(self, "model_version_id_str", _str(model_version_id))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"MessageContext is immutable (cannot set {name!r})")
+
+    def __repr__(self) -> str:
+        return f"MessageContext(window_key={self.window_key!r}, sensor_code={self.sensor_code!r})"
@@ -0,0 +1,283 @@
+"""IngressQueue — bounded hand-off from the paho network thread to asyncio workers.
+
+Overload policies (when the queue is full):
+    block          — the paho thread waits for a free slot (TCP backpressure
+                     to the broker).
+    drop_oldest    — the oldest queued message is discarded.
+    drop_raw_first — the oldest raw-only message (one that feeds no
+                     prediction) is discarded; if none is queued the
+                     oldest message is discarded instead.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_POLICIES = ("block", "drop_oldest", "drop_raw_first")
+
+
+class IngressItem:
+    __slots__ = (
+        "topic", "payload", "raw_only", "key", "features", "enqueued_at", "seq",
+        "permit",
+    )
+
+    def __init__(
+        self,
+        topic: str,
+        payload: dict,
+        raw_only: bool,
+        key: str = "",
+        features: Optional[Tuple[float, ...]] = None,
+    ):
+        self.topic = topic
+        self.payload = payload
+        self.raw_only = raw_only
+        self.key = key
+        self.features = features
+        self.enqueued_at = time.monotonic()
+        self.seq = 0
+        # True if the item holds a "block"-policy slot permit
+        self.permit = False
+
+
+class IngressQueue:
+    """Bounded FIFO fed from a foreign thread and consumed on the event loop.
+
+    Raw-only and prediction-feeding messages sit in separate deques so
+    drop_raw_first can shed raw telemetry without scanning; get() merges
+    them back in arrival order by sequence number.
+    """
+
+    def __init__(self, maxsize: int, policy: str = "block"):
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy!r}")
+        self.maxsize = maxsize
+        self.policy = policy
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._windowed: Deque[IngressItem] = deque()
+        self._raw: Deque[IngressItem] = deque()
+        self._getters: Deque[asyncio.Future] = deque()
+        self._seq = 0
+        self._unfinished = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = False
+
+        # Only used by the "block" policy: one permit per free queue slot
+        self._slots = threading.BoundedSemaphore(maxsize)
+
+        self.dropped: Dict[str, int] = {"oldest": 0, "raw": 0, "closed": 0}
+        self._processed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    # ---- Producer side (paho thread) ----
+
+    def submit_threadsafe(self, item: IngressItem) -> bool:
+        """Hand an item to the event loop. Returns False if it was dropped."""
+        if self._closed or self._loop is None:
+            self.dropped["closed"] += 1
+            return False
+
+        if self.policy == "block":
+            while not self._slots.acquire(timeout=0.5):
+                if self._closed:
+                    self.dropped["closed"] += 1
+                    return False
+            item.permit = True
+
+        self._loop.call_soon_threadsafe(self._put, item)
+        return True
+
+    def submit(self, item: IngressItem) -> bool:
+        """Enqueue from the event loop thread (asyncio MQTT transport).
+
+        The transport stops reading the socket while full() is true, so
+        "block" is enforced upstream and never blocks the loop here.
+        """
+        if self._closed:
+            self.dropped["closed"] += 1
+            return False
+        self._put(item)
+        return True
+
+    # ---- Event loop side ----
+
+    def _put(self, item: IngressItem) -> None:
+        if self.policy != "block" and self.qsize() >= self.maxsize:
+            self._shed()
+
+        self._seq += 1
+        item.seq = self._seq
+        (self._raw if item.raw_only else self._windowed).append(item)
+        self._unfinished += 1
+        self._idle.clear()
+
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                break
+
+    def _shed(self) -> None:
+        if self.policy == "drop_raw_first" and self._raw:
+            self._raw.popleft()
+            self.dropped["raw"] += 1
+        else:
+            self._pop_oldest()
+            self.dropped["oldest"] += 1
+        self._task_done()
+
+    def _pop_oldest(self) -> IngressItem:
+        if not self._raw:
+            return self._windowed.popleft()
+        if not self._windowed:
+            return self._raw.popleft()
+        if self._raw[0].seq < self._windowed[0].seq:
+            return self._raw.popleft()
+        return self._windowed.popleft()
+
+    async def get(self) -> IngressItem:
+        while not self.qsize():
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            await getter
+
+        item = self._pop_oldest()
+        if item.permit:
+            self._slots.release()
+
+        waited = time.monotonic() - item.enqueued_at
+        self._processed += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        return item
+
+    def _task_done(self) -> None:
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._idle.set()
+
+    def task_done(self) -> None:
+        self._task_done()
+
+    async def join(self) -> None:
+        await self._idle.wait()
+
+    def close(self) -> None:
+        """Stop accepting items and release a producer blocked on a full queue."""
+        self._closed = True
+
+    def qsize(self) -> int:
+        return len(self._windowed) + len(self._raw)
+
+    def full(self) -> bool:
+        return self.qsize() >= self.maxsize
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.qsize(),
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "in_flight": self._unfinished - self.qsize(),
+            "processed": self._processed,
+            "dropped": dict(self.dropped),
+            "wait_ms_avg": round(
+                self._wait_total / self._processed * 1000, 3
+            ) if self._processed else 0.0,
+            "wait_ms_max": round(self._wait_max * 1000, 3),
+        }
+
+
+def _mix32(h: int) -> int:
+    """murmur3 finalizer: spreads every input bit over the low bits.
+
+    SensorPartitioner picks the worker process with crc32(key) % workers.
+    Taking the shard from the same low bits (or from the crc of a salted
+    key — CRC is linear, so a prefix only XORs a constant in) would tie
+    shards to the process and leave most of them unused.
+    """
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    return h ^ (h >> 16)
+
+
+class ShardedIngressQueue:
+    """N IngressQueues, one per worker, selected by a stable hash of item.key.
+
+    Every message for a sensor lands on the same shard and is handled by a
+    single worker, so per-sensor arrival order (which the sliding windows
+    rely on) is preserved while different sensors run concurrently. The
+    overall bound is split evenly across shards.
+    """
+
+    def __init__(self, n_shards: int, maxsize: int, policy: str = "block"):
+        n_shards = max(1, n_shards)
+        per_shard = max(1, maxsize // n_shards)
+        self.shards: List[IngressQueue] = [
+            IngressQueue(per_shard, policy) for _ in range(n_shards)
+        ]
+        self.policy = policy
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        for shard in self.shards:
+            shard.bind(loop)
+
+    def shard_for(self, key: str) -> IngressQueue:
+        return self.shards[_mix32(zlib.crc32(key.encode())) % len(self.shards)]
+
+    def submit_threadsafe(self, item: IngressItem) -> bool:
+        return self.shard_for(item.key).submit_threadsafe(item)
+
+    def submit(self, item: IngressItem) -> bool:
+        return self.shard_for(item.key).submit(item)
+
+    def full(self) -> bool:
+        """True if any shard is full (the transport cannot read selectively)."""
+        return any(shard.full() for shard in self.shards)
+
+    async def join(self) -> None:
+        await asyncio.gather(*(shard.join() for shard in self.shards))
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+
+    def qsize(self) -> int:
+        return sum(shard.qsize() for shard in self.shards)
+
+    def stats(self) -> Dict[str, Any]:
+        shard_stats = [shard.stats() for shard in self.shards]
+        processed = sum(s["processed"] for s in shard_stats)
+        dropped: Dict[str, int] = {}
+        for s in shard_stats:
+            for reason, count in s["dropped"].items():
+                dropped[reason] = dropped.get(reason, 0) + count
+        return {
+            "depth": self.qsize(),
+            "maxsize": sum(s["maxsize"] for s in shard_stats),
+            "policy": self.policy,
+            "shards": len(self.shards),
+            "shard_depths": [s["depth"] for s in shard_stats],
+            "in_flight": sum(s["in_flight"] for s in shard_stats),
+            "processed": processed,
+            "dropped": dropped,
+            "wait_ms_avg": round(
+                sum(s["wait_ms_avg"] * s["processed"] for s in shard_stats) / processed, 3
+            ) if processed else 0.0,
+            "wait_ms_max": max(s["wait_ms_max"] for s in shard_stats),
+        }
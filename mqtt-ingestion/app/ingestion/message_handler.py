@@ -5,27 +5,79 @@ Flow:  raw payload → resolve context → store raw → feature extraction
        → ML prediction → store reading → alert
 """
 
+import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
+
+from prometheus_client import CollectorRegistry
 
 from app.config import settings
 from app.features.extractors import (
     extract_24_features_from_data,
-    extract_statistical_features_from_window,
+    extract_statistical_features_batch,
 )
 from app.features.sliding_window import SlidingWindowManager
 from app.prediction.ml_client import MLClient
 from app.storage.telemetry_writer import TelemetryWriter
 from app.storage.prediction_writer import PredictionWriter
 from app.alerts.publisher import AlertPublisher
+from app.alerts.smoothing import PredictionVoter
 from app.ingestion.sensor_registry import SensorRegistryCache
 from app.ingestion.topic_parser import parse_topic
 from app.ingestion.context import MessageContext
+from app.metrics import PipelineMetrics
 from app.prediction.model_binding import ModelBindingCache
 
 logger = logging.getLogger(__name__)
 
+COMPLEX_SENSOR = "complex"
+SIMPLE_SENSOR = "simple"
+
+
+class _WindowFeatureBatch:
+    """Coalesces windows that fill up in the same event loop tick.
+
+    Ingress workers share one loop; every window completed before the
+    scheduled flush runs is featurized by a single
+    extract_statistical_features_batch call, and each caller awaits its
+    own 336-feature row.
+    """
+
+    def __init__(self):
+        self._pending: List[Tuple[List[List[float]], asyncio.Future]] = []
+        self.calls = 0
+        self.windows = 0
+
+    def extract(self, window: List[List[float]]) -> "asyncio.Future[List[float]]":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush)
+        self._pending.append((window, future))
+        return future
+
+    def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        try:
+            rows = extract_statistical_features_batch([window for window, _ in batch])
+        except Exception:
+            # One malformed window must not cost the others their features
+            rows = None
+        self.calls += 1
+        self.windows += len(batch)
+        for i, (window, future) in enumerate(batch):
+            if future.done():
+                continue
+            try:
+                row = rows[i] if rows is not None else (
+                    extract_statistical_features_batch([window])[0]
+                )
+                future.set_result(row.tolist())
+            except Exception as exc:
+                future.set_exception(exc)
+
 
 class MessageHandler:
     """Processes each MQTT message through the ingestion pipeline."""
@@ -39,6 +91,8 @@ class MessageHandler:
         alert_publisher: AlertPublisher,
         sensor_registry: Optional[SensorRegistryCache] = None,
         model_binding_cache: Optional[ModelBindingCache] = None,
+        alert_voter: Optional[PredictionVoter] = None,
+        metrics: Optional[PipelineMetrics] = None,
     ):
         self.window_manager = window_manager
         self.ml_client = ml_client
@@ -47,102 +101,158 @@ class MessageHandler:
         self.alert_publisher = alert_publisher
         self.sensor_registry = sensor_registry
         self.model_binding_cache = model_binding_cache
+        self.alert_voter = alert_voter
+        self.metrics = metrics or PipelineMetrics(CollectorRegistry())
+        self._window_features = _WindowFeatureBatch()
+
+    @staticmethod
+    def sensor_kind(data: dict) -> Optional[str]:
+        """COMPLEX_SENSOR (24-feature window), SIMPLE_SENSOR or None (raw only)."""
+        if "motor_DE_vib_band_1" in data:
+            return COMPLEX_SENSOR
+        if "sensor_id" in data and any(
+            key in data for key in ("temperature", "vibration", "pressure", "humidity")
+        ):
+            return SIMPLE_SENSOR
+        return None
+
+    @staticmethod
+    def is_raw_only(data: dict) -> bool:
+        """True if the payload is only stored as raw telemetry (no prediction)."""
+        return MessageHandler.sensor_kind(data) is None
 
-    def _resolve_context(self, topic: str, data: dict) -> MessageContext:
+    @staticmethod
+    def ordering_key(topic: str, data: dict) -> str:
+        """Per-sensor key used to keep a sensor's messages in arrival order.
+
+        Same sensor_code → same window_key, so sharding on it keeps each
+        sliding window on a single worker.
+        """
+        parsed = parse_topic(topic)
+        if parsed:
+            return parsed.sensor_code
+        return str(data.get("sensor_id") or topic)
+
+    def resolve_context(self, topic: str, data: dict) -> MessageContext:
         """Resolve full tenant/site/asset/sensor context from topic + registry."""
+        if self.sensor_registry:
+            ctx = self.sensor_registry.resolve(topic, self.model_binding_cache)
+            if ctx is not None:
+                return ctx
+            return MessageContext(sensor_code=data.get("sensor_id"))
+
         parsed = parse_topic(topic)
         if not parsed:
             return MessageContext(sensor_code=data.get("sensor_id"))
-
-        ctx = MessageContext(
+        return MessageContext(
             sensor_code=parsed.sensor_code,
             tenant_code=parsed.tenant_code,
             site_code=parsed.site_code,
         )
 
-        # Try to enrich from sensor registry
-        if self.sensor_registry:
-            binding = self.sensor_registry.lookup(parsed.sensor_code)
-            if binding:
-                ctx.tenant_id = binding.tenant_id
-                ctx.tenant_code = binding.tenant_code
-                ctx.site_id = binding.site_id
-                ctx.site_code = binding.site_code
-                ctx.asset_id = binding.asset_id
-                ctx.sensor_id = binding.sensor_id
-
-                # Resolve model version for this asset
-                if self.model_binding_cache and binding.asset_id:
-                    mb = self.model_binding_cache.lookup(binding.asset_id)
-                    if mb:
-                        ctx.model_version_id = mb.model_version_id
-            else:
-                logger.warning(
-                    f"Sensor '{parsed.sensor_code}' not found in registry, "
-                    f"processing without tenant context"
-                )
-
-        return ctx
+    async def handle(
+        self,
+        topic: str,
+        data: dict,
+        features: Optional[Sequence[float]] = None,
+    ) -> None:
+        """Run the pipeline for one message.
 
-    async def handle(self, topic: str, data: dict) -> None:
+        `features` are the 24 window features when the decoder's fast path
+        already extracted them; otherwise they are taken from `data`.
+        Each stage's latency and the message outcome go to self.metrics.
+        """
+        metrics = self.metrics
+        tenant: Optional[str] = None
         try:
             timestamp = datetime.utcnow()
+            t = time.perf_counter()
 
             # 0. Resolve tenant context
-            ctx = self._resolve_context(topic, data)
+            ctx = self.resolve_context(topic, data)
+            tenant = ctx.tenant_code
+            t = metrics.stage("resolve", t, tenant)
 
             # 1. Store raw telemetry
             await self.telemetry_writer.write(topic, data, timestamp, ctx)
+            t = metrics.stage("raw_write", t, tenant)
 
             # 2. Feature extraction + prediction
             prediction: Optional[str] = None
             confidence: float = 0.0
+            kind = self.sensor_kind(data)
+            complex_sensor = kind == COMPLEX_SENSOR
+            simple_sensor = kind == SIMPLE_SENSOR
 
-            if "motor_DE_vib_band_1" in data:
+            if complex_sensor:
                 prediction, confidence = await self._handle_complex_sensor(
-                    data, timestamp, ctx
+                    data, timestamp, ctx, features
                 )
-            elif "sensor_id" in data and any(
-                key in data
-                for key in ("temperature", "vibration", "pressure", "humidity")
-            ):
+            elif simple_sensor:
                 prediction, confidence = await self._handle_simple_sensor(data, ctx)
+            t = time.perf_counter()
 
             # 3. Store structured reading
-            if "sensor_id" in data and "motor_DE_vib_band_1" not in data:
+            if "sensor_id" in data and not complex_sensor:
                 await self.prediction_writer.write_simple_reading(
                     data, topic, timestamp, prediction, confidence, ctx
                 )
-            elif "motor_DE_vib_band_1" in data:
+                t = metrics.stage("reading_write", t, tenant)
+            elif complex_sensor:
                 sensor_reading = await self.prediction_writer.write_complex_reading(
                     data, topic, timestamp, prediction, confidence, ctx
                 )
+                t = metrics.stage("reading_write", t, tenant)
 
                 # 4. Trigger alert if anomaly
-                if (
+                anomalous = bool(
                     prediction
                     and prediction.lower() != "normal"
                     and confidence > settings.ALERT_CONFIDENCE_THRESHOLD
-                ):
+                )
+                if self.alert_voter and prediction:
+                    anomalous = self.alert_voter.observe(
+                        ctx.window_key, prediction if anomalous else None
+                    )
+                if anomalous:
                     _pred_id = str(sensor_reading.get("_id", "")) or None
                     await self.alert_publisher.publish(
                         prediction, confidence, sensor_reading, ctx,
                         prediction_id=_pred_id,
                     )
+                    metrics.stage("alert", t, tenant)
+
+            if prediction is not None:
+                metrics.outcome("predicted", tenant)
+            elif complex_sensor or simple_sensor:
+                metrics.outcome("no_prediction", tenant)
+            else:
+                metrics.outcome("raw_only", tenant)
 
         except Exception as e:
+            metrics.outcome("error", tenant)
             logger.error(f"Error storing data: {e}", exc_info=True)
 
     async def _handle_complex_sensor(
-        self, data: dict, timestamp: datetime, ctx: MessageContext
+        self,
+        data: dict,
+        timestamp: datetime,
+        ctx: MessageContext,
+        current_features: Optional[Sequence[float]] = None,
     ) -> tuple[Optional[str], float]:
         sensor_key = ctx.window_key
 
-        current_features = extract_24_features_from_data(data)
-        window = self.window_manager.add_reading(sensor_key, current_features)
+        t = time.perf_counter()
+        if current_features is None:
+            current_features = extract_24_features_from_data(data)
+        features: Optional[List[float]] = None
 
+        window = self.window_manager.add_reading(sensor_key, current_features)
         if window is not None:
-            features = extract_statistical_features_from_window(window)
+            features = await self._window_features.extract(window)
+        t = self.metrics.stage("features", t, ctx.tenant_code)
+
+        if features is not None:
             logger.info(
                 f"Making prediction with {len(features)} statistical features "
                 f"for {sensor_key}"
@@ -154,6 +264,7 @@ class MessageHandler:
                 asset_id=ctx.asset_id_str,
                 model_version_id=ctx.model_version_id_str,
             )
+            self.metrics.stage("predict", t, ctx.tenant_code)
             if result:
                 prediction = result.get("prediction")
                 confidence = result.get("confidence", 0.0)
@@ -176,12 +287,14 @@ class MessageHandler:
         ]
         features.extend([0.0] * (336 - len(features)))
 
+        t = time.perf_counter()
         result = await self.ml_client.predict(
             features,
             tenant_id=ctx.tenant_id_str,
             asset_id=ctx.asset_id_str,
             model_version_id=ctx.model_version_id_str,
         )
+        self.metrics.stage("predict", t, ctx.tenant_code)
         if result:
             prediction = result.get("prediction")
             confidence = result.get("confidence", 0.0)
@@ -2,38 +2,62 @@
 Thin MQTT client — connect/disconnect/subscribe and dispatch messages to MessageHandler.
 """
 
-import json
 import logging
 import asyncio
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Union
 
 import paho.mqtt.client as mqtt
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from app.ingestion.asyncio_transport import AsyncioMQTTDriver
+from app.ingestion.decoder import decode_payload
 from app.ingestion.message_handler import MessageHandler
+from app.ingestion.ingress_queue import IngressItem, IngressQueue, ShardedIngressQueue
+from app.ingestion.partitioning import SensorPartitioner
 from app.ingestion.sensor_registry import SensorRegistryCache
+from app.ingestion.warm_start import rehydrate_windows
 from app.prediction.model_binding import ModelBindingCache
 from app.features.sliding_window import SlidingWindowManager
 from app.prediction.ml_client import MLClient
 from app.storage.telemetry_writer import TelemetryWriter
 from app.storage.prediction_writer import PredictionWriter
+from app.storage.bulk_buffer import BulkWriteBuffer
+from app.streaming.hub import StreamHub
+from app.alerts.outbox import AlertOutbox
 from app.alerts.publisher import AlertPublisher
+from app.alerts.rule_index import AlertRuleIndex
+from app.alerts.smoothing import PredictionVoter
+from app.metrics import PipelineMetrics
 
 logger = logging.getLogger(__name__)
 
 
 class MQTTClient:
-    def __init__(self, broker_host: str, broker_port: int, topics: List[str]):
+    def __init__(
+        self,
+        broker_host: str,
+        broker_port: int,
+        topics: List[str],
+        partitioner: Optional[SensorPartitioner] = None,
+    ):
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.topics = topics
+        self.partitioner = partitioner
 
-        self.client = mqtt.Client()
+        if partitioner and partitioner.mode == "shared":
+            # Shared subscriptions ($share/...) are an MQTT v5 feature
+            self.client = mqtt.Client(
+                client_id=f"mqtt-ingestion-{partitioner.index}",
+                protocol=mqtt.MQTTv5,
+            )
+        else:
+            self.client = mqtt.Client()
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
         self.client.on_disconnect = self._on_disconnect
 
-        self.latest_data: Dict = {}
         self.message_count: int = 0
         self.connected: bool = False
 
@@ -42,15 +66,26 @@ class MQTTClient:
         self.loop = None
 
         self.handler: Optional[MessageHandler] = None
+        self.ingress: Optional[Union[IngressQueue, ShardedIngressQueue]] = None
+        self._driver: Optional[AsyncioMQTTDriver] = None
+        self._workers: List[asyncio.Task] = []
+        self.write_buffer: Optional[BulkWriteBuffer] = None
         self.ml_client_instance: Optional[MLClient] = None
+        self.alert_publisher: Optional[AlertPublisher] = None
+        self.stream_hub: Optional[StreamHub] = None
 
     async def connect(
         self,
         sensor_registry: Optional[SensorRegistryCache] = None,
         model_binding_cache: Optional[ModelBindingCache] = None,
+        alert_rule_index: Optional[AlertRuleIndex] = None,
+        stream_hub: Optional[StreamHub] = None,
+        metrics: Optional[PipelineMetrics] = None,
     ) -> None:
         from app.config import settings
 
+        self.stream_hub = stream_hub
+
         self.loop = asyncio.get_event_loop()
 
         # MongoDB
@@ -59,83 +94,268 @@ class MQTTClient:
         logger.info("Connected to MongoDB")
 
         # Build the processing pipeline
-        window_manager = SlidingWindowManager(window_size=14)
+        window_manager = SlidingWindowManager(
+            window_size=14,
+            backend=settings.WINDOW_BACKEND,
+            max_bytes=settings.WINDOW_SLAB_MAX_MB * 1024 * 1024,
+            idle_ttl_sec=settings.WINDOW_IDLE_TTL_SEC,
+            dtype=settings.WINDOW_SLAB_DTYPE,
+        )
 
         self.ml_client_instance = MLClient(
             base_url=settings.ML_SERVICE_URL,
             api_key=getattr(settings, "ML_API_KEY", ""),
+            batch_enabled=settings.ML_BATCH_ENABLED,
+            max_batch=settings.ML_BATCH_MAX_SIZE,
+            max_delay_ms=settings.ML_BATCH_MAX_DELAY_MS,
+            binary=settings.ML_BINARY_ENABLED,
         )
 
-        telemetry_writer = TelemetryWriter(self.db)
-        prediction_writer = PredictionWriter(self.db)
+        if settings.MONGO_BULK_WRITES_ENABLED:
+            self.write_buffer = BulkWriteBuffer(
+                self.db,
+                max_docs=settings.MONGO_BULK_MAX_DOCS,
+                flush_interval_ms=settings.MONGO_BULK_FLUSH_INTERVAL_MS,
+                write_concerns=settings.MONGO_BULK_WRITE_CONCERN,
+                max_pending_docs=settings.MONGO_BULK_MAX_PENDING_DOCS,
+                max_inflight_flushes=settings.MONGO_BULK_MAX_INFLIGHT_FLUSHES,
+                max_retries=settings.MONGO_BULK_MAX_RETRIES,
+            )
+            self.write_buffer.start()
+
+        telemetry_writer = TelemetryWriter(self.db, buffer=self.write_buffer)
+        prediction_writer = PredictionWriter(self.db, buffer=self.write_buffer)
 
-        alert_publisher = AlertPublisher(
+        alert_batch_size = settings.ALERT_BATCH_MAX_SIZE if settings.ALERT_BATCH_ENABLED else 1
+        alert_outbox = None
+        if settings.ALERT_OUTBOX_ENABLED:
+            alert_outbox = AlertOutbox(
+                maxsize=settings.ALERT_OUTBOX_MAXSIZE,
+                concurrency=settings.ALERT_OUTBOX_CONCURRENCY,
+                spill_path=settings.ALERT_OUTBOX_SPILL_PATH,
+                batch_size=alert_batch_size,
+                max_attempts=settings.ALERT_OUTBOX_MAX_ATTEMPTS,
+                dead_letter_path=settings.ALERT_OUTBOX_DEAD_LETTER_PATH,
+            )
+        self.alert_publisher = AlertPublisher(
             backend_api_url=settings.BACKEND_API_URL,
             api_key=settings.INTERNAL_API_KEY,
+            outbox=alert_outbox,
+            max_connections=settings.ALERT_OUTBOX_CONCURRENCY,
+            batch_size=alert_batch_size,
+            rule_index=alert_rule_index,
         )
+        self.alert_publisher.start()
 
         self.handler = MessageHandler(
             window_manager=window_manager,
             ml_client=self.ml_client_instance,
             telemetry_writer=telemetry_writer,
             prediction_writer=prediction_writer,
-            alert_publisher=alert_publisher,
+            alert_publisher=self.alert_publisher,
             sensor_registry=sensor_registry,
             model_binding_cache=model_binding_cache,
+            alert_voter=(
+                PredictionVoter(
+                    k=settings.ALERT_SMOOTHING_K,
+                    n=settings.ALERT_SMOOTHING_N,
+                    max_keys=settings.ALERT_SMOOTHING_MAX_SENSORS,
+                )
+                if settings.ALERT_SMOOTHING_ENABLED else None
+            ),
+            metrics=metrics,
         )
 
+        if settings.MQTT_SUBSCRIBE_QOS >= 1 and settings.INGRESS_OVERLOAD_POLICY != "block":
+            logger.warning(
+                f"MQTT_SUBSCRIBE_QOS={settings.MQTT_SUBSCRIBE_QOS} with ingress policy "
+                f"'{settings.INGRESS_OVERLOAD_POLICY}': messages are acked on enqueue, "
+                f"not on handling, and may still be shed under overload"
+            )
+
+        # Bounded ingress queue + worker pool (paho thread → event loop).
+        # Ordered mode: one shard + one worker per slot, keyed by sensor.
+        if settings.INGRESS_ORDERED_BY_SENSOR:
+            self.ingress = ShardedIngressQueue(
+                n_shards=settings.INGRESS_WORKERS,
+                maxsize=settings.INGRESS_QUEUE_MAXSIZE,
+                policy=settings.INGRESS_OVERLOAD_POLICY,
+            )
+            queues = self.ingress.shards
+        else:
+            self.ingress = IngressQueue(
+                maxsize=settings.INGRESS_QUEUE_MAXSIZE,
+                policy=settings.INGRESS_OVERLOAD_POLICY,
+            )
+            queues = [self.ingress] * settings.INGRESS_WORKERS
+        self.ingress.bind(self.loop)
+        self._workers = [asyncio.create_task(self._worker(queue)) for queue in queues]
+
+        # Seed windows before subscribing so live readings append after history
+        if settings.WINDOW_WARM_START:
+            await rehydrate_windows(
+                self.db,
+                self.handler,
+                settings.WINDOW_WARM_START_LOOKBACK_SEC,
+                owns=self.partitioner.owns if self.partitioner else None,
+                timeout_sec=settings.WINDOW_WARM_START_TIMEOUT_SEC,
+            )
+
         # MQTT
-        self.client.connect(self.broker_host, self.broker_port, 60)
-        self.client.loop_start()
+        if settings.MQTT_TRANSPORT == "asyncio":
+            self._driver = AsyncioMQTTDriver(
+                self.client,
+                self.loop,
+                read_batch=settings.MQTT_READ_BATCH,
+                is_saturated=self.ingress.full,
+            )
+            await self._driver.connect(self.broker_host, self.broker_port, 60)
+        else:
+            self.client.connect(self.broker_host, self.broker_port, 60)
+            self.client.loop_start()
         logger.info(f"Connected to MQTT broker: {self.broker_host}:{self.broker_port}")
 
     async def disconnect(self) -> None:
-        self.client.loop_stop()
-        self.client.disconnect()
+        if self.ingress:
+            self.ingress.close()
+        if self._driver:
+            await self._driver.disconnect()
+        else:
+            self.client.loop_stop()
+            self.client.disconnect()
+        if self.ingress:
+            try:
+                await asyncio.wait_for(self.ingress.join(), timeout=10)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Ingress queue not drained on shutdown "
+                    f"({self.ingress.qsize()} messages discarded)"
+                )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self.write_buffer:
+            await self.write_buffer.close()
         if self.ml_client_instance:
             await self.ml_client_instance.close()
+        if self.alert_publisher:
+            await self.alert_publisher.close()
         if self.mongo_client:
             self.mongo_client.close()
         logger.info("Disconnected from MQTT broker and MongoDB")
 
-    def _on_connect(self, client, userdata, flags, rc):
+    def _on_connect(self, client, userdata, flags, rc, properties=None):
+        from app.config import settings
+
         if rc == 0:
             self.connected = True
             logger.info("Connected to MQTT broker")
-            for topic in self.topics:
-                client.subscribe(topic)
+            topics = (
+                self.partitioner.subscriptions(self.topics)
+                if self.partitioner else self.topics
+            )
+            for topic in topics:
+                client.subscribe(topic, qos=settings.MQTT_SUBSCRIBE_QOS)
                 logger.info(f"Subscribed to: {topic}")
         else:
             logger.error(f"Connection failed with code {rc}")
 
     def _on_message(self, client, userdata, msg):
         try:
-            payload = json.loads(msg.payload.decode())
             topic = msg.topic
+            owned = True
 
-            self.latest_data[topic] = {
-                "data": payload,
-                "timestamp": __import__("datetime").datetime.utcnow().isoformat(),
-                "topic": topic,
-            }
-            self.message_count += 1
+            if self.partitioner:
+                routed = self.partitioner.inbound(topic)
+                if routed is None:
+                    return
+                topic, forwarded = routed
+                if not forwarded:
+                    owner = self.partitioner.owner(topic, msg.payload)
+                    if owner != self.partitioner.index:
+                        if self.partitioner.mode == "shared":
+                            client.publish(
+                                self.partitioner.forward_topic(owner, topic),
+                                msg.payload,
+                                qos=msg.qos,
+                            )
+                            return
+                        # Hash mode: every worker sees every message, so each
+                        # still streams all sensors even if it only ingests
+                        # its own slice
+                        owned = False
+                        if not self.stream_hub:
+                            return
 
-            if self.loop and self.handler:
-                asyncio.run_coroutine_threadsafe(
-                    self.handler.handle(topic, payload), self.loop
+            decoded = decode_payload(msg.payload)
+            payload = decoded.data
+
+            if owned:
+                self.message_count += 1
+
+            # Ingestion first: a streaming failure must not drop the message
+            if owned and self.ingress and self.handler:
+                # asyncio transport: already on the event loop thread
+                submit = (
+                    self.ingress.submit if self._driver
+                    else self.ingress.submit_threadsafe
+                )
+                submit(
+                    IngressItem(
+                        topic,
+                        payload,
+                        raw_only=MessageHandler.is_raw_only(payload),
+                        key=MessageHandler.ordering_key(topic, payload),
+                        features=decoded.features,
+                    )
                 )
 
             logger.debug(f"Received message on {topic}")
         except Exception as e:
             logger.error(f"Error processing message: {e}")
+            return
 
-    def _on_disconnect(self, client, userdata, rc):
+        if self.stream_hub:
+            try:
+                self.stream_hub.publish(
+                    topic,
+                    payload,
+                    datetime.utcnow().isoformat(),
+                )
+            except Exception as e:
+                logger.error(f"Error publishing {topic} to stream: {e}")
+
+    async def _worker(self, queue: IngressQueue) -> None:
+        while True:
+            item = await queue.get()
+            try:
+                await self.handler.handle(item.topic, item.payload, item.features)
+            finally:
+                queue.task_done()
+
+    def _on_disconnect(self, client, userdata, rc, properties=None):
         self.connected = False
         if rc != 0:
             logger.warning("Unexpected disconnection")
 
-    def get_latest_data(self) -> Dict:
-        return self.latest_data
+    def get_latest_data(self, tenant_id: Optional[str] = None) -> Dict:
+        """Latest value per topic, for one tenant (plus unresolved topics) or all."""
+        if not self.stream_hub:
+            return {}
+        if tenant_id:
+            return self.stream_hub.store.snapshot(tenant_id)
+        return self.stream_hub.store.all_tenants()
+
+    def ingress_stats(self) -> Dict:
+        return self.ingress.stats() if self.ingress else {}
+
+    def write_buffer_stats(self) -> Dict:
+        return self.write_buffer.stats() if self.write_buffer else {}
+
+    def alert_outbox_stats(self) -> Dict:
+        if self.alert_publisher and self.alert_publisher.outbox:
+            return self.alert_publisher.outbox.stats()
+        return {}
 
     def is_connected(self) -> bool:
         return self.connected
@@ -0,0 +1,82 @@
+"""SensorPartitioner — sensor affinity for multi-process ingestion.
+
+Each worker process owns the sensors whose ordering key hashes to its
+index, so every sliding window lives in exactly one process.
+
+Modes:
+    hash   — every worker subscribes to MQTT_TOPICS and ignores messages
+             for sensors it does not own (decided from the topic alone, before
+             JSON decoding). Keeps strict per-sensor arrival order.
+    shared — workers subscribe via MQTT v5 shared subscriptions
+             ($share/<group>/<topic>) so the broker load-balances delivery;
+             a message for a sensor owned by another worker is republished
+             to that worker's internal topic <forward_prefix>/<index>/fwd/<topic>
+             (the "fwd" level keeps it clear of the default MQTT_TOPICS
+             wildcards such as +/+/sensors/#).
+             Forwarded messages take one extra broker hop, so they can
+             overtake or trail direct deliveries for the same sensor.
+"""
+
+import json
+import zlib
+from typing import List, Optional, Tuple
+
+from app.ingestion.message_handler import MessageHandler
+from app.ingestion.topic_parser import parse_topic
+
+PARTITION_MODES = ("hash", "shared")
+
+
+class SensorPartitioner:
+    def __init__(
+        self,
+        worker_index: int,
+        worker_count: int,
+        mode: str = "hash",
+        shared_group: str = "aastreli-ingestion",
+        forward_prefix: str = "ingest-internal",
+    ):
+        if mode not in PARTITION_MODES:
+            raise ValueError(f"Unknown partition mode: {mode!r}")
+        self.index = worker_index
+        self.count = worker_count
+        self.mode = mode
+        self.shared_group = shared_group
+        self._forward_prefix = forward_prefix.rstrip("/") + "/"
+        self._own_prefix = f"{self._forward_prefix}{worker_index}/fwd/"
+
+    def subscriptions(self, topics: List[str]) -> List[str]:
+        if self.mode == "hash":
+            return list(topics)
+        subs = [f"$share/{self.shared_group}/{topic}" for topic in topics]
+        subs.append(f"{self._own_prefix}#")
+        return subs
+
+    def inbound(self, topic: str) -> Optional[Tuple[str, bool]]:
+        """Return (original topic, was_forwarded_to_us).
+
+        None means the message is another worker's forwarded traffic that
+        matched one of our wildcard subscriptions and must be ignored.
+        """
+        if topic.startswith(self._own_prefix):
+            return topic[len(self._own_prefix):], True
+        if topic.startswith(self._forward_prefix):
+            return None
+        return topic, False
+
+    def owner(self, topic: str, payload: bytes) -> int:
+        """Worker index that owns the message's sensor."""
+        parsed = parse_topic(topic)
+        if parsed:
+            key = parsed.sensor_code
+        else:
+            # Legacy topics carry the sensor only in the payload
+            key = MessageHandler.ordering_key(topic, json.loads(payload))
+        return zlib.crc32(key.encode()) % self.count
+
+    def owns(self, topic: str, data: dict) -> bool:
+        key = MessageHandler.ordering_key(topic, data)
+        return zlib.crc32(key.encode()) % self.count == self.index
+
+    def forward_topic(self, owner: int, topic: str) -> str:
+        return f"{self._forward_prefix}{owner}/fwd/{topic}"
@@ -1,21 +1,32 @@
 """SensorRegistryCache — maps sensor_code → tenant/site/asset context.
 
-Refreshed periodically from PostgreSQL so mqtt-ingestion can resolve
-MQTT topic sensor codes into full multi-tenant context without
-per-message DB lookups.
+Loaded from PostgreSQL so mqtt-ingestion can resolve MQTT topic sensor
+codes into full multi-tenant context without per-message DB lookups.
+Resolved MessageContexts are cached by raw topic, so a repeat topic costs
+one dict lookup; that cache is dropped whenever this registry or the model
+binding cache changes.
+Kept current incrementally (see ChangeDrivenCache): change notifications
+or an updated_at watermark select the affected sensors, and only those
+rows are re-read.
 """
 
-import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 from uuid import UUID
 
 import asyncpg
 
+from app.db.incremental_cache import ChangeDrivenCache
+from app.ingestion.context import MessageContext
+from app.ingestion.topic_parser import parse_topic
+
+if TYPE_CHECKING:
+    from app.prediction.model_binding import ModelBindingCache
+
 logger = logging.getLogger(__name__)
 
-REFRESH_SQL = """
+_SELECT = """
 SELECT
     s.sensor_code,
     s.id        AS sensor_id,
@@ -24,11 +35,18 @@ SELECT
     a.site_id,
     si.site_code,
     s.asset_id,
-    s.gateway_id
+    s.gateway_id,
+    {changed_at} AS changed_at,
+    (s.is_active AND NOT s.is_deleted
+     AND a.is_active AND NOT a.is_deleted
+     AND t.is_active AND NOT t.is_deleted) AS live
 FROM sensors s
 JOIN tenants t  ON t.id = s.tenant_id
 JOIN assets  a  ON a.id = s.asset_id
 JOIN sites   si ON si.id = a.site_id
+"""
+
+_LIVE = """
 WHERE s.is_active  = true
   AND s.is_deleted = false
   AND a.is_active  = true
@@ -37,6 +55,27 @@ WHERE s.is_active  = true
   AND t.is_deleted = false
 """
 
+_CHANGED_AT = "GREATEST(s.updated_at, a.updated_at, t.updated_at)"
+
+REFRESH_SQL = _SELECT.format(changed_at=_CHANGED_AT) + _LIVE
+
+# Before backend-api migration 004 adds tenants.updated_at: no watermark
+UNWATERMARKED_REFRESH_SQL = _SELECT.format(changed_at="NULL::timestamptz") + _LIVE
+
+# Sensors touched since $1 directly or through their asset or tenant;
+# inactive rows are returned too (live = false) so they can be dropped
+CHANGED_SQL = """
+WITH changed AS (
+    SELECT id FROM sensors WHERE updated_at > $1
+    UNION
+    SELECT s.id FROM sensors s JOIN assets a ON a.id = s.asset_id WHERE a.updated_at > $1
+    UNION
+    SELECT s.id FROM sensors s JOIN tenants t ON t.id = s.tenant_id WHERE t.updated_at > $1
+)
+""" + _SELECT.format(changed_at=_CHANGED_AT) + """
+WHERE s.id IN (SELECT id FROM changed)
+"""
+
 
 @dataclass(frozen=True)
 class SensorBinding:
@@ -49,54 +88,147 @@ class SensorBinding:
     gateway_id: Optional[UUID]
 
 
-class SensorRegistryCache:
+def _binding(row) -> SensorBinding:
+    return SensorBinding(
+        sensor_id=row["sensor_id"],
+        tenant_id=row["tenant_id"],
+        tenant_code=row["tenant_code"],
+        site_id=row["site_id"],
+        site_code=row["site_code"],
+        asset_id=row["asset_id"],
+        gateway_id=row["gateway_id"],
+    )
+
+
+class SensorRegistryCache(ChangeDrivenCache):
     """In-memory lookup from sensor_code to SensorBinding, refreshed from PG."""
 
-    def __init__(self, refresh_interval_sec: int = 60):
+    TABLES = ("sensors", "assets", "tenants")
+
+    def __init__(
+        self,
+        refresh_interval_sec: int = 60,
+        full_reload_interval_sec: int = 900,
+        max_cached_topics: int = 100_000,
+        listen_poll_interval_sec: int = 600,
+    ):
+        super().__init__(
+            refresh_interval_sec,
+            full_reload_interval_sec,
+            listen_poll_interval_sec=listen_poll_interval_sec,
+        )
         self._cache: Dict[str, SensorBinding] = {}
-        self._refresh_interval = refresh_interval_sec
-        self._refresh_task: Optional[asyncio.Task] = None
+        self._code_by_id: Dict[UUID, str] = {}
+        self._contexts: Dict[str, MessageContext] = {}
+        self._contexts_generation = 0
+        self._contexts_model_generation = 0
+        self._max_cached_topics = max_cached_topics
 
     def lookup(self, sensor_code: str) -> Optional[SensorBinding]:
         return self._cache.get(sensor_code)
 
+    def resolve(
+        self,
+        topic: str,
+        model_bindings: Optional["ModelBindingCache"] = None,
+    ) -> Optional[MessageContext]:
+        """Shared MessageContext for a topic, or None if it cannot be parsed."""
+        model_generation = model_bindings.generation if model_bindings else 0
+        if (
+            self._contexts_generation != self.generation
+            or self._contexts_model_generation != model_generation
+        ):
+            self._contexts = {}
+            self._contexts_generation = self.generation
+            self._contexts_model_generation = model_generation
+
+        ctx = self._contexts.get(topic)
+        if ctx is not None:
+            return ctx
+
+        parsed = parse_topic(topic)
+        if not parsed:
+            return None
+
+        binding = self._cache.get(parsed.sensor_code)
+        if binding:
+            model_version_id = None
+            if model_bindings and binding.asset_id:
+                mb = model_bindings.lookup(binding.asset_id)
+                if mb:
+                    model_version_id = mb.model_version_id
+            ctx = MessageContext(
+                tenant_id=binding.tenant_id,
+                tenant_code=binding.tenant_code,
+                site_id=binding.site_id,
+                site_code=binding.site_code,
+                asset_id=binding.asset_id,
+                sensor_id=binding.sensor_id,
+                sensor_code=parsed.sensor_code,
+                model_version_id=model_version_id,
+            )
+        else:
+            # Logged once per topic until the registry next changes
+            logger.warning(
+                f"Sensor '{parsed.sensor_code}' not found in registry, "
+                f"processing without tenant context"
+            )
+            ctx = MessageContext(
+                sensor_code=parsed.sensor_code,
+                tenant_code=parsed.tenant_code,
+                site_code=parsed.site_code,
+            )
+
+        if len(self._contexts) >= self._max_cached_topics:
+            self._contexts = {}
+        self._contexts[topic] = ctx
+        return ctx
+
     async def refresh(self, pool: asyncpg.Pool) -> None:
         """Reload the full sensor→context mapping from PG."""
         try:
-            rows = await pool.fetch(REFRESH_SQL)
+            watermarked = await self._watermarked(pool)
+            rows = await pool.fetch(REFRESH_SQL if watermarked else UNWATERMARKED_REFRESH_SQL)
             new_cache: Dict[str, SensorBinding] = {}
             for row in rows:
-                binding = SensorBinding(
-                    sensor_id=row["sensor_id"],
-                    tenant_id=row["tenant_id"],
-                    tenant_code=row["tenant_code"],
-                    site_id=row["site_id"],
-                    site_code=row["site_code"],
-                    asset_id=row["asset_id"],
-                    gateway_id=row["gateway_id"],
-                )
-                new_cache[row["sensor_code"]] = binding
+                new_cache[row["sensor_code"]] = _binding(row)
+                self._advance_watermark(row["changed_at"])
             self._cache = new_cache
+            self._code_by_id = {b.sensor_id: code for code, b in new_cache.items()}
+            self.generation += 1
             logger.debug(f"SensorRegistryCache refreshed: {len(new_cache)} sensors")
         except Exception:
             logger.exception("Failed to refresh SensorRegistryCache")
 
-    def start_refresh_loop(self, pool: asyncpg.Pool) -> None:
-        """Start a background task that refreshes the cache periodically."""
-        async def _loop():
-            while True:
-                await self.refresh(pool)
-                await asyncio.sleep(self._refresh_interval)
-
-        self._refresh_task = asyncio.create_task(_loop())
-
-    async def stop(self) -> None:
-        if self._refresh_task:
-            self._refresh_task.cancel()
-            try:
-                await self._refresh_task
-            except asyncio.CancelledError:
-                pass
+    def _remove(self, sensor_id: UUID) -> None:
+        code = self._code_by_id.pop(sensor_id, None)
+        if code is not None:
+            binding = self._cache.get(code)
+            if binding is not None and binding.sensor_id == sensor_id:
+                del self._cache[code]
+
+    async def refresh_changed(self, pool: asyncpg.Pool) -> None:
+        """Apply sensors changed since the watermark, plus notified deletes."""
+        deleted = self._take_deleted()
+        for table, row_id in deleted:
+            # Asset/tenant deletes cascade to sensors, which notify on their own
+            if table == "sensors":
+                self._remove(UUID(row_id))
+
+        rows = await pool.fetch(CHANGED_SQL, self._delta_since())
+        for row in rows:
+            sensor_id, code = row["sensor_id"], row["sensor_code"]
+            if not row["live"] or self._code_by_id.get(sensor_id, code) != code:
+                self._remove(sensor_id)
+            if row["live"]:
+                # Replace in place: concurrent lookups never see a gap
+                self._cache[code] = _binding(row)
+                self._code_by_id[sensor_id] = code
+            self._advance_watermark(row["changed_at"])
+        if rows or deleted:
+            self.generation += 1
+        if rows:
+            logger.debug(f"SensorRegistryCache: applied {len(rows)} changed sensors")
 
     @property
     def size(self) -> int:
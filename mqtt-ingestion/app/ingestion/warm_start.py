@@ -0,0 +1,88 @@
+"""Warm start — rehydrate sliding windows from recent raw telemetry.
+
+After a restart every sensor would otherwise need window_size fresh
+readings before the first prediction. For each topic with readings in the
+lookback window, the most recent window_size payloads are read with one
+indexed query (`{topic: 1, timestamp: -1}`, see
+database/init/init-mongo.js), a few topics at a time. They are resolved to window keys exactly like live
+messages and seeded into the SlidingWindowManager before the MQTT
+subscription starts.
+
+Off by default (WINDOW_WARM_START). Subscription waits at most
+WINDOW_WARM_START_TIMEOUT_SEC; sensors not seeded by then start cold.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Optional
+
+from app.features.extractors import extract_24_features_from_data
+
+if TYPE_CHECKING:
+    from app.ingestion.message_handler import MessageHandler
+
+logger = logging.getLogger(__name__)
+
+
+async def rehydrate_windows(
+    db,
+    handler: "MessageHandler",
+    lookback_sec: int,
+    owns: Optional[Callable[[str, dict], bool]] = None,
+    timeout_sec: float = 10.0,
+    concurrency: int = 16,
+) -> int:
+    """Seed handler.window_manager from sensor_data. Returns sensors seeded.
+
+    In multi-process mode `owns(topic, data)` limits seeding to the sensors
+    this worker is responsible for.
+    """
+    window_manager = handler.window_manager
+    since = datetime.utcnow() - timedelta(seconds=lookback_sec)
+    limit = asyncio.Semaphore(max(1, concurrency))
+    seeded = 0
+
+    async def _seed(topic: str) -> None:
+        nonlocal seeded
+        async with limit:
+            cursor = (
+                db.sensor_data.find(
+                    {
+                        "topic": topic,
+                        "timestamp": {"$gte": since},
+                        "data.motor_DE_vib_band_1": {"$exists": True},
+                    },
+                    {"data": 1, "_id": 0},
+                )
+                .sort("timestamp", -1)
+                .limit(window_manager.window_size)
+            )
+            recent = [doc["data"] async for doc in cursor]
+        if not recent or (owns and not owns(topic, recent[0])):
+            return
+        # Newest first from the query; windows are oldest first
+        readings = [extract_24_features_from_data(data) for data in reversed(recent)]
+        ctx = handler.resolve_context(topic, recent[0])
+        window_manager.seed(ctx.window_key, readings)
+        seeded += 1
+
+    async def _seed_all() -> None:
+        # Only topics with readings inside the lookback; the rest would find nothing
+        topics = await db.sensor_data.distinct("topic", {"timestamp": {"$gte": since}})
+        await asyncio.gather(*(_seed(topic) for topic in topics if topic))
+
+    try:
+        await asyncio.wait_for(_seed_all(), timeout=timeout_sec)
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"Sliding window warm start timed out after {timeout_sec}s — "
+            f"{seeded} sensors seeded, the rest start cold"
+        )
+        return seeded
+    except Exception:
+        logger.exception("Sliding window warm start failed — continuing cold")
+        return seeded
+
+    logger.info(f"Warm start: rehydrated sliding windows for {seeded} sensors")
+    return seeded
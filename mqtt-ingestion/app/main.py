@@ -1,61 +1,129 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI
+import httpx
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
 
 from app.ingestion.mqtt_client import MQTTClient
+from app.ingestion.partitioning import SensorPartitioner
 from app.ingestion.sensor_registry import SensorRegistryCache
 from app.prediction.model_binding import ModelBindingCache
+from app.alerts.rule_index import AlertRuleIndex
+from app.db.change_listener import CacheChangeListener
 from app.db.postgres import init_pg_pool, close_pg_pool
+from app.metrics import IngestionCollector, PipelineMetrics
+from app.streaming.hub import StreamHub
+from app.streaming.latest_store import LatestValueStore
 from app.streaming.websocket import router as ws_router
 from app.config import settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+metrics_registry = CollectorRegistry()
+pipeline_metrics = PipelineMetrics(metrics_registry, tenant_label=settings.METRICS_TENANT_LABEL)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting MQTT Ingestion Service...")
 
-    # PostgreSQL read pool (for sensor registry + model bindings)
+    # PostgreSQL read pool (for sensor registry, model bindings, alarm rules)
     pg_pool = await init_pg_pool(settings.POSTGRES_DSN)
 
-    # Caches — populate once, then auto-refresh in background
-    sensor_registry = SensorRegistryCache(refresh_interval_sec=60)
+    # Caches — populate once, then apply changes in the background
+    cache_listener = None
+    if settings.CACHE_LISTEN_ENABLED:
+        cache_listener = CacheChangeListener(settings.POSTGRES_DSN)
+
+    sensor_registry = SensorRegistryCache(
+        refresh_interval_sec=settings.CACHE_DELTA_POLL_SEC,
+        full_reload_interval_sec=settings.CACHE_FULL_RELOAD_SEC,
+        listen_poll_interval_sec=settings.CACHE_LISTEN_POLL_SEC,
+    )
     await sensor_registry.refresh(pg_pool)
-    sensor_registry.start_refresh_loop(pg_pool)
+    sensor_registry.start_refresh_loop(pg_pool, listener=cache_listener)
 
-    model_binding_cache = ModelBindingCache(refresh_interval_sec=60)
+    model_binding_cache = ModelBindingCache(
+        refresh_interval_sec=settings.CACHE_DELTA_POLL_SEC,
+        full_reload_interval_sec=settings.CACHE_FULL_RELOAD_SEC,
+        listen_poll_interval_sec=settings.CACHE_LISTEN_POLL_SEC,
+    )
     await model_binding_cache.refresh(pg_pool)
-    model_binding_cache.start_refresh_loop(pg_pool)
+    model_binding_cache.start_refresh_loop(pg_pool, listener=cache_listener)
+
+    if cache_listener:
+        cache_listener.start()
+
+    alert_rule_index = None
+    if settings.ALERT_PREFILTER_ENABLED:
+        alert_rule_index = AlertRuleIndex(refresh_interval_sec=60)
+        await alert_rule_index.refresh(pg_pool)
+        alert_rule_index.start_refresh_loop(pg_pool)
 
     logger.info(
         f"Caches loaded: {sensor_registry.size} sensors, "
-        f"{model_binding_cache.size} model bindings"
+        f"{model_binding_cache.size} model bindings, "
+        f"{alert_rule_index.size if alert_rule_index else 0} alarm rule scopes"
     )
 
+    partitioner = None
+    if settings.INGESTION_WORKERS > 1:
+        partitioner = SensorPartitioner(
+            worker_index=settings.INGESTION_WORKER_INDEX,
+            worker_count=settings.INGESTION_WORKERS,
+            mode=settings.INGESTION_PARTITION_MODE,
+            shared_group=settings.MQTT_SHARED_GROUP,
+            forward_prefix=settings.MQTT_FORWARD_PREFIX,
+        )
+        logger.info(
+            f"Ingestion worker {partitioner.index}/{partitioner.count} "
+            f"({partitioner.mode} partitioning)"
+        )
+
+    latest_store = LatestValueStore(
+        sensor_registry=sensor_registry,
+        max_topics_per_tenant=settings.LATEST_MAX_TOPICS_PER_TENANT,
+        ttl_sec=settings.LATEST_TTL_SEC,
+    )
+    stream_hub = StreamHub(latest_store, push_interval_ms=settings.WS_PUSH_INTERVAL_MS)
+    stream_hub.start()
+    app.state.stream_hub = stream_hub
+
     mqtt_client = MQTTClient(
         broker_host=settings.MQTT_BROKER_HOST,
         broker_port=settings.MQTT_BROKER_PORT,
         topics=settings.MQTT_TOPICS,
+        partitioner=partitioner,
     )
 
     await mqtt_client.connect(
         sensor_registry=sensor_registry,
         model_binding_cache=model_binding_cache,
+        alert_rule_index=alert_rule_index,
+        stream_hub=stream_hub,
+        metrics=pipeline_metrics,
     )
     app.state.mqtt_client = mqtt_client
     app.state.sensor_registry = sensor_registry
     app.state.model_binding_cache = model_binding_cache
+    app.state.alert_rule_index = alert_rule_index
     logger.info("MQTT Ingestion Service ready!")
 
     yield
 
+    if cache_listener:
+        await cache_listener.stop()
     await sensor_registry.stop()
     await model_binding_cache.stop()
+    if alert_rule_index:
+        await alert_rule_index.stop()
     await mqtt_client.disconnect()
+    await stream_hub.stop()
     await close_pg_pool()
     logger.info("MQTT Ingestion Service stopped")
 
@@ -72,6 +140,8 @@ app.add_middleware(
 
 app.include_router(ws_router)
 
+metrics_registry.register(IngestionCollector(lambda: app.state))
+
 
 @app.get("/")
 async def root():
@@ -83,21 +153,85 @@ async def root():
     }
 
 
-@app.get("/health")
-async def health():
+async def _fetch_peers(path: str, params: Optional[dict] = None) -> list:
+    """GET `path` (local view) from the other worker processes on this node."""
+    base_port = settings.PORT - settings.INGESTION_WORKER_INDEX
+    peers = [
+        base_port + index
+        for index in range(settings.INGESTION_WORKERS)
+        if index != settings.INGESTION_WORKER_INDEX
+    ]
+
+    async with httpx.AsyncClient(timeout=2.0) as client:
+        async def _get(port: int):
+            try:
+                response = await client.get(
+                    f"http://127.0.0.1:{port}{path}", params={**(params or {}), "local": "true"}
+                )
+                return response.json()
+            except Exception as exc:
+                return {"status": "unreachable", "port": port, "error": str(exc)}
+
+        return await asyncio.gather(*(_get(port) for port in peers))
+
+
+def _local_health() -> dict:
     mqtt_client = app.state.mqtt_client
     return {
+        "worker_index": settings.INGESTION_WORKER_INDEX,
         "status": "healthy",
         "mqtt_connected": mqtt_client.is_connected() if mqtt_client else False,
         "messages_received": mqtt_client.message_count if mqtt_client else 0,
         "sensor_cache_size": getattr(app.state, "sensor_registry", None) and app.state.sensor_registry.size or 0,
         "model_cache_size": getattr(app.state, "model_binding_cache", None) and app.state.model_binding_cache.size or 0,
+        "ingress_queue": mqtt_client.ingress_stats() if mqtt_client else {},
+        "alert_outbox": mqtt_client.alert_outbox_stats() if mqtt_client else {},
+        "write_buffer": mqtt_client.write_buffer_stats() if mqtt_client else {},
+        "stream": app.state.stream_hub.stats() if getattr(app.state, "stream_hub", None) else {},
+        "alerts_prefiltered": getattr(app.state, "alert_rule_index", None) and app.state.alert_rule_index.filtered or 0,
+        "sliding_windows": (
+            mqtt_client.handler.window_manager.stats()
+            if mqtt_client and mqtt_client.handler else {}
+        ),
     }
 
 
+@app.get("/health")
+async def health(local: bool = False):
+    local_health = _local_health()
+    if local or settings.INGESTION_WORKERS <= 1:
+        return local_health
+
+    workers = [local_health] + await _fetch_peers("/health")
+    return {
+        "status": (
+            "healthy"
+            if all(w.get("status") == "healthy" for w in workers)
+            else "degraded"
+        ),
+        "mqtt_connected": all(w.get("mqtt_connected") for w in workers),
+        "messages_received": sum(w.get("messages_received", 0) for w in workers),
+        "workers": workers,
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus exposition for this worker process."""
+    return Response(generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/latest")
-async def get_latest():
+async def get_latest(local: bool = False, tenant_id: Optional[str] = None):
     mqtt_client = app.state.mqtt_client
-    if mqtt_client:
-        return mqtt_client.get_latest_data()
-    return {"error": "MQTT client not initialized"}
+    if not mqtt_client:
+        return {"error": "MQTT client not initialized"}
+    if local or settings.INGESTION_WORKERS <= 1:
+        return mqtt_client.get_latest_data(tenant_id)
+
+    merged = dict(mqtt_client.get_latest_data(tenant_id))
+    params = {"tenant_id": tenant_id} if tenant_id else None
+    for peer_data in await _fetch_peers("/latest", params):
+        if "error" not in peer_data and peer_data.get("status") != "unreachable":
+            merged.update(peer_data)
+    return merged
@@ -0,0 +1,146 @@
+"""Prometheus metrics for the ingestion pipeline, served on /metrics.
+
+PipelineMetrics is recorded on the hot path: a latency histogram per
+MessageHandler stage and a message counter per outcome. Label children are
+cached so an observation is a dict lookup plus a histogram update.
+Tenant is only a label when METRICS_TENANT_LABEL is set — with many
+tenants it multiplies every series.
+
+Queue depths, window slots and cache sizes are not tracked per message;
+IngestionCollector reads them from the running components at scrape time.
+With several ingestion workers each process serves its own /metrics on its
+own port and is scraped separately.
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Pipeline stages timed by MessageHandler.handle
+STAGES = ("resolve", "raw_write", "features", "predict", "reading_write", "alert")
+# Terminal outcome of one message
+OUTCOMES = ("predicted", "no_prediction", "raw_only", "error")
+
+# Sub-millisecond cache hits up to multi-second ML/DB stalls
+STAGE_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+_NO_TENANT = "none"
+
+
+class PipelineMetrics:
+    def __init__(self, registry: CollectorRegistry, tenant_label: bool = False):
+        self.tenant_label = tenant_label
+        labels = ("stage", "tenant") if tenant_label else ("stage",)
+        self._stage_seconds = Histogram(
+            "ingestion_stage_seconds",
+            "Time spent in each message pipeline stage",
+            labels,
+            buckets=STAGE_BUCKETS,
+            registry=registry,
+        )
+        labels = ("outcome", "tenant") if tenant_label else ("outcome",)
+        self._messages = Counter(
+            "ingestion_messages",
+            "Messages handled, by outcome",
+            labels,
+            registry=registry,
+        )
+        self._stage_children: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._outcome_children: Dict[Tuple[str, Optional[str]], Any] = {}
+
+    def _child(self, metric, children: dict, name: str, tenant: Optional[str]):
+        key = (name, tenant if self.tenant_label else None)
+        child = children.get(key)
+        if child is None:
+            if self.tenant_label:
+                child = metric.labels(name, tenant or _NO_TENANT)
+            else:
+                child = metric.labels(name)
+            children[key] = child
+        return child
+
+    def stage(self, stage: str, started: float, tenant: Optional[str] = None) -> float:
+        """Record time since `started` for a stage; returns now for chaining."""
+        now = time.perf_counter()
+        self._child(self._stage_seconds, self._stage_children, stage, tenant).observe(now - started)
+        return now
+
+    def outcome(self, outcome: str, tenant: Optional[str] = None) -> None:
+        self._child(self._messages, self._outcome_children, outcome, tenant).inc()
+
+
+class IngestionCollector:
+    """Scrape-time gauges for queues, windows and caches.
+
+    `source` returns the component attributes of app.state (or None before
+    startup); anything missing is simply not reported.
+    """
+
+    def __init__(self, source: Callable[[], Any]):
+        self._source = source
+
+    def describe(self) -> Iterator:
+        return iter(())
+
+    def collect(self) -> Iterator:
+        state = self._source()
+        if state is None:
+            return
+
+        mqtt_client = getattr(state, "mqtt_client", None)
+        if mqtt_client is not None:
+            yield _gauge("ingestion_mqtt_connected", "1 if connected to the MQTT broker",
+                         1 if mqtt_client.is_connected() else 0)
+            received = CounterMetricFamily(
+                "ingestion_mqtt_messages_received", "MQTT messages received"
+            )
+            received.add_metric([], mqtt_client.message_count)
+            yield received
+
+            ingress = mqtt_client.ingress_stats()
+            if ingress:
+                yield _gauge("ingestion_queue_depth", "Messages waiting in the ingress queue",
+                             ingress["depth"])
+                yield _gauge("ingestion_queue_capacity", "Ingress queue bound",
+                             ingress["maxsize"])
+                dropped = CounterMetricFamily(
+                    "ingestion_queue_dropped", "Messages shed by the ingress queue",
+                    labels=["reason"],
+                )
+                for reason, count in ingress.get("dropped", {}).items():
+                    dropped.add_metric([reason], count)
+                yield dropped
+
+            outbox = mqtt_client.alert_outbox_stats()
+            if outbox:
+                yield _gauge("ingestion_alert_outbox_depth", "Alerts waiting for delivery",
+                             outbox["pending"] + outbox["in_flight"])
+
+            handler = getattr(mqtt_client, "handler", None)
+            if handler is not None:
+                windows = handler.window_manager.stats()
+                yield _gauge("ingestion_windows", "Sliding window slots in use",
+                             windows.get("slots_used", 0))
+
+        caches = GaugeMetricFamily(
+            "ingestion_cache_entries", "Entries in in-memory caches", labels=["cache"]
+        )
+        for name in ("sensor_registry", "model_binding_cache", "alert_rule_index"):
+            cache = getattr(state, name, None)
+            if cache is not None:
+                caches.add_metric([name], cache.size)
+        stream_hub = getattr(state, "stream_hub", None)
+        if stream_hub is not None:
+            caches.add_metric(["latest_values"], stream_hub.store.stats().get("topics", 0))
+            yield _gauge("ingestion_stream_clients", "Connected WebSocket clients",
+                         stream_hub.stats()["clients"])
+        yield caches
+
+
+def _gauge(name: str, documentation: str, value: float) -> GaugeMetricFamily:
+    return GaugeMetricFamily(name, documentation, value=value)
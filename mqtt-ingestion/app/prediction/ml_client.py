@@ -1,17 +1,79 @@
+import asyncio
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 import httpx
+import msgpack
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _columnar(bodies: List[Dict]) -> Dict:
+    """Batch of /predict bodies as one msgpack /predict-batch body."""
+    return {
+        "rows": len(bodies),
+        "features": np.asarray([b["features"] for b in bodies], dtype="<f4").tobytes(),
+        "top_k": [b.get("top_k", 3) for b in bodies],
+        "tenant_id": [b.get("tenant_id") for b in bodies],
+        "asset_id": [b.get("asset_id") for b in bodies],
+        "model_version_id": [b.get("model_version_id") for b in bodies],
+        "request_id": [b.get("request_id") for b in bodies],
+    }
+
 
 class MLClient:
-    """HTTP client for the ML prediction service. Uses a singleton AsyncClient."""
+    """HTTP client for the ML prediction service. Uses a singleton AsyncClient.
+
+    With batch_enabled, concurrent predict() calls are queued and sent
+    together to /predict-batch once max_batch requests are pending or
+    max_delay_ms has passed since the first one, whichever comes first.
+    Each caller still awaits its own result; see _send_batch for how
+    failed rows and failed batches are handled.
 
-    def __init__(self, base_url: str, api_key: str = ""):
+    With binary, requests and responses use ml-service's msgpack format:
+    features travel as raw float32 bytes (one matrix for a whole batch)
+    instead of JSON number arrays.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str = "",
+        batch_enabled: bool = False,
+        max_batch: int = 32,
+        max_delay_ms: float = 5.0,
+        binary: bool = False,
+    ):
         self._client = httpx.AsyncClient(base_url=base_url, timeout=5.0)
         self._api_key = api_key
+        self._binary = binary
+
+        self._batch_enabled = batch_enabled
+        self._max_batch = max_batch
+        self._max_delay = max_delay_ms / 1000.0
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def _headers(self) -> Dict[str, str]:
+        return {"X-API-Key": self._api_key} if self._api_key else {}
+
+    async def _post(self, path: str, body: Dict) -> httpx.Response:
+        if not self._binary:
+            return await self._client.post(path, json=body, headers=self._headers())
+        return await self._client.post(
+            path,
+            content=msgpack.packb(body),
+            headers={**self._headers(), "Content-Type": MSGPACK_MEDIA_TYPE},
+        )
+
+    def _decode(self, response: httpx.Response):
+        if self._binary:
+            return msgpack.unpackb(response.content, raw=False)
+        return response.json()
 
     async def predict(
         self,
@@ -20,28 +82,30 @@ class MLClient:
         tenant_id: Optional[str] = None,
         asset_id: Optional[str] = None,
         model_version_id: Optional[str] = None,
+        request_id: Optional[str] = None,
     ) -> Optional[Dict]:
         """Call ML service /predict endpoint with optional tenant context."""
+        body: Dict = {"features": features, "top_k": top_k}
+        if tenant_id:
+            body["tenant_id"] = tenant_id
+        if asset_id:
+            body["asset_id"] = asset_id
+        if model_version_id:
+            body["model_version_id"] = model_version_id
+        if request_id:
+            body["request_id"] = request_id
+
+        if self._batch_enabled:
+            return await self._enqueue(body)
+        return await self._predict_one(body)
+
+    async def _predict_one(self, body: Dict) -> Optional[Dict]:
         try:
-            headers = {}
-            if self._api_key:
-                headers["X-API-Key"] = self._api_key
-
-            body: Dict = {"features": features, "top_k": top_k}
-            if tenant_id:
-                body["tenant_id"] = tenant_id
-            if asset_id:
-                body["asset_id"] = asset_id
-            if model_version_id:
-                body["model_version_id"] = model_version_id
-
-            response = await self._client.post(
-                "/predict",
-                json=body,
-                headers=headers,
-            )
+            if self._binary:
+                body = {**body, "features": np.asarray(body["features"], dtype="<f4").tobytes()}
+            response = await self._post("/predict", body)
             if response.status_code == 200:
-                return response.json()
+                return self._decode(response)
 
             logger.warning(f"ML prediction failed: {response.status_code}")
             return None
@@ -49,5 +113,81 @@ class MLClient:
             logger.error(f"Error calling ML service: {e}")
             return None
 
+    # ---- Micro-batching ----
+
+    async def _enqueue(self, body: Dict) -> Optional[Dict]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((body, future))
+
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._max_delay, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._send_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send_batch(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        """POST one /predict-batch call and fan results back by position.
+
+        Rows ml-service could not score come back with `error` and resolve
+        to None. If the whole call fails, each request is retried alone on
+        /predict so one bad body cannot cost the others their prediction —
+        except on 503 or a transport error (timeout, connection refused),
+        where a burst of single retries would only add to the problem.
+        """
+        bodies = [body for body, _ in batch]
+        results: Optional[List[Optional[Dict]]] = None
+        retry = True
+        try:
+            if self._binary:
+                response = await self._post("/predict-batch", _columnar(bodies))
+            else:
+                response = await self._client.post(
+                    "/predict-batch", json=bodies, headers=self._headers()
+                )
+            if response.status_code == 200:
+                results = [None] * len(batch)
+                for i, item in enumerate(self._decode(response)[: len(batch)]):
+                    if item.get("error"):
+                        logger.warning(f"ML prediction failed for one row: {item['error']}")
+                    else:
+                        results[i] = item
+            else:
+                retry = response.status_code != 503
+                logger.warning(
+                    f"ML batch prediction failed: {response.status_code} "
+                    f"({len(batch)} requests{', retrying individually' if retry else ''})"
+                )
+        except Exception as e:
+            retry = not isinstance(e, httpx.TransportError)
+            logger.error(f"Error calling ML service batch endpoint: {e}")
+
+        if results is None:
+            if retry:
+                results = await asyncio.gather(*(self._predict_one(body) for body in bodies))
+            else:
+                results = [None] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
     async def close(self) -> None:
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
         await self._client.aclose()
@@ -1,10 +1,11 @@
 """ModelBindingCache — maps asset_id → active model version.
 
 Used by the ingestion pipeline to resolve which ML model version
-should serve predictions for each asset's sensor data.
+should serve predictions for each asset's sensor data. Kept current
+incrementally (see ChangeDrivenCache): only assets whose
+asset_model_versions rows changed are re-read.
 """
 
-import asyncio
 import logging
 from dataclasses import dataclass
 from typing import Dict, Optional
@@ -12,20 +13,50 @@ from uuid import UUID
 
 import asyncpg
 
+from app.db.incremental_cache import ChangeDrivenCache
+
 logger = logging.getLogger(__name__)
 
-REFRESH_SQL = """
+_REFRESH = """
 SELECT
     amv.asset_id,
     amv.model_id,
     amv.model_version_id,
     mv.full_version_label,
-    mv.model_artifact_path
+    mv.model_artifact_path,
+    {updated_at} AS updated_at
 FROM asset_model_versions amv
 JOIN ml_model_versions mv ON mv.id = amv.model_version_id
 WHERE amv.is_active = true
 """
 
+REFRESH_SQL = _REFRESH.format(updated_at="amv.updated_at")
+
+# Before backend-api migration 004 adds asset_model_versions.updated_at
+UNWATERMARKED_REFRESH_SQL = _REFRESH.format(updated_at="NULL::timestamptz")
+
+# Active bindings of every asset whose asset_model_versions rows changed
+# since $1; an asset with none left comes back with NULL model columns
+CHANGED_SQL = """
+WITH changed AS (
+    SELECT asset_id, max(updated_at) AS updated_at
+    FROM asset_model_versions
+    WHERE updated_at > $1
+    GROUP BY asset_id
+)
+SELECT
+    c.asset_id,
+    amv.model_id,
+    amv.model_version_id,
+    mv.full_version_label,
+    mv.model_artifact_path,
+    c.updated_at
+FROM changed c
+LEFT JOIN asset_model_versions amv
+       ON amv.asset_id = c.asset_id AND amv.is_active = true
+LEFT JOIN ml_model_versions mv ON mv.id = amv.model_version_id
+"""
+
 
 @dataclass(frozen=True)
 class ModelBinding:
@@ -35,49 +66,72 @@ class ModelBinding:
     artifact_path: Optional[str]
 
 
-class ModelBindingCache:
+def _binding(row) -> ModelBinding:
+    return ModelBinding(
+        model_id=row["model_id"],
+        model_version_id=row["model_version_id"],
+        version_label=row["full_version_label"] or "",
+        artifact_path=row["model_artifact_path"],
+    )
+
+
+class ModelBindingCache(ChangeDrivenCache):
     """In-memory lookup from asset_id to ModelBinding, refreshed from PG."""
 
-    def __init__(self, refresh_interval_sec: int = 60):
+    TABLES = ("asset_model_versions",)
+
+    def __init__(
+        self,
+        refresh_interval_sec: int = 60,
+        full_reload_interval_sec: int = 900,
+        listen_poll_interval_sec: int = 600,
+    ):
+        super().__init__(
+            refresh_interval_sec,
+            full_reload_interval_sec,
+            listen_poll_interval_sec=listen_poll_interval_sec,
+        )
         self._cache: Dict[UUID, ModelBinding] = {}
-        self._refresh_interval = refresh_interval_sec
-        self._refresh_task: Optional[asyncio.Task] = None
 
     def lookup(self, asset_id: UUID) -> Optional[ModelBinding]:
         return self._cache.get(asset_id)
 
     async def refresh(self, pool: asyncpg.Pool) -> None:
         try:
-            rows = await pool.fetch(REFRESH_SQL)
+            watermarked = await self._watermarked(pool)
+            rows = await pool.fetch(REFRESH_SQL if watermarked else UNWATERMARKED_REFRESH_SQL)
             new_cache: Dict[UUID, ModelBinding] = {}
             for row in rows:
-                binding = ModelBinding(
-                    model_id=row["model_id"],
-                    model_version_id=row["model_version_id"],
-                    version_label=row["full_version_label"] or "",
-                    artifact_path=row["model_artifact_path"],
-                )
-                new_cache[row["asset_id"]] = binding
+                new_cache[row["asset_id"]] = _binding(row)
+                self._advance_watermark(row["updated_at"])
             self._cache = new_cache
+            self.generation += 1
             logger.debug(f"ModelBindingCache refreshed: {len(new_cache)} bindings")
         except Exception:
             logger.exception("Failed to refresh ModelBindingCache")
 
-    def start_refresh_loop(self, pool: asyncpg.Pool) -> None:
-        async def _loop():
-            while True:
-                await self.refresh(pool)
-                await asyncio.sleep(self._refresh_interval)
-
-        self._refresh_task = asyncio.create_task(_loop())
-
-    async def stop(self) -> None:
-        if self._refresh_task:
-            self._refresh_task.cancel()
-            try:
-                await self._refresh_task
-            except asyncio.CancelledError:
-                pass
+    async def refresh_changed(self, pool: asyncpg.Pool) -> None:
+        """Re-read the bindings of assets changed since the watermark."""
+        if self._take_deleted():
+            # A deleted row no longer tells us its asset — reload the (small) table
+            self._full_reload_requested = True
+            self._changed.set()
+            return
+
+        rows = await pool.fetch(CHANGED_SQL, self._delta_since())
+        fresh: Dict[UUID, ModelBinding] = {}
+        for row in rows:
+            if row["model_version_id"] is not None:
+                fresh[row["asset_id"]] = _binding(row)
+            self._advance_watermark(row["updated_at"])
+        for asset_id in {row["asset_id"] for row in rows}:
+            if asset_id in fresh:
+                self._cache[asset_id] = fresh[asset_id]
+            else:
+                self._cache.pop(asset_id, None)
+        if rows:
+            self.generation += 1
+            logger.debug(f"ModelBindingCache: applied changes for {len(rows)} assets")
 
     @property
     def size(self) -> int:
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Union
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from pymongo.write_concern import WriteConcern
+
+logger = logging.getLogger(__name__)
+
+# MongoDB duplicate key error: the document was stored by an earlier attempt
+_DUPLICATE_KEY = 11000
+
+
+class BulkWriteBuffer:
+    """Buffers documents per collection and flushes them with insert_many.
+
+    A collection is flushed when it holds max_docs documents or every
+    flush_interval_ms, whichever comes first. Inserts are unordered so one
+    bad document does not block the rest. ObjectIds are assigned on add(),
+    so callers can reference a document before it reaches MongoDB.
+
+    A failed insert is retried up to max_retries times with backoff; after
+    a BulkWriteError only the documents listed in writeErrors are retried
+    (duplicate keys mean an earlier attempt already stored them). At most
+    max_inflight_flushes inserts run at once, and add() waits while
+    max_pending_docs documents are buffered or in flight, so a slow
+    MongoDB pushes back on ingestion instead of growing memory.
+    """
+
+    def __init__(
+        self,
+        db,
+        max_docs: int = 500,
+        flush_interval_ms: float = 200.0,
+        write_concerns: Optional[Dict[str, Union[int, str]]] = None,
+        max_pending_docs: int = 20000,
+        max_inflight_flushes: int = 4,
+        max_retries: int = 3,
+        retry_backoff_sec: float = 0.5,
+    ):
+        self.db = db
+        self._max_docs = max_docs
+        self._flush_interval = flush_interval_ms / 1000.0
+        self._write_concerns = write_concerns or {}
+        self._max_pending = max(max_docs, max_pending_docs)
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff_sec
+
+        self._buffers: Dict[str, List[dict]] = {}
+        self._collections: Dict[str, object] = {}
+        self._inflight: Set[asyncio.Task] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_slots = asyncio.Semaphore(max(1, max_inflight_flushes))
+        # Buffered + in-flight documents; add() waits on _space at the cap
+        self._outstanding = 0
+        self._space = asyncio.Event()
+        self._space.set()
+
+        self.retried = 0
+        self.dropped = 0
+        self.backpressure_waits = 0
+
+    def _collection(self, name: str):
+        coll = self._collections.get(name)
+        if coll is None:
+            w = self._write_concerns.get(name)
+            coll = (
+                self.db.get_collection(name, write_concern=WriteConcern(w=w))
+                if w is not None
+                else self.db[name]
+            )
+            self._collections[name] = coll
+        return coll
+
+    async def add(self, collection: str, document: dict) -> dict:
+        """Queue a document for insertion; returns it with `_id` assigned.
+
+        Waits while max_pending_docs documents are outstanding.
+        """
+        if self._outstanding >= self._max_pending:
+            self.backpressure_waits += 1
+            while self._outstanding >= self._max_pending:
+                self._space.clear()
+                await self._space.wait()
+
+        document.setdefault("_id", ObjectId())
+        buffer = self._buffers.setdefault(collection, [])
+        buffer.append(document)
+        self._outstanding += 1
+
+        if len(buffer) >= self._max_docs:
+            task = asyncio.create_task(self._flush_collection(collection))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+        return document
+
+    def _settle(self, count: int) -> None:
+        """Mark documents as stored or given up on, waking blocked add() calls."""
+        self._outstanding -= count
+        if self._outstanding < self._max_pending:
+            self._space.set()
+
+    async def _flush_collection(self, collection: str) -> None:
+        documents = self._buffers.get(collection)
+        if not documents:
+            return
+        self._buffers[collection] = []
+
+        async with self._flush_slots:
+            total = len(documents)
+            try:
+                documents = await self._insert(collection, documents)
+            finally:
+                self._settle(total)
+
+        if documents:
+            self.dropped += len(documents)
+            logger.error(
+                f"Bulk insert to {collection}: dropped {len(documents)} documents "
+                f"after {self._max_retries} retries"
+            )
+
+    async def _insert(self, collection: str, documents: List[dict]) -> List[dict]:
+        """insert_many with bounded retries; returns the documents never stored."""
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                self.retried += len(documents)
+                await asyncio.sleep(self._retry_backoff * 2 ** (attempt - 1))
+            try:
+                await self._collection(collection).insert_many(documents, ordered=False)
+                logger.debug(f"Flushed {len(documents)} documents to {collection}")
+                return []
+            except BulkWriteError as e:
+                details = e.details or {}
+                errors = details.get("writeErrors", [])
+                logger.error(
+                    f"Bulk insert to {collection}: {details.get('nInserted', 0)}/"
+                    f"{len(documents)} inserted, {len(errors)} write errors"
+                )
+                documents = [
+                    documents[error["index"]]
+                    for error in errors
+                    if error.get("code") != _DUPLICATE_KEY
+                ]
+                if not documents:
+                    return []
+            except Exception as e:
+                logger.error(
+                    f"Bulk insert to {collection} failed ({len(documents)} documents): {e}"
+                )
+        return documents
+
+    async def flush(self) -> None:
+        await asyncio.gather(
+            *(self._flush_collection(name) for name in list(self._buffers)),
+        )
+
+    def start(self) -> None:
+        """Start the background task that flushes on the time threshold."""
+        async def _loop():
+            while True:
+                await asyncio.sleep(self._flush_interval)
+                await self.flush()
+
+        self._flush_task = asyncio.create_task(_loop())
+
+    async def close(self) -> None:
+        """Stop the timer and drain every buffer."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self.flush()
+
+    @property
+    def pending(self) -> int:
+        return sum(len(docs) for docs in self._buffers.values())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self.pending,
+            "outstanding": self._outstanding,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "backpressure_waits": self.backpressure_waits,
+        }
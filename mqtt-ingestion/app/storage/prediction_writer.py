@@ -4,15 +4,27 @@ from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.ingestion.context import MessageContext
+    from app.storage.bulk_buffer import BulkWriteBuffer
 
 logger = logging.getLogger(__name__)
 
 
 class PredictionWriter:
-    """Writes structured sensor readings (with prediction) to sensor_readings collection."""
+    """Writes structured sensor readings (with prediction) to sensor_readings collection.
 
-    def __init__(self, db):
+    If a BulkWriteBuffer is given, readings are queued for insert_many; the
+    buffer assigns `_id` up front so alerts can still reference the reading.
+    """
+
+    def __init__(self, db, buffer: Optional["BulkWriteBuffer"] = None):
         self.db = db
+        self.buffer = buffer
+
+    async def _insert(self, document: dict) -> None:
+        if self.buffer is not None:
+            await self.buffer.add("sensor_readings", document)
+        else:
+            await self.db.sensor_readings.insert_one(document)
 
     def _add_context(self, doc: dict, ctx: Optional["MessageContext"]) -> dict:
         """Inject tenant context fields into a document."""
@@ -51,7 +63,7 @@ class PredictionWriter:
             "confidence": confidence,
         }
         self._add_context(sensor_reading, ctx)
-        await self.db.sensor_readings.insert_one(sensor_reading)
+        await self._insert(sensor_reading)
         logger.info(f"Stored simple sensor reading with ML prediction: {prediction}")
 
     async def write_complex_reading(
@@ -94,7 +106,7 @@ class PredictionWriter:
             "confidence": confidence,
         }
         self._add_context(sensor_reading, ctx)
-        await self.db.sensor_readings.insert_one(sensor_reading)
+        await self._insert(sensor_reading)
         logger.info(
             f"Stored sensor reading with ML prediction: {prediction} "
             f"(confidence: {confidence:.2f})"
@@ -4,15 +4,21 @@ from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.ingestion.context import MessageContext
+    from app.storage.bulk_buffer import BulkWriteBuffer
 
 logger = logging.getLogger(__name__)
 
 
 class TelemetryWriter:
-    """Writes raw MQTT payloads to the sensor_data MongoDB collection."""
+    """Writes raw MQTT payloads to the sensor_data MongoDB collection.
 
-    def __init__(self, db):
+    If a BulkWriteBuffer is given, documents are queued for insert_many
+    instead of one insert_one round trip per message.
+    """
+
+    def __init__(self, db, buffer: Optional["BulkWriteBuffer"] = None):
         self.db = db
+        self.buffer = buffer
 
     async def write(
         self,
@@ -30,5 +36,8 @@ class TelemetryWriter:
             document["asset_id"] = ctx.asset_id_str
             document["sensor_id"] = ctx.sensor_id_str
 
-        await self.db.sensor_data.insert_one(document)
+        if self.buffer is not None:
+            await self.buffer.add("sensor_data", document)
+        else:
+            await self.db.sensor_data.insert_one(document)
         logger.debug(f"Stored raw data for topic: {topic}")
@@ -0,0 +1,187 @@
+"""StreamHub — push-based fan-out of latest sensor values to WebSocket clients.
+
+MQTTClient writes every message into the LatestValueStore, which resolves
+the owning tenant once per message. A ticker on the event loop wakes only
+the clients whose tenant partition (or the shared partition of unresolved
+topics) changed, at most once per push interval, so bursts are coalesced.
+
+Clients choose a frame format:
+
+    snapshot (default) — {topic: entry} for the tenant, as before
+    delta              — {"type": "snapshot", "seq", "topics"} first, then
+                         {"type": "delta", "seq", "topics", "removed"} with
+                         only the topics and fields changed since the last
+                         frame (apply "removed" before "topics"; a topic
+                         entry's own "removed" lists fields dropped from
+                         its payload)
+
+optionally filtered to a set of assets/sensors, and encoded as JSON text or
+msgpack binary. Frames are cached per (tenant, seq, format, filter), so
+clients with the same view share one encoding.
+
+Each client holds only a wake-up flag and the last sequence it was sent,
+never a queue: a client that cannot take a frame within the send timeout
+is disconnected instead of holding up anyone else.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Set, Union
+
+import msgpack
+import orjson
+
+from app.streaming.latest_store import LatestValueStore
+
+logger = logging.getLogger(__name__)
+
+FRAME_MODES = ("snapshot", "delta")
+FRAME_ENCODINGS = ("json", "msgpack")
+
+
+class StreamSubscription:
+    __slots__ = ("tenant_id", "wakeup", "mode", "encoding", "assets", "sensors", "since")
+
+    def __init__(self, tenant_id: str, mode: str = "snapshot", encoding: str = "json"):
+        if mode not in FRAME_MODES:
+            raise ValueError(f"Unknown stream mode: {mode!r}")
+        if encoding not in FRAME_ENCODINGS:
+            raise ValueError(f"Unknown stream encoding: {encoding!r}")
+        self.tenant_id = tenant_id
+        self.wakeup = asyncio.Event()
+        self.wakeup.set()  # first frame goes out immediately
+        self.mode = mode
+        self.encoding = encoding
+        self.assets: Optional[Set[str]] = None
+        self.sensors: Optional[Set[str]] = None
+        self.since = 0  # last seq sent; 0 forces a full snapshot
+
+    def set_filter(self, assets=None, sensors=None) -> None:
+        self.assets = set(assets) if assets else None
+        self.sensors = set(sensors) if sensors else None
+        self.since = 0
+        self.wakeup.set()
+
+    @property
+    def filter_key(self) -> tuple:
+        return (
+            tuple(sorted(self.assets)) if self.assets else None,
+            tuple(sorted(self.sensors)) if self.sensors else None,
+        )
+
+
+class StreamHub:
+    def __init__(self, store: LatestValueStore, push_interval_ms: float = 500.0):
+        self.store = store
+        self._interval = push_interval_ms / 1000.0
+        self._clients: Dict[str, Set[StreamSubscription]] = {}
+        self._notified: Dict[Optional[str], int] = {}
+        # tenant → (seq, {(mode, encoding, filter, since): frame})
+        self._frames: Dict[str, tuple] = {}
+        self._ticker: Optional[asyncio.Task] = None
+        self.slow_clients_dropped = 0
+
+    # ---- Producer side (paho thread or event loop) ----
+
+    def publish(self, topic: str, data, timestamp: str) -> None:
+        """Record the latest value for a topic. Cheap: no I/O, no encoding."""
+        self.store.put(topic, data, timestamp)
+
+    # ---- Client side (event loop) ----
+
+    def subscribe(
+        self, tenant_id: str, mode: str = "snapshot", encoding: str = "json",
+    ) -> StreamSubscription:
+        sub = StreamSubscription(tenant_id, mode, encoding)
+        self._clients.setdefault(tenant_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: StreamSubscription) -> None:
+        clients = self._clients.get(sub.tenant_id)
+        if clients:
+            clients.discard(sub)
+            if not clients:
+                del self._clients[sub.tenant_id]
+                self._frames.pop(sub.tenant_id, None)
+
+    def next_frame(self, sub: StreamSubscription) -> Optional[Union[str, bytes]]:
+        """Frame for this client, or None if nothing in its view changed."""
+        seq = self.store.seq(sub.tenant_id)
+        if sub.since and seq <= sub.since:
+            return None
+
+        cached_seq, frames = self._frames.get(sub.tenant_id, (None, None))
+        if cached_seq != seq:
+            frames = {}
+            self._frames[sub.tenant_id] = (seq, frames)
+        since = sub.since if sub.mode == "delta" else 0
+        key = (sub.mode, sub.encoding, sub.filter_key, since)
+
+        if key not in frames:
+            body = self._build(sub, since, seq)
+            if body is None:
+                frames[key] = None
+            elif sub.encoding == "msgpack":
+                frames[key] = msgpack.packb(body, default=str)
+            else:
+                frames[key] = orjson.dumps(body, default=str).decode()
+        sub.since = seq
+        return frames[key]
+
+    def _build(self, sub: StreamSubscription, since: int, seq: int):
+        if sub.mode == "snapshot":
+            return self.store.snapshot(sub.tenant_id, sub.assets, sub.sensors)
+
+        if since:
+            delta = self.store.delta(sub.tenant_id, since, sub.assets, sub.sensors)
+            if delta is not None:
+                changed, removed = delta
+                if not changed and not removed:
+                    return None
+                return {"type": "delta", "seq": seq, "topics": changed, "removed": removed}
+        # First frame, or the reader fell behind the tombstone history
+        return {
+            "type": "snapshot",
+            "seq": seq,
+            "topics": self.store.snapshot(sub.tenant_id, sub.assets, sub.sensors),
+        }
+
+    # ---- Ticker ----
+
+    def start(self) -> None:
+        self._ticker = asyncio.create_task(self._tick_loop())
+
+    async def stop(self) -> None:
+        if self._ticker:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+
+    async def _tick_loop(self) -> None:
+        ticks_per_expiry = max(1, int(1.0 / self._interval))
+        tick = 0
+        while True:
+            await asyncio.sleep(self._interval)
+            tick += 1
+            if tick % ticks_per_expiry == 0:
+                self.store.expire()
+
+            for tenant_id, seq in self.store.changed():
+                if self._notified.get(tenant_id) == seq:
+                    continue
+                self._notified[tenant_id] = seq
+                if tenant_id is None:
+                    targets = [sub for subs in self._clients.values() for sub in subs]
+                else:
+                    targets = self._clients.get(tenant_id, ())
+                for sub in targets:
+                    sub.wakeup.set()
+
+    def stats(self) -> dict:
+        return {
+            "clients": sum(len(subs) for subs in self._clients.values()),
+            "slow_clients_dropped": self.slow_clients_dropped,
+            "latest": self.store.stats(),
+        }
@@ -0,0 +1,276 @@
+"""LatestValueStore — bounded, per-tenant latest value of every topic.
+
+Replaces MQTTClient.latest_data (one global dict of full payloads that
+grew with every topic ever seen).
+
+- Partitioned by tenant, resolved through the sensor registry. Topics that
+  cannot be resolved (legacy topics, unknown sensors) share one partition
+  every tenant sees.
+- Each partition keeps at most max_topics_per_tenant topics in LRU order.
+  Topics not updated for ttl_sec are expired.
+- Every update takes a store-wide sequence number, and every payload field
+  remembers the sequence of its last change. A reader that last saw
+  sequence S can then be sent only the topics, and within them only the
+  fields, that changed after S. Fields dropped from a payload are
+  remembered the same way, and evictions leave tombstones, so readers
+  also learn which fields and topics disappeared.
+
+Writers may be the paho network thread while expiry and readers run on
+the event loop, so every public method holds one store-wide lock.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from app.ingestion.sensor_registry import SensorRegistryCache
+from app.ingestion.topic_parser import parse_topic
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LatestValue:
+    __slots__ = (
+        "topic", "data", "timestamp", "seq", "field_seq", "removed_seq", "updated",
+        "asset_id", "sensor_id", "sensor_code",
+    )
+
+    def __init__(self, topic: str, asset_id, sensor_id, sensor_code):
+        self.topic = topic
+        self.data = None
+        self.timestamp = ""
+        self.seq = 0
+        # field → seq of its last change; None for non-object payloads
+        self.field_seq: Optional[Dict[str, int]] = None
+        # field → seq at which it was dropped from the payload
+        self.removed_seq: Dict[str, int] = {}
+        self.updated = 0.0
+        self.asset_id = asset_id
+        self.sensor_id = sensor_id
+        self.sensor_code = sensor_code
+
+    def as_entry(self) -> dict:
+        return {"data": self.data, "timestamp": self.timestamp, "topic": self.topic}
+
+    def matches(self, assets: Optional[set], sensors: Optional[set]) -> bool:
+        if assets is None and sensors is None:
+            return True
+        if assets is not None and self.asset_id in assets:
+            return True
+        return sensors is not None and (
+            self.sensor_id in sensors or self.sensor_code in sensors
+        )
+
+
+class _Partition:
+    __slots__ = ("entries", "seq", "tombstones")
+
+    def __init__(self, tombstone_limit: int):
+        self.entries: "OrderedDict[str, LatestValue]" = OrderedDict()
+        self.seq = 0
+        # (seq, topic) for evicted/expired topics, oldest first
+        self.tombstones: Deque[Tuple[int, str]] = deque(maxlen=tombstone_limit)
+
+
+class LatestValueStore:
+    def __init__(
+        self,
+        sensor_registry: Optional[SensorRegistryCache] = None,
+        max_topics_per_tenant: int = 5000,
+        ttl_sec: float = 3600.0,
+        tombstone_limit: int = 1024,
+    ):
+        self.sensor_registry = sensor_registry
+        self.max_topics = max_topics_per_tenant
+        self.ttl = ttl_sec
+        self._tombstone_limit = tombstone_limit
+        self._partitions: Dict[Optional[str], _Partition] = {}
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.expired = 0
+
+    # ---- Writes ----
+
+    def _partition(self, tenant_id: Optional[str]) -> _Partition:
+        partition = self._partitions.get(tenant_id)
+        if partition is None:
+            partition = self._partitions.setdefault(
+                tenant_id, _Partition(self._tombstone_limit)
+            )
+        return partition
+
+    def put(self, topic: str, data, timestamp: str) -> Optional[str]:
+        """Store the latest payload of a topic. Returns the owning tenant_id."""
+        parsed = parse_topic(topic)
+        binding = (
+            self.sensor_registry.lookup(parsed.sensor_code)
+            if parsed and self.sensor_registry else None
+        )
+        tenant_id = str(binding.tenant_id) if binding else None
+        with self._lock:
+            partition = self._partition(tenant_id)
+            seq = next(self._seq)
+
+            entry = partition.entries.get(topic)
+            if entry is None:
+                entry = LatestValue(
+                    topic,
+                    str(binding.asset_id) if binding else None,
+                    str(binding.sensor_id) if binding else None,
+                    parsed.sensor_code if parsed else None,
+                )
+                if isinstance(data, dict):
+                    entry.field_seq = dict.fromkeys(data, seq)
+                partition.entries[topic] = entry
+                if len(partition.entries) > self.max_topics:
+                    evicted_topic, _ = partition.entries.popitem(last=False)
+                    partition.tombstones.append((seq, evicted_topic))
+                    self.evicted += 1
+            else:
+                partition.entries.move_to_end(topic)
+                if isinstance(data, dict) and isinstance(entry.data, dict):
+                    old = entry.data
+                    field_seq = entry.field_seq
+                    removed_seq = entry.removed_seq
+                    for key, value in data.items():
+                        if old.get(key, _MISSING) != value:
+                            field_seq[key] = seq
+                            removed_seq.pop(key, None)
+                    for key in old.keys() - data.keys():
+                        del field_seq[key]
+                        removed_seq[key] = seq
+                else:
+                    entry.field_seq = dict.fromkeys(data, seq) if isinstance(data, dict) else None
+                    entry.removed_seq = {}
+
+            entry.data = data
+            entry.timestamp = timestamp
+            entry.updated = time.monotonic()
+            entry.seq = seq
+            partition.seq = seq
+            return tenant_id
+
+    def expire(self) -> int:
+        """Drop topics not updated for ttl_sec. Returns how many were dropped."""
+        if not self.ttl:
+            return 0
+        cutoff = time.monotonic() - self.ttl
+        with self._lock:
+            dropped = 0
+            for partition in list(self._partitions.values()):
+                # LRU order: stale topics are at the front
+                for entry in list(partition.entries.values()):
+                    if entry.updated >= cutoff:
+                        break
+                    if partition.entries.pop(entry.topic, None) is not None:
+                        seq = next(self._seq)
+                        partition.tombstones.append((seq, entry.topic))
+                        partition.seq = seq
+                        dropped += 1
+            self.expired += dropped
+            return dropped
+
+    # ---- Reads ----
+
+    def _readable(self, tenant_id: Optional[str]) -> List[_Partition]:
+        partitions = [self._partitions.get(None)]
+        if tenant_id is not None:
+            partitions.append(self._partitions.get(tenant_id))
+        return [p for p in partitions if p is not None]
+
+    def seq(self, tenant_id: Optional[str]) -> int:
+        """Latest change visible to a tenant (0 if nothing stored)."""
+        with self._lock:
+            return max((p.seq for p in self._readable(tenant_id)), default=0)
+
+    def changed(self) -> Iterable[Tuple[Optional[str], int]]:
+        with self._lock:
+            return [(tenant_id, p.seq) for tenant_id, p in list(self._partitions.items())]
+
+    def snapshot(
+        self,
+        tenant_id: Optional[str],
+        assets: Optional[set] = None,
+        sensors: Optional[set] = None,
+    ) -> Dict[str, dict]:
+        """{topic: entry} for a tenant (plus shared topics)."""
+        with self._lock:
+            out: Dict[str, dict] = {}
+            for partition in self._readable(tenant_id):
+                for entry in list(partition.entries.values()):
+                    if entry.matches(assets, sensors):
+                        out[entry.topic] = entry.as_entry()
+            return out
+
+    def all_tenants(self) -> Dict[str, dict]:
+        with self._lock:
+            out: Dict[str, dict] = {}
+            for partition in list(self._partitions.values()):
+                for entry in list(partition.entries.values()):
+                    out[entry.topic] = entry.as_entry()
+            return out
+
+    def delta(
+        self,
+        tenant_id: Optional[str],
+        since: int,
+        assets: Optional[set] = None,
+        sensors: Optional[set] = None,
+    ) -> Optional[Tuple[Dict[str, dict], List[str]]]:
+        """Topics/fields changed after `since`, plus topics removed after it.
+
+        A topic entry lists the fields dropped from its payload after
+        `since` under "removed" (only when there are any).
+
+        Returns None when tombstones older than `since` were already
+        discarded — the reader must resync from a snapshot.
+        """
+        with self._lock:
+            changed: Dict[str, dict] = {}
+            removed: List[str] = []
+            for partition in self._readable(tenant_id):
+                tombstones = list(partition.tombstones)
+                if (
+                    len(tombstones) == self._tombstone_limit
+                    and tombstones[0][0] > since
+                ):
+                    return None
+                removed.extend(topic for seq, topic in tombstones if seq > since)
+
+                # Most recently updated last: scan backwards until older than since
+                for entry in reversed(list(partition.entries.values())):
+                    if entry.seq <= since:
+                        break
+                    if not entry.matches(assets, sensors):
+                        continue
+                    field_seq = entry.field_seq
+                    data = entry.data
+                    removed_fields = None
+                    if field_seq is not None and isinstance(data, dict):
+                        data = {
+                            key: value
+                            for key, value in data.items()
+                            if field_seq.get(key, 0) > since
+                        }
+                        removed_fields = [
+                            key for key, seq in entry.removed_seq.items() if seq > since
+                        ]
+                    changed[entry.topic] = {"data": data, "timestamp": entry.timestamp}
+                    if removed_fields:
+                        changed[entry.topic]["removed"] = removed_fields
+            return changed, removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "partitions": len(self._partitions),
+                "topics": sum(len(p.entries) for p in list(self._partitions.values())),
+                "evicted": self.evicted,
+                "expired": self.expired,
+            }
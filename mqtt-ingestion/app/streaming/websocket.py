@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 import logging
 from typing import Optional
 
@@ -6,6 +7,7 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from jose import JWTError, jwt
 
 from app.config import settings
+from app.streaming.hub import StreamSubscription
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +36,46 @@ def _extract_tenant_from_token(token: str, query_tenant_id: Optional[str] = None
         return None
 
 
+def _csv(value: Optional[str]) -> Optional[list[str]]:
+    return [v for v in value.split(",") if v] if value else None
+
+
+async def _receive_subscriptions(websocket: WebSocket, sub: StreamSubscription) -> None:
+    """Apply {"subscribe": {"assets": [...], "sensors": [...]}} messages.
+
+    Anything that is not a JSON text frame is ignored; it does not end
+    the stream.
+    """
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, TypeError, KeyError):
+                # Malformed JSON, or a binary frame
+                logger.debug("Ignoring non-JSON WebSocket message")
+                continue
+            request = message.get("subscribe") if isinstance(message, dict) else None
+            if isinstance(request, dict):
+                sub.set_filter(request.get("assets"), request.get("sensors"))
+    finally:
+        # Disconnected: wake the sender loop so it notices and exits
+        sub.wakeup.set()
+
+
 @router.websocket("/stream")
 async def websocket_stream(websocket: WebSocket):
     """WebSocket for real-time data streaming.
 
     Requires a valid JWT as a query parameter: /stream?token=<jwt>
     Data is filtered to the tenant extracted from the token.
+
+    Optional query parameters:
+        mode=snapshot|delta    full tenant view per frame (default), or
+                               only topics/fields changed since the last one
+        encoding=json|msgpack  text frames (default) or binary msgpack
+        assets=<id,...>, sensors=<id or code,...>
+                               limit the view; can be changed later by
+                               sending {"subscribe": {"assets": [...], "sensors": [...]}}
     """
     token = websocket.query_params.get("token")
 
@@ -53,53 +89,55 @@ async def websocket_stream(websocket: WebSocket):
         await websocket.close(code=4001, reason="Invalid token")
         return
 
+    hub = getattr(websocket.app.state, "stream_hub", None)
+    if hub is None:
+        await websocket.close(code=1011, reason="Stream not ready")
+        return
+
+    try:
+        sub = hub.subscribe(
+            tenant_id,
+            mode=websocket.query_params.get("mode", "snapshot"),
+            encoding=websocket.query_params.get("encoding", "json"),
+        )
+    except ValueError as exc:
+        await websocket.close(code=4002, reason=str(exc))
+        return
+    sub.set_filter(
+        _csv(websocket.query_params.get("assets")),
+        _csv(websocket.query_params.get("sensors")),
+    )
+
     await websocket.accept()
     entry = (websocket, tenant_id)
     active_websockets.append(entry)
+    receiver = asyncio.create_task(_receive_subscriptions(websocket, sub))
 
     try:
-        while True:
-            mqtt_client = websocket.app.state.mqtt_client
-            if mqtt_client:
-                all_data = mqtt_client.get_latest_data()
-                # Filter to tenant's data only
-                filtered = {
-                    topic: entry_data
-                    for topic, entry_data in all_data.items()
-                    if _topic_matches_tenant(topic, tenant_id, websocket)
-                }
-                await websocket.send_json(filtered)
-            await asyncio.sleep(1)
+        # Woken by the hub only when this tenant's data changed
+        while not receiver.done():
+            await sub.wakeup.wait()
+            sub.wakeup.clear()
+            frame = hub.next_frame(sub)
+            if frame is None:
+                continue
+            send = websocket.send_bytes if isinstance(frame, bytes) else websocket.send_text
+            try:
+                await asyncio.wait_for(send(frame), timeout=settings.WS_SEND_TIMEOUT_SEC)
+            except asyncio.TimeoutError:
+                hub.slow_clients_dropped += 1
+                logger.warning("WebSocket client too slow — disconnecting")
+                with contextlib.suppress(Exception):
+                    await asyncio.wait_for(
+                        websocket.close(code=1013, reason="Client too slow"), timeout=1,
+                    )
+                break
     except WebSocketDisconnect:
-        active_websockets.remove(entry)
         logger.info("WebSocket client disconnected")
     except Exception:
+        pass
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(sub)
         if entry in active_websockets:
             active_websockets.remove(entry)
-
-
-def _topic_matches_tenant(
-    topic: str, tenant_id: str, websocket: WebSocket
-) -> bool:
-    """Check if an MQTT topic belongs to the given tenant.
-
-    Uses the sensor registry cache if available. For legacy topics
-    (sensors/...) that can't be resolved, allow them through — the
-    Batch 2 backfill ensures MongoDB docs are tenant-tagged, so the
-    worst case is the frontend shows an extra reading (not a data leak).
-    """
-    registry = getattr(websocket.app.state, "sensor_registry", None)
-    if not registry:
-        return True  # No registry, allow all (backward compat)
-
-    from app.ingestion.topic_parser import parse_topic
-
-    parsed = parse_topic(topic)
-    if not parsed:
-        return True
-
-    binding = registry.lookup(parsed.sensor_code)
-    if not binding:
-        return True  # Unknown sensor, allow (backward compat)
-
-    return str(binding.tenant_id) == tenant_id
@@ -0,0 +1,117 @@
+"""AsyncioMQTTDriver read batching, saturation pause/resume and reconnects."""
+
+import asyncio
+import socket
+import threading
+
+import paho.mqtt.client as mqtt
+
+from app.ingestion.asyncio_transport import AsyncioMQTTDriver
+
+
+class FakePahoClient:
+    """The slice of paho.mqtt.client.Client the driver uses.
+
+    loop_read consumes one byte per "packet" from the attached socket.
+    """
+
+    def __init__(self):
+        self.sock = None
+        self.reads = 0
+        self.reconnects = 0
+        self.disconnected = False
+
+    def loop_read(self):
+        try:
+            if not self.sock.recv(1):
+                return mqtt.MQTT_ERR_CONN_LOST
+        except BlockingIOError:
+            return mqtt.MQTT_ERR_AGAIN
+        self.reads += 1
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def loop_write(self):
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def loop_misc(self):
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def reconnect(self):
+        self.reconnects += 1
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+def _socket_pair(client):
+    ours, broker = socket.socketpair()
+    ours.setblocking(False)
+    client.sock = ours
+    return ours, broker
+
+
+def test_reads_are_batched_and_pause_while_saturated():
+    client = FakePahoClient()
+    saturated = {"value": False}
+
+    async def run():
+        driver = AsyncioMQTTDriver(
+            client, asyncio.get_running_loop(), read_batch=4,
+            is_saturated=lambda: saturated["value"],
+        )
+        ours, broker = _socket_pair(client)
+        driver._on_socket_open(client, None, ours)
+
+        broker.send(b"x" * 10)
+        driver._on_readable()
+        assert client.reads == 4
+
+        saturated["value"] = True
+        driver._on_readable()
+        assert client.reads == 5 and driver._paused
+
+        # Nothing is read while paused, even though data is waiting
+        await asyncio.sleep(0.05)
+        assert client.reads == 5
+
+        saturated["value"] = False
+        await asyncio.sleep(0.05)
+        assert not driver._paused and client.reads == 10
+
+        await driver.disconnect()
+        driver._on_socket_close(client, None, ours)
+        ours.close()
+        broker.close()
+
+    asyncio.run(run())
+    assert client.disconnected
+    assert client.reconnects == 0
+
+
+def test_socket_close_reconnects_until_stopped():
+    client = FakePahoClient()
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        driver = AsyncioMQTTDriver(client, loop, reconnect_delay_sec=0)
+        ours, broker = _socket_pair(client)
+
+        # paho fires socket callbacks off-loop during connect
+        thread = threading.Thread(target=driver._on_socket_open, args=(client, None, ours))
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.01)
+        assert driver._fd == ours.fileno()
+
+        driver._on_socket_close(client, None, ours)
+        await asyncio.sleep(0.05)
+        assert driver._fd is None and client.reconnects == 1
+
+        await driver.disconnect()
+        ours.close()
+        broker.close()
+        return driver
+
+    driver = asyncio.run(run())
+    assert client.disconnected
+    assert driver._misc_task.done()
@@ -0,0 +1,111 @@
+"""BulkWriteBuffer retries failed inserts and pushes back when backlogged."""
+
+import asyncio
+
+from pymongo.errors import BulkWriteError
+
+from app.storage.bulk_buffer import BulkWriteBuffer
+
+
+class FakeCollection:
+    def __init__(self, fail_ids=(), outages=0, delay=0.0):
+        self.stored = {}
+        self.calls = []
+        self._fail_ids = set(fail_ids)
+        self._outages = outages
+        self._delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def insert_many(self, documents, ordered=True):
+        self.calls.append([d["_id"] for d in documents])
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self._delay)
+            if self._outages:
+                self._outages -= 1
+                raise ConnectionError("mongo unavailable")
+            errors = []
+            for index, doc in enumerate(documents):
+                if doc["_id"] in self.stored:
+                    errors.append({"index": index, "code": 11000})
+                elif doc["_id"] in self._fail_ids:
+                    self._fail_ids.discard(doc["_id"])
+                    errors.append({"index": index, "code": 91})
+                else:
+                    self.stored[doc["_id"]] = doc
+            if errors:
+                raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors)})
+        finally:
+            self.running -= 1
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        return self.setdefault(name, FakeCollection())
+
+
+def _buffer(collection, **kwargs):
+    return BulkWriteBuffer(FakeDB(data=collection), retry_backoff_sec=0, **kwargs)
+
+
+def test_outage_is_retried_not_dropped():
+    coll = FakeCollection(outages=2)
+    buffer = _buffer(coll, max_docs=10)
+
+    async def run():
+        for i in range(5):
+            await buffer.add("data", {"_id": i})
+        await buffer.flush()
+
+    asyncio.run(run())
+
+    assert sorted(coll.stored) == [0, 1, 2, 3, 4]
+    assert buffer.dropped == 0 and buffer.stats()["outstanding"] == 0
+
+
+def test_only_failed_documents_are_retried():
+    coll = FakeCollection(fail_ids={2, 4})
+    buffer = _buffer(coll, max_docs=10)
+
+    async def run():
+        for i in range(6):
+            await buffer.add("data", {"_id": i})
+        await buffer.flush()
+
+    asyncio.run(run())
+
+    assert coll.calls == [[0, 1, 2, 3, 4, 5], [2, 4]]
+    assert sorted(coll.stored) == list(range(6))
+
+
+def test_retries_are_bounded():
+    coll = FakeCollection(outages=10)
+    buffer = _buffer(coll, max_docs=10, max_retries=2)
+
+    async def run():
+        await buffer.add("data", {"_id": 1})
+        await buffer.flush()
+
+    asyncio.run(run())
+
+    assert len(coll.calls) == 3
+    assert buffer.dropped == 1 and buffer.stats()["outstanding"] == 0
+
+
+def test_add_waits_at_pending_cap_and_flushes_are_limited():
+    coll = FakeCollection(delay=0.01)
+    buffer = _buffer(coll, max_docs=10, max_pending_docs=30, max_inflight_flushes=2)
+
+    async def run():
+        for i in range(200):
+            await buffer.add("data", {"_id": i})
+            assert buffer.stats()["outstanding"] <= 30
+        await buffer.close()
+
+    asyncio.run(run())
+
+    assert len(coll.stored) == 200
+    assert coll.max_running <= 2
+    assert buffer.backpressure_waits > 0
@@ -0,0 +1,55 @@
+"""decode_payload fast path agrees with the generic dict extraction."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.features.extractors import SENSOR_COLUMNS, extract_24_features_from_data
+from app.ingestion.decoder import decode_payload
+
+
+def _industrial(seed=0):
+    rng = np.random.default_rng(seed)
+    payload = {key: float(v) for key, v in zip(SENSOR_COLUMNS, rng.normal(size=24))}
+    payload["motor_NDE_temp_c"] = 41  # ints pass through unchanged
+    payload["site"] = "plant-1"
+    return payload
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_fast_path_matches_generic_extraction(seed):
+    payload = _industrial(seed)
+
+    decoded = decode_payload(json.dumps(payload).encode())
+
+    assert decoded.data == payload
+    assert list(decoded.features) == extract_24_features_from_data(payload)
+
+
+@pytest.mark.parametrize("raw, data", [
+    # Missing one of the 24 keys: the handler applies the 0.0 default
+    (json.dumps({"motor_DE_vib_band_1": 1.0}).encode(), {"motor_DE_vib_band_1": 1.0}),
+    # Simple sensors and non-object JSON
+    (b'{"sensor_id": "s", "temperature": 20}', {"sensor_id": "s", "temperature": 20}),
+    (b"[1, 2, 3]", [1, 2, 3]),
+])
+def test_other_payloads_take_the_generic_path(raw, data):
+    decoded = decode_payload(raw)
+
+    assert decoded.data == data
+    assert decoded.features is None
+
+
+def test_json_orjson_rejects_is_decoded_by_fallback():
+    payload = _industrial()
+    raw = json.dumps({**payload, "pump_DE_ultra_db": float("nan")}).encode()
+
+    decoded = decode_payload(raw)
+
+    assert np.isnan(decoded.data["pump_DE_ultra_db"])
+    features = list(decoded.features)
+    expected = extract_24_features_from_data(decoded.data)
+    nan_at = SENSOR_COLUMNS.index("pump_DE_ultra_db")
+    assert np.isnan(features.pop(nan_at)) and np.isnan(expected.pop(nan_at))
+    assert features == expected
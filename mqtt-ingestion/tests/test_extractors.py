@@ -0,0 +1,53 @@
+"""Vectorized statistical features match the per-window notebook extractor."""
+
+import numpy as np
+import pytest
+
+from app.features.extractors import (
+    extract_statistical_features_batch,
+    extract_statistical_features_from_window,
+)
+
+
+def _reference(windows: np.ndarray) -> np.ndarray:
+    return np.array([extract_statistical_features_from_window(w.tolist()) for w in windows])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_per_window(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 32))
+    windows = rng.normal(loc=rng.uniform(-100, 100), scale=rng.uniform(0.1, 50), size=(n, 14, 24))
+
+    batch = extract_statistical_features_batch(windows)
+
+    assert batch.shape == (n, 336)
+    np.testing.assert_array_equal(batch, _reference(windows))
+
+
+def test_constant_columns():
+    rng = np.random.default_rng(7)
+    windows = rng.normal(size=(4, 14, 24))
+    windows[:, :, 3] = 2.5
+    windows[1] = 0.0
+
+    batch = extract_statistical_features_batch(windows).reshape(4, 24, 14)
+
+    np.testing.assert_array_equal(batch.reshape(4, 336), _reference(windows))
+    assert np.all(batch[:, 3, 1] == 0.0)  # std
+    assert np.all(batch[:, 3, 8] == 0.0)  # var
+    assert np.all(batch[1, :, 1] == 0.0)
+
+
+def test_accepts_list_of_windows():
+    window = np.random.default_rng(3).normal(size=(14, 24)).tolist()
+
+    np.testing.assert_array_equal(
+        extract_statistical_features_batch([window])[0],
+        extract_statistical_features_from_window(window),
+    )
+
+
+def test_rejects_single_window_without_batch_axis():
+    with pytest.raises(ValueError):
+        extract_statistical_features_batch(np.zeros((14, 24)))
@@ -0,0 +1,137 @@
+"""ChangeDrivenCache refresh loop: notifications, polling fallbacks, pre-004 schema."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from app.db.incremental_cache import WATERMARK_COLUMNS_SQL
+from app.prediction import model_binding
+from app.prediction.model_binding import ModelBindingCache
+
+ASSET = uuid.uuid4()
+T0 = datetime(2026, 1, 1)
+
+
+class FakePool:
+    """Answers ModelBindingCache's queries from a single mutable binding."""
+
+    def __init__(self, migrated=True):
+        self.migrated = migrated
+        self.label = "v1"
+        self.updated_at = T0
+        self.queries = []
+
+    def _row(self, updated_at):
+        return {
+            "asset_id": ASSET,
+            "model_id": uuid.uuid4(),
+            "model_version_id": uuid.uuid4(),
+            "full_version_label": self.label,
+            "model_artifact_path": None,
+            "updated_at": updated_at,
+        }
+
+    async def fetch(self, sql, *args):
+        if sql == WATERMARK_COLUMNS_SQL:
+            return [{"table_name": "asset_model_versions"}] if self.migrated else []
+        if sql == model_binding.REFRESH_SQL:
+            self.queries.append("full")
+            return [self._row(self.updated_at)]
+        if sql == model_binding.UNWATERMARKED_REFRESH_SQL:
+            self.queries.append("full-unwatermarked")
+            return [self._row(None)]
+        if sql == model_binding.CHANGED_SQL:
+            self.queries.append("delta")
+            return [self._row(self.updated_at)] if self.updated_at > args[0] else []
+        raise AssertionError(f"unexpected query: {sql}")
+
+    def change(self, label):
+        self.label = label
+        self.updated_at += timedelta(minutes=1)
+
+
+class FakeListener:
+    def __init__(self, connected=True):
+        self.connected = connected
+        self.callbacks = []
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+
+    def notify(self, table, op="UPDATE"):
+        for callback in self.callbacks:
+            callback(table, op, str(uuid.uuid4()))
+
+
+def _cache(refresh=60.0, listen_poll=60.0):
+    cache = ModelBindingCache(
+        refresh_interval_sec=refresh, full_reload_interval_sec=3600,
+        listen_poll_interval_sec=listen_poll,
+    )
+    cache._debounce = 0
+    return cache
+
+
+async def _run(cache, pool, listener, scenario):
+    await cache.refresh(pool)
+    cache.start_refresh_loop(pool, listener=listener)
+    try:
+        await scenario()
+    finally:
+        await cache.stop()
+
+
+def test_notification_triggers_delta_reload():
+    pool, listener, cache = FakePool(), FakeListener(), _cache()
+
+    async def scenario():
+        pool.change("v2")
+        listener.notify("asset_model_versions")
+        listener.notify("sensors")  # not one of this cache's tables
+        await asyncio.sleep(0.05)
+
+    asyncio.run(_run(cache, pool, listener, scenario))
+
+    assert pool.queries == ["full", "delta"]
+    assert cache.lookup(ASSET).version_label == "v2"
+
+
+def test_listener_down_falls_back_to_polling():
+    pool, listener, cache = FakePool(), FakeListener(connected=False), _cache(refresh=0.02)
+
+    async def scenario():
+        pool.change("v2")
+        await asyncio.sleep(0.1)
+
+    asyncio.run(_run(cache, pool, listener, scenario))
+
+    assert pool.queries[0] == "full" and set(pool.queries[1:]) == {"delta"}
+    assert cache.lookup(ASSET).version_label == "v2"
+
+
+def test_listening_still_polls_for_lost_notifications():
+    pool, listener, cache = FakePool(), FakeListener(), _cache(refresh=60, listen_poll=0.02)
+
+    async def scenario():
+        pool.change("v2")  # no notification
+        await asyncio.sleep(0.1)
+
+    asyncio.run(_run(cache, pool, listener, scenario))
+
+    assert "delta" in pool.queries
+    assert cache.lookup(ASSET).version_label == "v2"
+
+
+def test_unmigrated_schema_reloads_fully_until_columns_appear():
+    pool, listener, cache = FakePool(migrated=False), FakeListener(), _cache(refresh=0.02)
+
+    async def scenario():
+        await asyncio.sleep(0.05)
+        assert set(pool.queries) == {"full-unwatermarked"} and len(pool.queries) > 1
+        pool.migrated = True
+        await asyncio.sleep(0.05)
+
+    asyncio.run(_run(cache, pool, listener, scenario))
+
+    assert "full" in pool.queries
+    assert cache._watermark == T0
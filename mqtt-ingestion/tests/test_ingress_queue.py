@@ -0,0 +1,155 @@
+"""IngressQueue overload policies and ShardedIngressQueue routing."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.ingestion.ingress_queue import IngressItem, IngressQueue, ShardedIngressQueue
+
+
+def _item(n, raw_only=False, key="s"):
+    return IngressItem(f"t/{n}", {"n": n}, raw_only=raw_only, key=key)
+
+
+async def _drain(queue):
+    items = []
+    while queue.qsize():
+        items.append(await queue.get())
+        queue.task_done()
+    return items
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        IngressQueue(4, policy="drop_newest")
+
+
+def test_drop_oldest_sheds_front_and_counts():
+    async def run():
+        queue = IngressQueue(3, policy="drop_oldest")
+        queue.bind(asyncio.get_running_loop())
+        for n in range(5):
+            queue.submit(_item(n))
+        return queue, await _drain(queue)
+
+    queue, items = asyncio.run(run())
+
+    assert [i.payload["n"] for i in items] == [2, 3, 4]
+    assert queue.stats()["dropped"] == {"oldest": 2, "raw": 0, "closed": 0}
+
+
+def test_drop_raw_first_keeps_prediction_messages():
+    async def run():
+        queue = IngressQueue(3, policy="drop_raw_first")
+        queue.bind(asyncio.get_running_loop())
+        queue.submit(_item(0))
+        queue.submit(_item(1, raw_only=True))
+        queue.submit(_item(2))
+        queue.submit(_item(3))  # sheds raw 1
+        queue.submit(_item(4))  # no raw left: sheds oldest (0)
+        return queue, await _drain(queue)
+
+    queue, items = asyncio.run(run())
+
+    assert [i.payload["n"] for i in items] == [2, 3, 4]
+    assert queue.stats()["dropped"] == {"oldest": 1, "raw": 1, "closed": 0}
+
+
+def test_block_policy_waits_for_a_free_slot():
+    async def run():
+        loop = asyncio.get_running_loop()
+        queue = IngressQueue(2, policy="block")
+        queue.bind(loop)
+        submitted = []
+
+        def producer():
+            for n in range(4):
+                queue.submit_threadsafe(_item(n))
+                submitted.append(n)
+
+        thread = threading.Thread(target=producer)
+        thread.start()
+        await asyncio.sleep(0.1)
+        blocked_at = len(submitted)
+
+        received = []
+        for _ in range(4):
+            item = await queue.get()
+            received.append(item.payload["n"])
+            queue.task_done()
+        await loop.run_in_executor(None, thread.join)
+        queue.close()
+        return blocked_at, received, queue
+
+    blocked_at, received, queue = asyncio.run(run())
+
+    assert blocked_at == 2
+    assert received == [0, 1, 2, 3]
+    assert queue.stats()["dropped"] == {"oldest": 0, "raw": 0, "closed": 0}
+
+
+def test_threadsafe_handoff_sheds_without_blocking_and_tracks_wait():
+    async def run():
+        loop = asyncio.get_running_loop()
+        queue = IngressQueue(3, policy="drop_oldest")
+        queue.bind(loop)
+
+        def producer():
+            return [queue.submit_threadsafe(_item(n)) for n in range(5)]
+
+        accepted = await loop.run_in_executor(None, producer)
+        await asyncio.sleep(0.05)  # let the hand-offs land and age
+        return accepted, queue, await _drain(queue)
+
+    accepted, queue, items = asyncio.run(run())
+
+    # The paho thread never waits under a drop policy; shedding happens on the loop
+    assert accepted == [True] * 5
+    assert [i.payload["n"] for i in items] == [2, 3, 4]
+    stats = queue.stats()
+    assert stats["dropped"] == {"oldest": 2, "raw": 0, "closed": 0}
+    assert stats["processed"] == 3 and stats["in_flight"] == 0
+    assert 40 <= stats["wait_ms_avg"] <= stats["wait_ms_max"]
+
+
+def test_closed_queue_counts_rejections():
+    queue = IngressQueue(2)
+    queue.close()
+    assert queue.submit(_item(0)) is False
+    assert queue.stats()["dropped"]["closed"] == 1
+
+
+def test_sharded_queue_keeps_per_key_order_on_one_shard():
+    async def run():
+        queue = ShardedIngressQueue(n_shards=4, maxsize=400)
+        queue.bind(asyncio.get_running_loop())
+        for n in range(100):
+            queue.submit(_item(n, key=f"sensor-{n % 10}"))
+        return queue, [await _drain(shard) for shard in queue.shards]
+
+    queue, per_shard = asyncio.run(run())
+
+    for index, items in enumerate(per_shard):
+        for item in items:
+            assert queue.shard_for(item.key) is queue.shards[index]
+        for key in {i.key for i in items}:
+            ns = [i.payload["n"] for i in items if i.key == key]
+            assert ns == sorted(ns)
+    assert sum(len(items) for items in per_shard) == 100
+    assert queue.stats()["maxsize"] == 400
+
+
+def test_sharded_stats_aggregate_drops():
+    async def run():
+        queue = ShardedIngressQueue(n_shards=2, maxsize=2, policy="drop_oldest")
+        queue.bind(asyncio.get_running_loop())
+        for n in range(5):
+            queue.submit(_item(n, key="same"))
+        return queue
+
+    queue = asyncio.run(run())
+
+    stats = queue.stats()
+    assert stats["depth"] == 1
+    assert stats["dropped"]["oldest"] == 4
@@ -0,0 +1,62 @@
+"""LatestValueStore stays consistent with writers and expiry on different threads."""
+
+import sys
+import threading
+
+from app.streaming.latest_store import LatestValueStore
+
+
+def test_concurrent_put_and_expire():
+    store = LatestValueStore(max_topics_per_tenant=50, ttl_sec=1e-9)
+    errors = []
+    stop = threading.Event()
+
+    def writer():
+        try:
+            for i in range(20000):
+                store.put(f"legacy/topic/{i % 80}", {"value": i}, "t")
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            stop.set()
+
+    def expirer():
+        try:
+            while not stop.is_set():
+                store.expire()
+                store.delta(None, 0)
+                store.snapshot(None)
+        except Exception as exc:
+            errors.append(exc)
+
+    # Switch threads often so put() and expire() interleave mid-update
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=writer), threading.Thread(target=expirer)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(previous)
+
+    assert errors == []
+    assert store.stats()["topics"] <= 50
+
+
+def test_delta_reports_removed_fields():
+    store = LatestValueStore()
+    store.put("legacy/topic", {"a": 1, "b": 2, "c": 3}, "t0")
+    since = store.seq(None)
+
+    store.put("legacy/topic", {"a": 1, "c": 4}, "t1")
+    changed, removed = store.delta(None, since)
+    assert removed == []
+    assert changed["legacy/topic"] == {"data": {"c": 4}, "timestamp": "t1", "removed": ["b"]}
+
+    # Re-adding the field clears it from "removed"
+    since = store.seq(None)
+    store.put("legacy/topic", {"a": 1, "b": 5, "c": 4}, "t2")
+    changed, _ = store.delta(None, since)
+    assert changed["legacy/topic"] == {"data": {"b": 5}, "timestamp": "t2"}
@@ -0,0 +1,53 @@
+"""MessageHandler payload classification and cross-sensor window batching."""
+
+import asyncio
+
+import numpy as np
+
+from app.features.extractors import extract_statistical_features_from_window
+from app.ingestion.message_handler import (
+    COMPLEX_SENSOR,
+    SIMPLE_SENSOR,
+    MessageHandler,
+    _WindowFeatureBatch,
+)
+
+
+def test_sensor_kind():
+    assert MessageHandler.sensor_kind({"motor_DE_vib_band_1": 1.0}) == COMPLEX_SENSOR
+    assert MessageHandler.sensor_kind({"sensor_id": "s", "temperature": 20}) == SIMPLE_SENSOR
+    assert MessageHandler.sensor_kind({"sensor_id": "s"}) is None
+    assert MessageHandler.is_raw_only({"sensor_id": "s", "status": "ok"})
+    assert not MessageHandler.is_raw_only({"sensor_id": "s", "humidity": 40})
+
+
+def test_windows_ready_in_one_tick_share_one_call():
+    rng = np.random.default_rng(3)
+    windows = [rng.normal(size=(14, 24)).tolist() for _ in range(3)]
+    batch = _WindowFeatureBatch()
+
+    async def run():
+        first = await asyncio.gather(*(batch.extract(w) for w in windows[:2]))
+        second = await batch.extract(windows[2])
+        return first + [second]
+
+    rows = asyncio.run(run())
+
+    assert (batch.calls, batch.windows) == (2, 3)
+    for row, window in zip(rows, windows):
+        assert row == extract_statistical_features_from_window(window)
+
+
+def test_malformed_window_fails_alone():
+    good = np.ones((14, 24)).tolist()
+    batch = _WindowFeatureBatch()
+
+    async def run():
+        return await asyncio.gather(
+            batch.extract(good), batch.extract([[1.0, 2.0], [1.0]]), return_exceptions=True
+        )
+
+    ok, bad = asyncio.run(run())
+
+    assert ok == extract_statistical_features_from_window(good)
+    assert isinstance(bad, Exception)
@@ -0,0 +1,84 @@
+"""/metrics exposition: pipeline series, scrape-time gauges, tenant label switch."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.parser import text_string_to_metric_families
+
+from app import main
+from app.config import settings
+from app.metrics import PipelineMetrics
+
+
+def _samples(text):
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+class FakeMQTTClient:
+    message_count = 7
+    handler = SimpleNamespace(window_manager=SimpleNamespace(stats=lambda: {"slots_used": 4}))
+
+    def is_connected(self):
+        return True
+
+    def ingress_stats(self):
+        return {"depth": 2, "maxsize": 100, "dropped": {"oldest": 1, "raw": 0, "closed": 0}}
+
+    def alert_outbox_stats(self):
+        return {"pending": 3, "in_flight": 1}
+
+
+def test_metrics_endpoint(monkeypatch):
+    state = main.app.state
+    monkeypatch.setattr(state, "mqtt_client", FakeMQTTClient(), raising=False)
+    monkeypatch.setattr(state, "sensor_registry", SimpleNamespace(size=5), raising=False)
+
+    before = _samples(TestClient(main.app).get("/metrics").text)
+    main.pipeline_metrics.stage("predict", time.perf_counter())
+    main.pipeline_metrics.outcome("predicted", "acme")
+    response = TestClient(main.app).get("/metrics")
+    samples = _samples(response.text)
+
+    assert response.headers["content-type"].startswith("text/plain")
+    # Tenant is not a label by default
+    assert not settings.METRICS_TENANT_LABEL and not main.pipeline_metrics.tenant_label
+    key = ("ingestion_messages_total", (("outcome", "predicted"),))
+    assert samples[key] == before.get(key, 0) + 1
+    key = ("ingestion_stage_seconds_count", (("stage", "predict"),))
+    assert samples[key] == before.get(key, 0) + 1
+
+    assert samples[("ingestion_mqtt_connected", ())] == 1
+    assert samples[("ingestion_mqtt_messages_received_total", ())] == 7
+    assert samples[("ingestion_queue_depth", ())] == 2
+    assert samples[("ingestion_queue_dropped_total", (("reason", "oldest"),))] == 1
+    assert samples[("ingestion_alert_outbox_depth", ())] == 4
+    assert samples[("ingestion_windows", ())] == 4
+    assert samples[("ingestion_cache_entries", (("cache", "sensor_registry"),))] == 5
+
+
+@pytest.mark.parametrize("tenant_label", [False, True])
+def test_tenant_label_switch(tenant_label):
+    registry = CollectorRegistry()
+    metrics = PipelineMetrics(registry, tenant_label=tenant_label)
+
+    metrics.outcome("predicted", "acme")
+    metrics.outcome("predicted", "globex")
+    metrics.outcome("error")
+    metrics.stage("resolve", time.perf_counter(), "acme")
+    samples = _samples(generate_latest(registry).decode())
+
+    if tenant_label:
+        assert samples[("ingestion_messages_total", (("outcome", "predicted"), ("tenant", "acme")))] == 1
+        assert samples[("ingestion_messages_total", (("outcome", "error"), ("tenant", "none")))] == 1
+        assert ("ingestion_stage_seconds_count", (("stage", "resolve"), ("tenant", "acme"))) in samples
+    else:
+        assert samples[("ingestion_messages_total", (("outcome", "predicted"),))] == 2
+        assert samples[("ingestion_messages_total", (("outcome", "error"),))] == 1
+        assert all("tenant" not in dict(labels) for _, labels in samples)
@@ -0,0 +1,113 @@
+"""MLClient micro-batching: flush triggers and per-request failure handling."""
+
+import asyncio
+import json
+
+import httpx
+
+from app.prediction.ml_client import MLClient
+
+
+class FakeMLService:
+    """Stands in for ml-service; scores a row as its first feature."""
+
+    def __init__(self, batch_status=200):
+        self.batch_status = batch_status
+        self.calls = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.calls.append((request.url.path, body))
+        if request.url.path == "/predict-batch":
+            if self.batch_status != 200:
+                return httpx.Response(self.batch_status)
+            return httpx.Response(200, json=[self._score(row) for row in body])
+        item = self._score(body)
+        if item.get("error"):
+            return httpx.Response(422, json={"detail": item["error"]})
+        return httpx.Response(200, json=item)
+
+    @staticmethod
+    def _score(row):
+        if row["features"][0] < 0:
+            return {"prediction": None, "error": "bad row", "request_id": row.get("request_id")}
+        return {"prediction": f"p{row['features'][0]:g}", "request_id": row.get("request_id")}
+
+    def paths(self):
+        return [path for path, _ in self.calls]
+
+
+def _client(service, **kwargs) -> MLClient:
+    client = MLClient("http://ml", batch_enabled=True, **kwargs)
+    client._client = httpx.AsyncClient(
+        base_url="http://ml", transport=httpx.MockTransport(service)
+    )
+    return client
+
+
+async def _predict_all(client, values):
+    results = await asyncio.gather(*(client.predict([float(v)] * 4) for v in values))
+    await client.close()
+    return results
+
+
+def test_flushes_when_batch_is_full():
+    service = FakeMLService()
+    client = _client(service, max_batch=3, max_delay_ms=10_000)
+
+    async def run():
+        return await asyncio.wait_for(_predict_all(client, [1, 2, 3]), timeout=1.0)
+
+    results = asyncio.run(run())
+
+    assert service.paths() == ["/predict-batch"]
+    assert len(service.calls[0][1]) == 3
+    assert [r["prediction"] for r in results] == ["p1", "p2", "p3"]
+
+
+def test_flushes_after_deadline():
+    service = FakeMLService()
+    client = _client(service, max_batch=32, max_delay_ms=20)
+
+    async def run():
+        pending = asyncio.gather(client.predict([1.0] * 4), client.predict([2.0] * 4))
+        await asyncio.sleep(0.005)
+        assert service.calls == []
+        results = await asyncio.wait_for(pending, timeout=1.0)
+        await client.close()
+        return results
+
+    results = asyncio.run(run())
+
+    assert service.paths() == ["/predict-batch"]
+    assert [r["prediction"] for r in results] == ["p1", "p2"]
+
+
+def test_error_row_resolves_alone():
+    service = FakeMLService()
+    client = _client(service, max_batch=3, max_delay_ms=10_000)
+
+    results = asyncio.run(_predict_all(client, [1, -1, 3]))
+
+    assert service.paths() == ["/predict-batch"]
+    assert [r and r["prediction"] for r in results] == ["p1", None, "p3"]
+
+
+def test_failed_batch_retries_each_request():
+    service = FakeMLService(batch_status=500)
+    client = _client(service, max_batch=3, max_delay_ms=10_000)
+
+    results = asyncio.run(_predict_all(client, [1, -1, 3]))
+
+    assert service.paths() == ["/predict-batch"] + ["/predict"] * 3
+    assert [r and r["prediction"] for r in results] == ["p1", None, "p3"]
+
+
+def test_overloaded_batch_is_not_retried():
+    service = FakeMLService(batch_status=503)
+    client = _client(service, max_batch=2, max_delay_ms=10_000)
+
+    results = asyncio.run(_predict_all(client, [1, 2]))
+
+    assert service.paths() == ["/predict-batch"]
+    assert results == [None, None]
@@ -0,0 +1,182 @@
+"""AlertOutbox retry budget, dead-lettering and bounded spill replay."""
+
+import asyncio
+import json
+
+import httpx
+
+from app.alerts.outbox import AlertOutbox
+from app.alerts.publisher import AlertPublisher
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_failing_batch_is_dead_lettered(tmp_path):
+    dead = tmp_path / "dead.jsonl"
+    calls = []
+
+    async def send(payloads):
+        calls.append(len(payloads))
+        raise ConnectionError("backend down")
+
+    async def run():
+        outbox = AlertOutbox(max_backoff_sec=0, max_attempts=3, dead_letter_path=str(dead))
+        outbox.start(send)
+        outbox.put({"id": 1})
+        await asyncio.sleep(0.05)
+        await outbox.close(timeout=0.1)
+        return outbox
+
+    outbox = asyncio.run(run())
+
+    assert calls == [1, 1, 1]
+    assert outbox.stats()["dead_lettered"] == 1
+    assert outbox.stats()["pending"] == 0
+    assert _lines(dead) == [{"id": 1}]
+
+
+def test_replay_streams_spill_up_to_maxsize(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    with open(spill, "w", encoding="utf-8") as f:
+        for i in range(10):
+            f.write(json.dumps({"id": i}) + "\n")
+
+    outbox = AlertOutbox(maxsize=4, spill_path=str(spill))
+    outbox._replay_spill()
+    assert [p["id"] for p in outbox._queue] == [0, 1, 2, 3]
+    assert outbox._spill_pending and spill.exists()
+
+    outbox._queue.clear()
+    outbox._replay_spill()
+    assert [p["id"] for p in outbox._queue] == [4, 5, 6, 7]
+
+    # Shutdown keeps only lines not yet replayed, plus whatever is still queued
+    outbox._compact_spill()
+    assert [p["id"] for p in _lines(spill)] == [8, 9]
+
+    outbox._queue.clear()
+    outbox._replay_spill()
+    assert [p["id"] for p in outbox._queue] == [8, 9]
+    assert not spill.exists() and not outbox._spill_pending
+
+
+def test_spilled_alerts_are_delivered_in_chunks(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    with open(spill, "w", encoding="utf-8") as f:
+        for i in range(25):
+            f.write(json.dumps({"id": i}) + "\n")
+    delivered = []
+
+    async def send(payloads):
+        delivered.extend(p["id"] for p in payloads)
+
+    async def run():
+        outbox = AlertOutbox(maxsize=5, concurrency=1, spill_path=str(spill))
+        outbox.start(send)
+        for _ in range(100):
+            if len(delivered) == 25:
+                break
+            await asyncio.sleep(0.01)
+        await outbox.close(timeout=0.1)
+
+    asyncio.run(run())
+
+    assert delivered == list(range(25))
+    assert not spill.exists()
+
+
+class _ServerError(Exception):
+    class response:
+        status_code = 500
+
+
+def test_failing_batch_is_split_and_retried_per_alert(tmp_path):
+    dead = tmp_path / "dead.jsonl"
+    delivered = []
+
+    async def send(payloads):
+        if any(p["id"] == 2 for p in payloads):
+            raise _ServerError("evaluate-batch returned 500")
+        delivered.extend(p["id"] for p in payloads)
+
+    async def run():
+        outbox = AlertOutbox(
+            concurrency=1, batch_size=10, max_backoff_sec=0, max_attempts=2,
+            dead_letter_path=str(dead),
+        )
+        for i in range(5):
+            outbox.put({"id": i})
+        outbox.start(send)
+        await asyncio.sleep(0.05)
+        await outbox.close(timeout=0.1)
+        return outbox
+
+    outbox = asyncio.run(run())
+
+    assert delivered == [0, 1, 3, 4]
+    assert outbox.stats()["splits"] == 1
+    assert _lines(dead) == [{"id": 2}]
+
+
+def _publisher(handler, batch_size):
+    publisher = AlertPublisher("http://backend", batch_size=batch_size)
+    publisher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return publisher
+
+
+def test_rejected_batch_drops_only_the_bad_alert(tmp_path):
+    dead = tmp_path / "dead.jsonl"
+    delivered = []
+
+    def backend(request):
+        alerts = json.loads(request.content)["alerts"]
+        if any(a["id"] == 2 for a in alerts):
+            return httpx.Response(422, json={"detail": "malformed alert"})
+        delivered.extend(a["id"] for a in alerts)
+        return httpx.Response(200, json={"results": []})
+
+    async def run():
+        publisher = _publisher(backend, batch_size=10)
+        outbox = AlertOutbox(
+            concurrency=1, batch_size=10, max_backoff_sec=0, max_attempts=3,
+            dead_letter_path=str(dead),
+        )
+        for i in range(5):
+            outbox.put({"id": i})
+        outbox.start(publisher.deliver)
+        await asyncio.sleep(0.05)
+        await outbox.close(timeout=0.1)
+        return outbox
+
+    outbox = asyncio.run(run())
+
+    assert delivered == [0, 1, 3, 4]
+    stats = outbox.stats()
+    assert (stats["splits"], stats["retries"], stats["delivered"]) == (1, 0, 5)
+    assert not dead.exists()
+
+
+def test_rate_limited_batch_is_retried_whole():
+    calls = []
+
+    def backend(request):
+        calls.append(len(json.loads(request.content)["alerts"]))
+        return httpx.Response(429 if len(calls) == 1 else 200, json={"results": []})
+
+    async def run():
+        publisher = _publisher(backend, batch_size=10)
+        outbox = AlertOutbox(concurrency=1, batch_size=10, max_backoff_sec=0, split_after=3)
+        for i in range(3):
+            outbox.put({"id": i})
+        outbox.start(publisher.deliver)
+        await asyncio.sleep(0.05)
+        await outbox.close(timeout=0.1)
+        return outbox
+
+    outbox = asyncio.run(run())
+
+    assert calls == [3, 3]
+    assert outbox.stats()["splits"] == 0
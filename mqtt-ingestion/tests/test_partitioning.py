@@ -0,0 +1,68 @@
+"""Process partitioning is independent of in-process shards; streaming sees all sensors."""
+
+import json
+from collections import Counter
+from types import SimpleNamespace
+
+from app.ingestion.ingress_queue import ShardedIngressQueue
+from app.ingestion.mqtt_client import MQTTClient
+from app.ingestion.partitioning import SensorPartitioner
+
+WORKERS = 4
+SHARDS = 8
+
+
+def test_each_process_uses_every_shard_evenly():
+    partitioners = [SensorPartitioner(i, WORKERS) for i in range(WORKERS)]
+    queue = ShardedIngressQueue(n_shards=SHARDS, maxsize=SHARDS)
+    per_worker = [Counter() for _ in range(WORKERS)]
+
+    for n in range(8000):
+        topic = f"sensors/S-{n:05d}"
+        owner = partitioners[0].owner(topic, b"{}")
+        assert partitioners[owner].owns(topic, {})
+        per_worker[owner][queue.shards.index(queue.shard_for(f"S-{n:05d}"))] += 1
+
+    for shards in per_worker:
+        assert len(shards) == SHARDS
+        expected = sum(shards.values()) / SHARDS
+        assert all(abs(count - expected) < 0.25 * expected for count in shards.values())
+
+
+class _Recorder:
+    def __init__(self):
+        self.items = []
+
+    def submit(self, item):
+        self.items.append(item)
+        return True
+
+    def publish(self, topic, data, timestamp):
+        self.items.append(topic)
+
+
+def _client(index):
+    client = MQTTClient.__new__(MQTTClient)
+    client.partitioner = SensorPartitioner(index, WORKERS)
+    client.ingress = _Recorder()
+    client.stream_hub = _Recorder()
+    client.handler = object()
+    client._driver = object()
+    client.message_count = 0
+    return client
+
+
+def test_hash_mode_streams_sensors_owned_by_other_workers():
+    clients = [_client(i) for i in range(WORKERS)]
+    topics = [f"sensors/S-{n}" for n in range(40)]
+
+    for topic in topics:
+        msg = SimpleNamespace(topic=topic, payload=json.dumps({"v": 1}).encode(), qos=0)
+        for client in clients:
+            client._on_message(None, None, msg)
+
+    for client in clients:
+        assert client.stream_hub.items == topics
+    ingested = [item.topic for client in clients for item in client.ingress.items]
+    assert sorted(ingested) == sorted(topics)
+    assert sum(client.message_count for client in clients) == len(topics)
@@ -0,0 +1,115 @@
+"""Interned MessageContexts are reused until either cache reloads."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+from app.db.incremental_cache import WATERMARK_COLUMNS_SQL
+from app.ingestion import sensor_registry
+from app.ingestion.sensor_registry import SensorRegistryCache
+from app.prediction import model_binding
+from app.prediction.model_binding import ModelBindingCache
+
+TENANT, SITE, ASSET = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+T0 = datetime(2026, 1, 1)
+
+
+class FakePool:
+    """Serves sensor and binding rows for both caches' queries."""
+
+    def __init__(self):
+        self.sensors = {}
+        self.version_id = uuid.uuid4()
+        self.now = T0
+
+    def add_sensor(self, code):
+        self.now += timedelta(minutes=1)
+        self.sensors[code] = {
+            "sensor_code": code,
+            "sensor_id": uuid.uuid4(),
+            "tenant_id": TENANT,
+            "tenant_code": "acme",
+            "site_id": SITE,
+            "site_code": "plant-1",
+            "asset_id": ASSET,
+            "gateway_id": None,
+            "changed_at": self.now,
+            "live": True,
+        }
+
+    def rebind(self):
+        self.now += timedelta(minutes=1)
+        self.version_id = uuid.uuid4()
+
+    def _binding_row(self):
+        return {
+            "asset_id": ASSET,
+            "model_id": uuid.uuid4(),
+            "model_version_id": self.version_id,
+            "full_version_label": "v",
+            "model_artifact_path": None,
+            "updated_at": self.now,
+        }
+
+    async def fetch(self, sql, *args):
+        if sql == WATERMARK_COLUMNS_SQL:
+            return [{"table_name": table} for table in args[0]]
+        if sql == sensor_registry.REFRESH_SQL:
+            return list(self.sensors.values())
+        if sql == sensor_registry.CHANGED_SQL:
+            return [r for r in self.sensors.values() if r["changed_at"] > args[0]]
+        if sql in (model_binding.REFRESH_SQL, model_binding.CHANGED_SQL):
+            row = self._binding_row()
+            return [row] if not args or row["updated_at"] > args[0] else []
+        raise AssertionError(f"unexpected query: {sql}")
+
+
+def _caches(pool):
+    registry, bindings = SensorRegistryCache(), ModelBindingCache()
+    asyncio.run(registry.refresh(pool))
+    asyncio.run(bindings.refresh(pool))
+    return registry, bindings
+
+
+def test_repeat_topic_returns_the_interned_context():
+    pool = FakePool()
+    pool.add_sensor("s1")
+    registry, bindings = _caches(pool)
+
+    ctx = registry.resolve("sensors/s1", bindings)
+
+    assert ctx.is_resolved and ctx.model_version_id == pool.version_id
+    assert registry.resolve("sensors/s1", bindings) is ctx
+    assert registry.resolve("not/a/valid/topic/at/all", bindings) is None
+
+
+def test_registry_change_invalidates_unresolved_context():
+    pool = FakePool()
+    pool.add_sensor("s1")
+    registry, bindings = _caches(pool)
+    unknown = registry.resolve("sensors/s2", bindings)
+    assert not unknown.is_resolved
+
+    pool.add_sensor("s2")
+    asyncio.run(registry.refresh_changed(pool))
+    ctx = registry.resolve("sensors/s2", bindings)
+
+    assert ctx is not unknown
+    assert ctx.is_resolved and ctx.sensor_id == pool.sensors["s2"]["sensor_id"]
+
+
+def test_model_rebinding_invalidates_context():
+    pool = FakePool()
+    pool.add_sensor("s1")
+    registry, bindings = _caches(pool)
+    before = registry.resolve("sensors/s1", bindings)
+
+    # No sensor changed; only the asset's model version did
+    pool.rebind()
+    asyncio.run(bindings.refresh_changed(pool))
+    after = registry.resolve("sensors/s1", bindings)
+
+    assert after is not before
+    assert before.model_version_id != pool.version_id
+    assert after.model_version_id == pool.version_id
+    assert after.window_key == before.window_key
@@ -0,0 +1,82 @@
+"""Window backends feed the batch extractor bit-for-bit baseline windows;
+WindowSlab evicts by LRU and idle TTL and reports its footprint."""
+
+import numpy as np
+import pytest
+
+from app.features.extractors import (
+    extract_statistical_features_batch,
+    extract_statistical_features_from_window,
+)
+from app.features.sliding_window import SlidingWindowManager, WindowSlab
+
+WINDOW = 14
+N_FEATURES = 24
+
+
+@pytest.mark.parametrize("backend", ["list", "slab"])
+@pytest.mark.parametrize("offset, scale", [(0.0, 1.0), (1e6, 0.01), (-5e4, 1e-3)])
+def test_features_match_baseline_exactly(backend, offset, scale):
+    rng = np.random.default_rng(42)
+    readings = offset + scale * rng.normal(size=(5 * WINDOW + 3, N_FEATURES))
+    manager = SlidingWindowManager(
+        window_size=WINDOW, backend=backend, n_features=N_FEATURES, max_bytes=1 << 20,
+    )
+
+    for i, row in enumerate(readings):
+        window = manager.add_reading("sensor", row.tolist())
+        if i < WINDOW - 1:
+            assert window is None
+            continue
+        expected = readings[i - WINDOW + 1 : i + 1].tolist()
+        assert window == expected
+
+        features = extract_statistical_features_batch([window])[0].tolist()
+        assert features == extract_statistical_features_from_window(expected)
+
+
+def test_seed_then_stream_keeps_order():
+    rng = np.random.default_rng(7)
+    history = rng.normal(size=(WINDOW + 5, N_FEATURES)).tolist()
+    manager = SlidingWindowManager(window_size=WINDOW, backend="slab", max_bytes=1 << 20)
+
+    manager.seed("sensor", history)
+    assert manager.get_window("sensor") == history[-WINDOW:]
+
+    window = manager.add_reading("sensor", [1.0] * N_FEATURES)
+    assert window == history[-WINDOW + 1 :] + [[1.0] * N_FEATURES]
+
+
+def test_slab_evicts_least_recent_and_idle_sensors():
+    slot_bytes = WINDOW * N_FEATURES * 8
+    slab = WindowSlab(WINDOW, N_FEATURES, max_bytes=2 * slot_bytes + 1, idle_ttl_sec=10)
+    assert slab.capacity == 2
+
+    slab.acquire("a", now=0.0).push(np.ones(N_FEATURES))
+    slab.acquire("b", now=1.0)
+    slab.acquire("a", now=2.0)  # touch "a"; "b" is now least recent
+    slab.acquire("c", now=3.0)
+
+    assert slab.get("b") is None
+    assert slab.get("a").count == 1  # kept its readings
+    assert slab.stats() == {
+        "backend": "slab",
+        "dtype": "float64",
+        "slots_used": 2,
+        "slots_total": 2,
+        "bytes_per_slot": slot_bytes,
+        "bytes_used": 2 * slot_bytes,
+        "bytes_allocated": 2 * slot_bytes,
+        "evicted_lru": 1,
+        "evicted_idle": 0,
+    }
+
+    # "a" was last seen at 2.0 and "c" at 3.0; only "a" is past the TTL at 12.5
+    slab.acquire("c", now=12.5)
+
+    assert slab.get("a") is None and slab.get("c") is not None
+    stats = slab.stats()
+    assert (stats["slots_used"], stats["bytes_used"], stats["evicted_idle"]) == (1, slot_bytes, 1)
+
+    # A freed slot starts from an empty window
+    assert slab.acquire("a", now=13.0).count == 0
@@ -0,0 +1,67 @@
+"""PredictionVoter k-of-n firing, repeat suppression, re-arming and LRU bound."""
+
+import pytest
+
+from app.alerts.smoothing import PredictionVoter
+
+
+def _fired(voter, key, labels):
+    return [voter.observe(key, label) for label in labels]
+
+
+def test_fires_once_quorum_is_reached():
+    voter = PredictionVoter(k=3, n=5)
+
+    assert _fired(voter, "s", ["bearing", None, "bearing", "bearing"]) == [
+        False, False, False, True,
+    ]
+
+
+def test_sustained_fault_is_suppressed():
+    voter = PredictionVoter(k=2, n=3)
+
+    assert _fired(voter, "s", ["bearing"] * 6) == [False, True, False, False, False, False]
+    assert voter.suppressed == 5
+
+
+def test_rearms_after_losing_quorum():
+    voter = PredictionVoter(k=2, n=3)
+
+    fired = _fired(voter, "s", ["bearing", "bearing", None, None, "bearing", "bearing"])
+
+    assert fired == [False, True, False, False, False, True]
+
+
+def test_new_label_taking_over_fires():
+    voter = PredictionVoter(k=2, n=3)
+
+    fired = _fired(voter, "s", ["bearing", "bearing", "cavitation", "cavitation"])
+
+    assert fired == [False, True, False, True]
+
+
+def test_keys_vote_independently():
+    voter = PredictionVoter(k=2, n=3)
+
+    assert not voter.observe("a", "bearing")
+    assert not voter.observe("b", "bearing")
+    assert voter.observe("a", "bearing")
+
+
+def test_least_recently_observed_key_is_evicted():
+    voter = PredictionVoter(k=2, n=3, max_keys=2)
+
+    voter.observe("a", "bearing")
+    voter.observe("b", "bearing")
+    voter.observe("a", None)  # touch "a"; "b" is now least recent
+    voter.observe("c", "bearing")
+
+    assert voter.size == 2 and voter.evicted == 1
+    # "a" kept its votes and reaches quorum; "b" starts over
+    assert voter.observe("a", "bearing")
+    assert not voter.observe("b", "bearing")
+
+
+def test_rejects_impossible_quorum():
+    with pytest.raises(ValueError):
+        PredictionVoter(k=4, n=3)
@@ -0,0 +1,115 @@
+"""StreamHub tenant fan-out, burst coalescing and slow-client disconnects."""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import orjson
+from jose import jwt
+
+from app.config import settings
+from app.streaming import websocket as websocket_module
+from app.streaming.hub import StreamHub
+from app.streaming.latest_store import LatestValueStore
+
+TENANT_A, TENANT_B = uuid.uuid4(), uuid.uuid4()
+
+
+class FakeRegistry:
+    """sensors/a-* belong to tenant A, sensors/b-* to tenant B."""
+
+    def lookup(self, sensor_code):
+        tenant = {"a": TENANT_A, "b": TENANT_B}.get(sensor_code.split("-")[0])
+        if tenant is None:
+            return None
+        return SimpleNamespace(tenant_id=tenant, asset_id=uuid.uuid4(), sensor_id=uuid.uuid4())
+
+
+def _hub():
+    return StreamHub(LatestValueStore(sensor_registry=FakeRegistry()), push_interval_ms=10)
+
+
+def _drain(subs):
+    for sub in subs:
+        sub.wakeup.clear()
+
+
+def test_changes_wake_only_the_owning_tenant():
+    async def run():
+        hub = _hub()
+        a1, a2 = hub.subscribe(str(TENANT_A)), hub.subscribe(str(TENANT_A))
+        b = hub.subscribe(str(TENANT_B))
+        _drain([a1, a2, b])
+        hub.start()
+        try:
+            hub.publish("sensors/a-1", {"v": 1}, "t0")
+            await asyncio.sleep(0.05)
+            woken = [a1.wakeup.is_set(), a2.wakeup.is_set(), b.wakeup.is_set()]
+
+            # Unresolved topics are shared: every client hears about them
+            _drain([a1, a2, b])
+            hub.publish("legacy/topic", {"v": 1}, "t1")
+            await asyncio.sleep(0.05)
+            shared = [a1.wakeup.is_set(), a2.wakeup.is_set(), b.wakeup.is_set()]
+        finally:
+            await hub.stop()
+        return hub, a1, a2, woken, shared
+
+    hub, a1, a2, woken, shared = asyncio.run(run())
+
+    assert woken == [True, True, False]
+    assert shared == [True, True, True]
+    # Clients with the same view share one encoded frame
+    assert hub.next_frame(a1) is hub.next_frame(a2)
+
+
+def test_burst_is_coalesced_into_one_frame():
+    hub = _hub()
+    sub = hub.subscribe(str(TENANT_A), mode="delta")
+    hub.publish("sensors/a-2", {"v": 0}, "t")
+    assert orjson.loads(hub.next_frame(sub))["type"] == "snapshot"
+
+    for i in range(100):
+        hub.publish("sensors/a-1", {"v": i}, f"t{i}")
+    frame = orjson.loads(hub.next_frame(sub))
+
+    assert frame["type"] == "delta"
+    assert frame["topics"] == {"sensors/a-1": {"data": {"v": 99}, "timestamp": "t99"}}
+    assert hub.next_frame(sub) is None
+
+
+class StalledWebSocket:
+    """Accepts, then never finishes a send and never sends anything itself."""
+
+    def __init__(self, app, token):
+        self.app = app
+        self.query_params = {"token": token}
+        self.closed_with = None
+        self._never = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        await self._never.wait()
+
+    send_bytes = send_text
+
+    async def receive_json(self):
+        await self._never.wait()
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+
+def test_slow_client_is_disconnected(monkeypatch):
+    monkeypatch.setattr(settings, "WS_SEND_TIMEOUT_SEC", 0.05)
+    hub = _hub()
+    token = jwt.encode({"tenant_id": str(TENANT_A)}, settings.JWT_SECRET_KEY, algorithm="HS256")
+    ws = StalledWebSocket(SimpleNamespace(state=SimpleNamespace(stream_hub=hub)), token)
+
+    asyncio.run(asyncio.wait_for(websocket_module.websocket_stream(ws), timeout=2))
+
+    assert ws.closed_with == 1013
+    assert hub.slow_clients_dropped == 1
+    assert hub.stats()["clients"] == 0
@@ -0,0 +1,102 @@
+"""Warm start reads the latest window per topic and gives up after a timeout."""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.features.sliding_window import SlidingWindowManager
+from app.ingestion.context import MessageContext
+from app.ingestion.warm_start import rehydrate_windows
+
+
+class FakeCursor:
+    def __init__(self, docs, delay):
+        self._docs = docs
+        self._delay = delay
+        self.limit_n = None
+
+    def sort(self, key, direction):
+        self._docs = sorted(self._docs, key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        await asyncio.sleep(self._delay)
+        for doc in self._docs[: self.limit_n]:
+            yield doc
+
+
+class FakeSensorData:
+    def __init__(self, docs, delay=0.0):
+        self._docs = docs
+        self._delay = delay
+        self.cursors = []
+
+    async def distinct(self, key, query=None):
+        since = (query or {}).get("timestamp", {}).get("$gte", datetime.min)
+        return sorted({d[key] for d in self._docs if d["timestamp"] >= since})
+
+    def find(self, query, projection=None):
+        since = query["timestamp"]["$gte"]
+        docs = [d for d in self._docs if d["topic"] == query["topic"] and d["timestamp"] >= since]
+        cursor = FakeCursor(docs, self._delay)
+        self.cursors.append(cursor)
+        return cursor
+
+
+def _handler():
+    return SimpleNamespace(
+        window_manager=SlidingWindowManager(window_size=14),
+        resolve_context=lambda topic, data: MessageContext(sensor_code=topic),
+    )
+
+
+def _docs(topics, count):
+    now = datetime.utcnow()
+    return [
+        {
+            "topic": topic,
+            "timestamp": now - timedelta(seconds=count - i),
+            "data": {"motor_DE_vib_band_1": float(i)},
+        }
+        for topic in topics
+        for i in range(count)
+    ]
+
+
+def test_seeds_latest_window_per_topic():
+    sensor_data = FakeSensorData(_docs(["a", "b"], 20) + _docs(["c"], 5))
+    handler = _handler()
+
+    seeded = asyncio.run(rehydrate_windows(SimpleNamespace(sensor_data=sensor_data), handler, 3600))
+
+    assert seeded == 3
+    assert all(cursor.limit_n == 14 for cursor in sensor_data.cursors)
+    window = handler.window_manager.get_window(MessageContext(sensor_code="a").window_key)
+    assert [row[0] for row in window] == [float(i) for i in range(6, 20)]
+
+
+def test_timeout_returns_without_blocking():
+    sensor_data = FakeSensorData(_docs(["a", "b"], 14), delay=1.0)
+
+    seeded = asyncio.run(
+        rehydrate_windows(SimpleNamespace(sensor_data=sensor_data), _handler(), 3600, timeout_sec=0.05)
+    )
+
+    assert seeded == 0
+
+
+def test_stale_topics_are_not_queried():
+    stale = [dict(doc, timestamp=doc["timestamp"] - timedelta(days=2)) for doc in _docs(["old"], 14)]
+    sensor_data = FakeSensorData(_docs(["a"], 14) + stale)
+
+    seeded = asyncio.run(rehydrate_windows(SimpleNamespace(sensor_data=sensor_data), _handler(), 3600))
+
+    assert seeded == 1
+    assert len(sensor_data.cursors) == 1
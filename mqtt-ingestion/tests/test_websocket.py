@@ -0,0 +1,29 @@
+"""/stream keeps going when a client sends something that is not JSON."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.config import settings
+from app.streaming.hub import StreamHub
+from app.streaming.latest_store import LatestValueStore
+from app.streaming.websocket import router
+
+
+def test_non_json_message_does_not_end_stream():
+    app = FastAPI()
+    app.include_router(router)
+    hub = StreamHub(LatestValueStore())
+    hub.publish("legacy/topic", {"value": 1}, "t0")
+    app.state.stream_hub = hub
+    token = jwt.encode({"tenant_id": "tenant-a"}, settings.JWT_SECRET_KEY, algorithm="HS256")
+
+    with TestClient(app).websocket_connect(f"/stream?token={token}") as ws:
+        assert "legacy/topic" in ws.receive_json()
+
+        ws.send_text("not json {")
+        ws.send_bytes(b"\x00\x01")
+        ws.send_json({"subscribe": {"sensors": ["nothing-matches"]}})
+
+        # The subscription still applied: a fresh, now empty, view arrives
+        assert ws.receive_json() == {}